@@ -0,0 +1,283 @@
+"""http2_throughput
+
+Compare the HTTP/1.1 and HTTP/2 throughput of GithubRestApiClient against a
+local stand-in for a GitHub server that answers every request after a fixed
+latency.
+
+HTTP/1.1 can only have one request in flight per connection, so throughput is
+capped at ``max_connections / latency``; HTTP/2 multiplexes every request over
+a single connection. The stand-in serves TLS with a throwaway certificate and
+lets ALPN pick the protocol, the way a GitHub server does. It needs the http2
+and app extras (h2 and cryptography):
+
+    poetry install --all-extras
+    python -m benchmarks.http2_throughput --requests 2000 --max-connections 10
+"""
+
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import json
+import os
+import ssl
+import tempfile
+import time
+from collections import Counter
+from functools import partial
+from importlib.util import find_spec
+from pathlib import Path
+
+from nodestream_github.client import GithubRestApiClient
+
+HOST = "127.0.0.1"
+ORG = json.dumps({"login": "example", "id": 1, "node_id": "MDEyOk9yZ2FuaXphdGlvbjE="})
+# GHES answers 404 when rate limiting is disabled, so the client does not pace
+# the benchmark
+RATE_LIMIT_PATH = "/api/v3/rate_limit"
+# the protocol ALPN picked for every connection
+CONNECTIONS: Counter[str] = Counter()
+
+
+def response_for(path: str) -> tuple[int, bytes]:
+    if path == RATE_LIMIT_PATH:
+        return 404, b'{"message": "Not Found"}'
+    return 200, ORG.encode()
+
+
+def issue_certificate(directory: Path) -> ssl.SSLContext:
+    """Create a CA and a certificate for HOST signed by it.
+
+    The CA is saved to ``directory`` and trusted through SSL_CERT_FILE, which the
+    client's session reads; the returned context serves the certificate.
+    """
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    now = datetime.datetime.now(datetime.UTC)
+
+    def certificate(
+        subject: str,
+        key: ec.EllipticCurvePrivateKey,
+        issuer: x509.Certificate | None,
+        issuer_key: ec.EllipticCurvePrivateKey,
+    ) -> x509.Certificate:
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, subject)])
+        builder = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(issuer.subject if issuer else name)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(minutes=5))
+            .not_valid_after(now + datetime.timedelta(hours=1))
+            .add_extension(
+                x509.SubjectKeyIdentifier.from_public_key(key.public_key()),
+                critical=False,
+            )
+            .add_extension(
+                x509.AuthorityKeyIdentifier.from_issuer_public_key(
+                    issuer_key.public_key()
+                ),
+                critical=False,
+            )
+        )
+        if issuer is None:
+            builder = builder.add_extension(
+                x509.BasicConstraints(ca=True, path_length=0), critical=True
+            ).add_extension(
+                x509.KeyUsage(
+                    digital_signature=True,
+                    content_commitment=False,
+                    key_encipherment=False,
+                    data_encipherment=False,
+                    key_agreement=False,
+                    key_cert_sign=True,
+                    crl_sign=True,
+                    encipher_only=False,
+                    decipher_only=False,
+                ),
+                critical=True,
+            )
+        else:
+            builder = builder.add_extension(
+                x509.BasicConstraints(ca=False, path_length=None), critical=True
+            ).add_extension(
+                x509.SubjectAlternativeName(
+                    [x509.IPAddress(ipaddress.ip_address(HOST))]
+                ),
+                critical=False,
+            )
+        return builder.sign(issuer_key, hashes.SHA256())
+
+    ca_key = ec.generate_private_key(ec.SECP256R1())
+    ca = certificate("benchmark CA", ca_key, None, ca_key)
+    server_key = ec.generate_private_key(ec.SECP256R1())
+    server = certificate(HOST, server_key, ca, ca_key)
+
+    pem = serialization.Encoding.PEM
+    ca_path = directory / "ca.pem"
+    ca_path.write_bytes(ca.public_bytes(pem))
+    chain_path = directory / "server.pem"
+    chain_path.write_bytes(server.public_bytes(pem))
+    key_path = directory / "server.key"
+    key_path.write_bytes(
+        server_key.private_bytes(
+            pem,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    os.environ["SSL_CERT_FILE"] = str(ca_path)
+
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(chain_path, key_path)
+    context.set_alpn_protocols(["h2", "http/1.1"])
+    return context
+
+
+async def serve_http1(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, latency: float
+) -> None:
+    while True:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+        path = head.split(b" ", 2)[1].decode().split("?")[0]
+        await asyncio.sleep(latency)
+        status, body = response_for(path)
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Not Found'}\r\n".encode()
+            + b"Content-Type: application/json\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+
+
+async def serve_http2(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, latency: float
+) -> None:
+    from h2.config import H2Configuration
+    from h2.connection import H2Connection
+    from h2.events import ConnectionTerminated, RequestReceived, WindowUpdated
+
+    connection = H2Connection(config=H2Configuration(client_side=False))
+    connection.initiate_connection()
+    writer.write(connection.data_to_send())
+    window_updated = asyncio.Event()
+    streams = set()
+
+    async def respond(stream_id: int, path: str) -> None:
+        await asyncio.sleep(latency)
+        status, body = response_for(path)
+        connection.send_headers(
+            stream_id,
+            [
+                (":status", str(status)),
+                ("content-type", "application/json"),
+                ("content-length", str(len(body))),
+            ],
+        )
+        while connection.local_flow_control_window(stream_id) < len(body):
+            window_updated.clear()
+            await window_updated.wait()
+        connection.send_data(stream_id, body, end_stream=True)
+        writer.write(connection.data_to_send())
+
+    try:
+        while data := await reader.read(65535):
+            for event in connection.receive_data(data):
+                if isinstance(event, RequestReceived):
+                    path = dict(event.headers)[b":path"].decode().split("?")[0]
+                    task = asyncio.create_task(respond(event.stream_id, path))
+                    streams.add(task)
+                    task.add_done_callback(streams.discard)
+                elif isinstance(event, WindowUpdated):
+                    window_updated.set()
+                elif isinstance(event, ConnectionTerminated):
+                    return
+            writer.write(connection.data_to_send())
+            await writer.drain()
+    finally:
+        for task in streams:
+            task.cancel()
+
+
+async def serve(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, latency: float
+) -> None:
+    protocol = writer.get_extra_info("ssl_object").selected_alpn_protocol()
+    CONNECTIONS[protocol or "http/1.1"] += 1
+    try:
+        if protocol == "h2":
+            await serve_http2(reader, writer, latency)
+        else:
+            await serve_http1(reader, writer, latency)
+    finally:
+        writer.close()
+
+
+async def run(client: GithubRestApiClient, requests: int) -> float:
+    """Fetch an org ``requests`` times at once and return the requests per second."""
+    start = time.perf_counter()
+    orgs = await asyncio.gather(
+        *(client.fetch_full_org("example") for _ in range(requests))
+    )
+    elapsed = time.perf_counter() - start
+    if None in orgs:
+        msg = "some requests failed"
+        raise RuntimeError(msg)
+    return requests / elapsed
+
+
+async def main(args: argparse.Namespace) -> None:
+    missing = [extra for extra in ("h2", "cryptography") if find_spec(extra) is None]
+    if missing:
+        # without h2 the client falls back to HTTP/1.1 and compares it to itself
+        msg = f"install the http2 and app extras, missing: {', '.join(missing)}"
+        raise SystemExit(msg)
+
+    with tempfile.TemporaryDirectory() as directory:
+        context = issue_certificate(Path(directory))
+        server = await asyncio.start_server(
+            partial(serve, latency=args.latency), HOST, 0, ssl=context
+        )
+        port = server.sockets[0].getsockname()[1]
+        results = {}
+        async with server:
+            for name, http2 in [("HTTP/1.1", False), ("HTTP/2", True)]:
+                client = GithubRestApiClient(
+                    # a token per run, so the runs do not share a connection
+                    auth_token=f"benchmark-{name}",
+                    github_hostname=f"{HOST}:{port}",
+                    max_retries=1,
+                    http2=http2,
+                    max_connections=args.max_connections,
+                    # queued requests wait for a free connection
+                    pool_timeout=600,
+                )
+                try:
+                    # warm up the connection pool and the rate limit probe
+                    await run(client, args.max_connections)
+                    results[name] = await run(client, args.requests)
+                finally:
+                    await client.aclose()
+
+    for name, rate in results.items():
+        print(f"{name}: {rate:,.0f} requests/s")
+    print(f"connections: {dict(CONNECTIONS)}")
+    print(f"speed up: {results['HTTP/2'] / results['HTTP/1.1']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--max-connections", type=int, default=10)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="server latency in seconds"
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -11,6 +11,7 @@ from typing import Any
 
 from dateutil.relativedelta import relativedelta
 from nodestream.pipeline import Extractor
+from nodestream.pipeline.step import StepContext
 
 from .client import GithubRestApiClient
 from .logging import get_plugin_logger
@@ -118,6 +119,10 @@ class GithubAuditLogExtractor(Extractor):
         self.actors = actors
         self.exclude_actors = exclude_actors
 
+    async def finish(self, context: StepContext):
+        await super().finish(context)
+        await self.client.aclose()
+
     async def extract_records(self) -> AsyncGenerator[GithubAuditLog]:
         dates = generate_date_range(self.lookback_period) or [None]
         for target_date in dates:
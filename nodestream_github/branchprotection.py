@@ -0,0 +1,105 @@
+"""branchprotection
+
+Enrich repositories with the protection of their default branch.
+
+Most repositories have no protected branches at all, so asking for the
+protection of every default branch mostly produces 404s. Instead the protected
+branches of a repository are listed first, and the protection is only fetched
+when the default branch is among them. Repositories found unprotected are
+remembered for a while, optionally across runs, and not asked about again.
+"""
+
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from .client import GithubRestApiClient
+from .logging import get_plugin_logger
+from .state import load_state, save_state
+from .types import BranchProtection, GithubRepo
+
+DEFAULT_UNPROTECTED_TTL_SECONDS = 24 * 60 * 60  # 1 day
+
+logger = get_plugin_logger(__name__)
+
+
+class UnprotectedRepoCache:
+    """Repositories whose default branch was found unprotected, until a TTL.
+
+    Kept in memory and, with a ``path``, loaded from and saved to a JSON file.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        ttl_seconds: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if ttl_seconds is None:
+            ttl_seconds = DEFAULT_UNPROTECTED_TTL_SECONDS
+        elif ttl_seconds < 0:
+            msg = "branch_protection_cache_ttl_seconds must not be negative"
+            raise ValueError(msg)
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._path = Path(path) if path else None
+        self._expires_at: dict[str, float] = load_state(self._path)
+
+    def __contains__(self, key: str) -> bool:
+        return self._expires_at.get(key, 0) > self._clock()
+
+    def add(self, key: str) -> None:
+        self._expires_at[key] = self._clock() + self._ttl
+
+    def discard(self, key: str) -> None:
+        self._expires_at.pop(key, None)
+
+    def save(self) -> None:
+        if not self._path:
+            return
+        now = self._clock()
+        live = {key: exp for key, exp in self._expires_at.items() if exp > now}
+        save_state(self._path, live)
+
+
+class DefaultBranchProtection:
+    """Fetches the protection of default branches, skipping unprotected repos."""
+
+    def __init__(self, client: GithubRestApiClient, unprotected: UnprotectedRepoCache):
+        self.client = client
+        self.unprotected = unprotected
+
+    @staticmethod
+    def _key(repo: GithubRepo) -> str:
+        # a new default branch may well be protected, so it gets a new key
+        return f"{repo['id']}:{repo['default_branch']}"
+
+    async def fetch(
+        self, *, owner_login: str, repo: GithubRepo, raise_errors: bool = False
+    ) -> BranchProtection | None:
+        branch = repo.get("default_branch")
+        if not branch:
+            return None
+        key = self._key(repo)
+        if key in self.unprotected:
+            logger.debug("%s is known to be unprotected", repo.get("full_name"))
+            return None
+
+        protected = await self.client.fetch_protected_branches_for_repo(
+            owner_login=owner_login, repo_name=repo["name"], raise_errors=raise_errors
+        )
+        if protected is None:
+            # unknown, so neither cached nor asked about any further
+            return None
+        if branch not in {protected_branch["name"] for protected_branch in protected}:
+            self.unprotected.add(key)
+            return None
+
+        self.unprotected.discard(key)
+        return await self.client.fetch_branch_protection(
+            owner_login=owner_login,
+            repo_name=repo["name"],
+            branch=branch,
+            raise_errors=raise_errors,
+        )
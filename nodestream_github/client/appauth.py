@@ -0,0 +1,215 @@
+"""appauth
+
+Authenticate as a GitHub App installation instead of with a static token.
+
+The app signs a short-lived JWT with its private key and trades it for one
+installation access token per account (organization or user) it is installed
+on. Installation tokens expire after an hour and are refreshed shortly before.
+Every installation has its own rate limit, so each one gets its own budget.
+https://docs.github.com/en/enterprise-server@3.12/apps/creating-github-apps/authenticating-with-a-github-app/authenticating-as-a-github-app-installation
+"""
+
+import asyncio
+import base64
+import json
+import time
+from collections.abc import Callable
+from datetime import datetime
+from importlib.util import find_spec
+from pathlib import Path
+
+import httpx
+
+from nodestream_github.logging import get_plugin_logger
+
+from .tokenpool import PooledToken
+
+DEFAULT_TOKEN_REFRESH_MARGIN_SECONDS = 300  # 5 minutes
+# GitHub rejects app JWTs that expire more than 10 minutes in the future
+JWT_LIFETIME_SECONDS = 540
+# issued a little in the past to allow for clock drift
+JWT_CLOCK_DRIFT_SECONDS = 60
+
+# the app extra
+MISSING_CRYPTOGRAPHY = (
+    "GitHub App authentication requires the cryptography package,"
+    " install nodestream-plugin-github[app]"
+)
+
+logger = get_plugin_logger(__name__)
+
+
+class GithubAppAuthError(httpx.HTTPError):
+    """The app cannot authenticate, e.g. it has no installation to send a
+    request with. Raised in place of the request, so it is an HTTPError too."""
+
+
+def _b64(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def sign_app_jwt(app_id: str, private_key: str, *, now: float) -> str:
+    """Sign the RS256 JWT that authenticates as the app itself."""
+    try:
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import padding
+    except ImportError as e:
+        raise GithubAppAuthError(MISSING_CRYPTOGRAPHY) from e
+
+    header = {"alg": "RS256", "typ": "JWT"}
+    payload = {
+        "iat": int(now) - JWT_CLOCK_DRIFT_SECONDS,
+        "exp": int(now) + JWT_LIFETIME_SECONDS,
+        "iss": str(app_id),
+    }
+    signing_input = b".".join(
+        _b64(json.dumps(part, separators=(",", ":")).encode())
+        for part in (header, payload)
+    )
+    key = serialization.load_pem_private_key(private_key.encode(), password=None)
+    signature = key.sign(signing_input, padding.PKCS1v15(), hashes.SHA256())
+    return (signing_input + b"." + _b64(signature)).decode()
+
+
+class Installation:
+    def __init__(self, installation_id: int, account: str | None, token: PooledToken):
+        self.id = installation_id
+        self.account = account
+        self.token = token
+        # its tokens are reissued every hour, the installation stays the same
+        self.token.identity = f"installation:{installation_id}"
+        self.expires_at = 0.0
+        self.lock = asyncio.Lock()
+
+
+class GithubAppAuth:
+    """Mints and refreshes installation tokens for a GitHub App."""
+
+    def __init__(
+        self,
+        *,
+        session: httpx.AsyncClient,
+        base_url: str,
+        headers: httpx.Headers,
+        app_id: int | str,
+        private_key: str | None = None,
+        private_key_path: str | None = None,
+        installation_id: int | None = None,
+        refresh_margin: float | None = None,
+        new_token: Callable[[], PooledToken],
+        clock: Callable[[], float] = time.time,
+    ):
+        if private_key is None and private_key_path is None:
+            msg = "app_private_key or app_private_key_path is required with app_id"
+            raise ValueError(msg)
+        # fail when configured rather than on the first request
+        if find_spec("cryptography") is None:
+            raise GithubAppAuthError(MISSING_CRYPTOGRAPHY)
+        self._session = session
+        self._base_url = base_url
+        self._headers = headers
+        self._app_id = str(app_id)
+        self._private_key = (
+            private_key
+            if private_key is not None
+            else Path(private_key_path).read_text()
+        )
+        self._default_installation_id = installation_id
+        self._refresh_margin = (
+            DEFAULT_TOKEN_REFRESH_MARGIN_SECONDS
+            if refresh_margin is None
+            else refresh_margin
+        )
+        self._new_token = new_token
+        self._clock = clock
+        self._jwt: str | None = None
+        self._jwt_expires_at = 0.0
+        self._installations: dict[str, Installation] | None = None
+        self._default: Installation | None = None
+        self._installations_lock = asyncio.Lock()
+
+    @property
+    def app_id(self) -> str:
+        return self._app_id
+
+    def installations(self) -> list[Installation]:
+        """The installations found so far."""
+        return list((self._installations or {}).values())
+
+    def app_jwt(self) -> str:
+        now = self._clock()
+        if self._jwt is None or self._jwt_expires_at - now < JWT_CLOCK_DRIFT_SECONDS:
+            self._jwt = sign_app_jwt(self._app_id, self._private_key, now=now)
+            self._jwt_expires_at = now + JWT_LIFETIME_SECONDS
+        return self._jwt
+
+    def _app_headers(self) -> httpx.Headers:
+        headers = httpx.Headers(self._headers)
+        headers["Authorization"] = f"Bearer {self.app_jwt()}"
+        return headers
+
+    async def _load_installations(self) -> dict[str, Installation]:
+        """List every installation of the app once, keyed by account login."""
+        async with self._installations_lock:
+            if self._installations is not None:
+                return self._installations
+
+            installations = {}
+            url = f"{self._base_url}/app/installations?per_page=100"
+            while url:
+                response = await self._session.get(url, headers=self._app_headers())
+                response.raise_for_status()
+                for item in response.json():
+                    login = (item.get("account") or {}).get("login")
+                    installation = Installation(item["id"], login, self._new_token())
+                    installations[(login or str(item["id"])).lower()] = installation
+                    if item["id"] == self._default_installation_id:
+                        self._default = installation
+                url = response.links.get("next", {}).get("url")
+
+            default_id = self._default_installation_id
+            if self._default is None and default_id is not None:
+                msg = f"GitHub App installation {default_id} not found"
+                raise GithubAppAuthError(msg)
+            if self._default is None and installations:
+                self._default = next(iter(installations.values()))
+            logger.info(
+                "GitHub App %s is installed on %s accounts",
+                self._app_id,
+                len(installations),
+            )
+            self._installations = installations
+            return installations
+
+    async def token_for(self, owner: str | None) -> PooledToken:
+        """The (fresh) token of the installation on ``owner``.
+
+        Requests that are not scoped to an account, or to an account the app is
+        not installed on, use the default installation.
+        """
+        installations = await self._load_installations()
+        installation = installations.get(owner.lower()) if owner else None
+        installation = installation or self._default
+        if installation is None:
+            msg = f"GitHub App {self._app_id} has no installations"
+            raise GithubAppAuthError(msg)
+
+        async with installation.lock:
+            if installation.expires_at - self._clock() <= self._refresh_margin:
+                await self._mint(installation)
+        return installation.token
+
+    async def _mint(self, installation: Installation) -> None:
+        response = await self._session.post(
+            f"{self._base_url}/app/installations/{installation.id}/access_tokens",
+            headers=self._app_headers(),
+        )
+        response.raise_for_status()
+        data = response.json()
+        installation.token.token = data["token"]
+        installation.expires_at = datetime.fromisoformat(data["expires_at"]).timestamp()
+        logger.debug(
+            "Minted a token for GitHub App installation %s (%s)",
+            installation.id,
+            installation.account,
+        )
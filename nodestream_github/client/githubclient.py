@@ -3,34 +3,58 @@
 An async client for accessing GitHub.
 """
 
+import asyncio
 import json
 import logging
-from collections.abc import AsyncGenerator
+import time
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, aclosing, asynccontextmanager
 from enum import Enum
+from functools import partial
 from typing import Any
 
 import httpx
-from limits import RateLimitItem, RateLimitItemPerMinute
-from limits.aio.storage import MemoryStorage
-from limits.aio.strategies import MovingWindowRateLimiter, RateLimiter
 from tenacity import (
     AsyncRetrying,
+    RetryCallState,
     after_log,
     before_sleep_log,
     retry_if_exception_type,
     stop_after_attempt,
     wait_random_exponential,
 )
+from tenacity.wait import wait_base
 
 import nodestream_github.types as types
+from nodestream_github.concurrency import bounded_map
 from nodestream_github.logging import get_plugin_logger
 from nodestream_github.types import enums
 
+from .httpcache import ConditionalRequestCache
+from .ratelimit import (
+    CORE_RESOURCE,
+    GcraRateLimiter,
+    PauseGate,
+    RateLimitBudget,
+    retry_after_seconds,
+)
+from .registry import CLIENT_REGISTRY, ConnectionKey, SharedConnection
+from .tokenpool import PooledToken, TokenPool
+
 DEFAULT_REQUEST_RATE_LIMIT_PER_MINUTE = int(13000 / 60)
 DEFAULT_MAX_RETRIES = 20
 DEFAULT_PAGE_SIZE = 100
 DEFAULT_MAX_RETRY_WAIT_SECONDS = 300  # 5 minutes
+DEFAULT_MAX_PAGE_FAN_OUT = 4
+DEFAULT_PAGE_PREFETCH = 1
 DEFAULT_GITHUB_HOST = "api.github.com"
+# the httpx defaults
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY_SECONDS = 5.0
+DEFAULT_TIMEOUT_SECONDS = 5.0
+# GitHub asks to wait at least a minute when no Retry-After header is given
+DEFAULT_SECONDARY_RATE_LIMIT_PAUSE_SECONDS = 60
 
 
 logger = get_plugin_logger(__name__)
@@ -40,7 +64,13 @@ class AllowedAuditActionsPhrases(Enum):
     BRANCH_PROTECTION = "protected_branch"
 
 
-class RateLimitedError(Exception):
+class RateLimitedError(httpx.HTTPError):
+    """Still rate limited once the retries are used up.
+
+    An HTTPError, so the fetch methods log it and carry on like any other failed
+    request instead of ending the extraction.
+    """
+
     def __init__(self, url: str | httpx.URL):
         super().__init__(f"Rate limited when calling {url}")
 
@@ -56,6 +86,100 @@ def _safe_get_json_error_message(response: httpx.Response) -> str:
         return response.text
 
 
+def _next_page_url(response: httpx.Response) -> str | None:
+    return response.links.get("next", {}).get("url")
+
+
+def _remaining_page_urls(response: httpx.Response) -> list[httpx.URL]:
+    """URLs for every page after the first when the Link header has a last page.
+
+    Only page-numbered listings have a "last" link; cursor based listings
+    (since=/after=) can only be followed one "next" link at a time.
+    """
+    next_link = _next_page_url(response)
+    last_link = response.links.get("last", {}).get("url")
+    if not next_link or not last_link:
+        return []
+
+    next_url = httpx.URL(next_link)
+    try:
+        next_page = int(next_url.params["page"])
+        last_page = int(httpx.URL(last_link).params["page"])
+    except (KeyError, ValueError):
+        return []
+    return [
+        next_url.copy_set_param("page", page)
+        for page in range(next_page, last_page + 1)
+    ]
+
+
+def _rate_limited_pause(response: httpx.Response) -> float | None:
+    """Seconds to pause if the server rate limited this response, otherwise None.
+
+    https://docs.github.com/en/enterprise-server@3.12/rest/using-the-rest-api/best-practices-for-using-the-rest-api?apiVersion=2022-11-28#handle-rate-limit-errors-appropriately
+    """
+    if response.status_code not in {
+        httpx.codes.FORBIDDEN,
+        httpx.codes.TOO_MANY_REQUESTS,
+    }:
+        return None
+    retry_after = retry_after_seconds(response.headers)
+    if retry_after is not None:
+        return retry_after
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        budget = RateLimitBudget.from_headers(response.headers)
+        if budget:
+            return budget.seconds_until_reset()
+    message = (_safe_get_json_error_message(response) or "").lower()
+    if response.status_code == httpx.codes.TOO_MANY_REQUESTS or "rate limit" in message:
+        return DEFAULT_SECONDARY_RATE_LIMIT_PAUSE_SECONDS
+    return None
+
+
+def _backoff_unless_rate_limited(
+    backoff: wait_base,
+) -> Callable[[RetryCallState], float]:
+    """Rate limited requests already waited at the pause gate, so retry at once."""
+
+    def wait(retry_state: RetryCallState) -> float:
+        if isinstance(retry_state.outcome.exception(), RateLimitedError):
+            return 0
+        return backoff(retry_state)
+
+    return wait
+
+
+def _account_of(url: httpx.URL, base_url: str) -> str | None:
+    """The organization or user a request is scoped to, if any."""
+    path = url.path.removeprefix(httpx.URL(base_url).path).strip("/").split("/")
+    if len(path) > 1 and path[0] in {"orgs", "repos", "users"}:
+        return path[1]
+    return None
+
+
+def _non_negative(name: str, value: float | None, default: float) -> float:
+    if value is None:
+        return default
+    if value < 0:
+        msg = f"{name} must be a positive number"
+        raise ValueError(msg)
+    return value
+
+
+def _create_session(
+    *, http2: bool, limits: httpx.Limits, timeout: httpx.Timeout
+) -> httpx.AsyncClient:
+    if http2:
+        try:
+            return httpx.AsyncClient(http2=True, limits=limits, timeout=timeout)
+        except ImportError:
+            logger.warning(
+                "HTTP/2 requires the http2 extra (nodestream-plugin-github[http2]),"
+                " falling back to HTTP/1.1."
+            )
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
 def _fetch_problem(title: str, e: httpx.HTTPError):
     match e:
         case httpx.HTTPStatusError(response=response):
@@ -77,12 +201,32 @@ class GithubRestApiClient:
         self,
         *,
         auth_token: str | None = None,
+        auth_tokens: list[str] | None = None,
         github_hostname: str | None = None,
         user_agent: str | None = None,
         per_page: int | None = None,
         max_retries: int | None = None,
         rate_limit_per_minute: int | None = None,
+        rate_limit_burst: int | None = None,
         max_retry_wait_seconds: int | None = None,
+        max_page_fan_out: int | None = None,
+        page_order: enums.ResultOrder | str | None = None,
+        page_prefetch: int | None = None,
+        http_cache_path: str | None = None,
+        http_cache_max_bytes: int | None = None,
+        http2: bool | None = None,
+        max_connections: int | None = None,
+        max_keepalive_connections: int | None = None,
+        keepalive_expiry: float | None = None,
+        connect_timeout: float | None = None,
+        read_timeout: float | None = None,
+        write_timeout: float | None = None,
+        pool_timeout: float | None = None,
+        app_id: int | str | None = None,
+        app_private_key: str | None = None,
+        app_private_key_path: str | None = None,
+        app_installation_id: int | None = None,
+        app_token_refresh_margin_seconds: float | None = None,
         **_kwargs: Any,
     ):
         if per_page is None:
@@ -97,7 +241,24 @@ class GithubRestApiClient:
             msg = "max_retries must be a positive integer"
             raise ValueError(msg)
 
-        self._auth_token = auth_token
+        if max_page_fan_out is None:
+            max_page_fan_out = DEFAULT_MAX_PAGE_FAN_OUT
+        elif max_page_fan_out < 1:
+            msg = "max_page_fan_out must be an integer greater than 0"
+            raise ValueError(msg)
+        self._max_page_fan_out = max_page_fan_out
+        self._page_order = enums.ResultOrder(page_order or enums.ResultOrder.LISTING)
+
+        if page_prefetch is None:
+            page_prefetch = DEFAULT_PAGE_PREFETCH
+        elif page_prefetch < 0:
+            msg = "page_prefetch must be a positive integer"
+            raise ValueError(msg)
+        self._page_prefetch = page_prefetch
+
+        # every token gets its own rate budget; requests go to the least used
+        tokens = list(dict.fromkeys(t for t in [auth_token, *(auth_tokens or [])] if t))
+        self._auth_token = tokens[0] if tokens else auth_token
         if github_hostname == "api.github.com" or github_hostname is None:
             self._base_url = "https://api.github.com"
             self._is_default_hostname = True
@@ -106,8 +267,7 @@ class GithubRestApiClient:
             self._is_default_hostname = False
 
         self._per_page = per_page
-        self._limit_storage = MemoryStorage()
-        if not self.auth_token:
+        if app_id is None and not self.auth_token:
             logger.warning("Missing auth_token.")
         self._default_headers = httpx.Headers({
             "Accept": "application/vnd.github+json",
@@ -118,17 +278,99 @@ class GithubRestApiClient:
             self._default_headers["User-Agent"] = user_agent
         self._max_retries = max_retries
 
-        self._rate_limit = RateLimitItemPerMinute(
-            (
+        if max_connections is None:
+            max_connections = DEFAULT_MAX_CONNECTIONS
+        elif max_connections < 1:
+            msg = "max_connections must be an integer greater than 0"
+            raise ValueError(msg)
+        if max_keepalive_connections is None:
+            max_keepalive_connections = min(
+                DEFAULT_MAX_KEEPALIVE_CONNECTIONS, max_connections
+            )
+        elif max_keepalive_connections < 0:
+            msg = "max_keepalive_connections must be a positive integer"
+            raise ValueError(msg)
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=_non_negative(
+                "keepalive_expiry", keepalive_expiry, DEFAULT_KEEPALIVE_EXPIRY_SECONDS
+            ),
+        )
+        timeout = httpx.Timeout(
+            connect=_non_negative(
+                "connect_timeout", connect_timeout, DEFAULT_TIMEOUT_SECONDS
+            ),
+            read=_non_negative("read_timeout", read_timeout, DEFAULT_TIMEOUT_SECONDS),
+            write=_non_negative(
+                "write_timeout", write_timeout, DEFAULT_TIMEOUT_SECONDS
+            ),
+            pool=_non_negative("pool_timeout", pool_timeout, DEFAULT_TIMEOUT_SECONDS),
+        )
+
+        def connect() -> SharedConnection:
+            per_minute = (
                 DEFAULT_REQUEST_RATE_LIMIT_PER_MINUTE
                 if rate_limit_per_minute is None
                 else rate_limit_per_minute
+            )
+            # by default a full minute of budget may be spent at once, like the
+            # moving window this limiter replaced
+            burst = per_minute if rate_limit_burst is None else rate_limit_burst
+            logger.info(
+                "GitHub REST RateLimit set to %s per minute (burst %s)",
+                per_minute,
+                burst,
+            )
+            connection = SharedConnection(
+                # with HTTP/2 every concurrent request to the host shares one
+                # connection
+                session=_create_session(
+                    http2=bool(http2), limits=limits, timeout=timeout
+                ),
+                # installation tokens join the pool once they are minted
+                auth_tokens=[] if app_id is not None else tokens or [auth_token],
+                rate_limit_per_minute=per_minute,
+                rate_limit_burst=burst,
+                min_emission_interval=(
+                    0.0 if rate_limit_per_minute is None else 60 / per_minute
+                ),
+                http_cache=(
+                    ConditionalRequestCache(
+                        http_cache_path, max_bytes=http_cache_max_bytes
+                    )
+                    if http_cache_path
+                    else None
+                ),
+                # pools that overlap share the budget of their common tokens
+                share_token=partial(CLIENT_REGISTRY.share_token, self._base_url),
+            )
+            if app_id is not None:
+                connection.authenticate_as_app(
+                    base_url=self._base_url,
+                    headers=self.default_headers,
+                    app_id=app_id,
+                    private_key=app_private_key,
+                    private_key_path=app_private_key_path,
+                    installation_id=app_installation_id,
+                    refresh_margin=app_token_refresh_margin_seconds,
+                )
+            return connection
+
+        # every client for the same host and credentials shares one connection
+        # pool and one rate budget
+        self._connection_key: ConnectionKey = (
+            self._base_url,
+            (
+                (f"app:{app_id}",)
+                if app_id is not None
+                else tuple(tokens) or (auth_token,)
             ),
-            1,
         )
-        logger.info("GitHub REST RateLimit set to %s", self._rate_limit)
-        self._rate_limiter = MovingWindowRateLimiter(self.limit_storage)
-        self._session = httpx.AsyncClient()
+        self._shared = CLIENT_REGISTRY.acquire(self._connection_key, connect)
+        self._closed = False
+        # summed over requests, so it exceeds wall time when they wait together
+        self.rate_limit_wait_seconds = 0.0
 
         max_retry_wait_seconds = (
             DEFAULT_MAX_RETRY_WAIT_SECONDS
@@ -136,8 +378,8 @@ class GithubRestApiClient:
             else max_retry_wait_seconds
         )
         self._retryer = AsyncRetrying(
-            wait=wait_random_exponential(
-                max=max_retry_wait_seconds,
+            wait=_backoff_unless_rate_limited(
+                wait_random_exponential(max=max_retry_wait_seconds)
             ),
             stop=stop_after_attempt(self.max_retries),
             retry=retry_if_exception_type((RateLimitedError, httpx.TransportError)),
@@ -152,23 +394,46 @@ class GithubRestApiClient:
 
     @property
     def session(self) -> httpx.AsyncClient:
-        return self._session
+        return self._shared.session
 
     @property
-    def rate_limiter(self) -> RateLimiter:
-        return self._rate_limiter
+    def rate_limiter(self) -> GcraRateLimiter | None:
+        """The local limiter of the first token, or None when the server does not
+        limit requests."""
+        return self._shared.rate_limiter
 
     @property
-    def rate_limit(self) -> RateLimitItem:
-        return self._rate_limit
+    def tokens(self) -> TokenPool:
+        return self._shared.tokens
 
     @property
-    def max_retries(self) -> int:
-        return self._max_retries
+    def pause_gate(self) -> PauseGate:
+        return self._shared.pause_gate
+
+    @property
+    def rate_limit_per_minute(self) -> int:
+        return self._shared.rate_limit_per_minute
+
+    @property
+    def max_page_fan_out(self) -> int:
+        return self._max_page_fan_out
+
+    @property
+    def page_order(self) -> enums.ResultOrder:
+        return self._page_order
+
+    @property
+    def page_prefetch(self) -> int:
+        """How many pages of a cursor based listing are fetched ahead."""
+        return self._page_prefetch
 
     @property
-    def limit_storage(self) -> MemoryStorage:
-        return self._limit_storage
+    def http_cache(self) -> ConditionalRequestCache | None:
+        return self._shared.http_cache
+
+    @property
+    def max_retries(self) -> int:
+        return self._max_retries
 
     @property
     def default_headers(self) -> httpx.Headers:
@@ -190,6 +455,117 @@ class GithubRestApiClient:
     def is_default_hostname(self) -> bool:
         return self._is_default_hostname
 
+    async def aclose(self) -> None:
+        """Release the shared connection; the last client to go closes it."""
+        if self._closed:
+            return
+        self._closed = True
+        await CLIENT_REGISTRY.release(self._connection_key)
+
+    async def _probe_rate_limit(self) -> None:
+        """Ask the server for the current budget of every token before the first
+        request.
+
+        https://docs.github.com/en/enterprise-server@3.12/rest/rate-limit/rate-limit?apiVersion=2022-11-28#get-rate-limit-status-for-the-authenticated-user
+
+        Accessing this endpoint does not count against the REST API rate limit.
+        """
+        tokens = list(self.tokens)
+        if self._shared.app is not None:
+            # other installations learn their budget from the response headers
+            try:
+                tokens = [await self._shared.app.token_for(None)]
+            except httpx.HTTPError as e:
+                logger.warning("Unable to authenticate as GitHub App: %s", e)
+                return
+        await asyncio.gather(*(self._probe_token(token) for token in tokens))
+
+    async def _probe_token(self, token: PooledToken) -> None:
+        try:
+            response = await self.session.get(
+                f"{self.base_url}/rate_limit", headers=self._headers_for(token)
+            )
+            if response.status_code == httpx.codes.NOT_FOUND:
+                # GHES answers 404 when rate limiting is disabled on the instance
+                if self.rate_limiter is not None:
+                    logger.info("GitHub REST rate limiting is disabled on the server.")
+                self._shared.disable_rate_limiting()
+                return
+            response.raise_for_status()
+            budget = RateLimitBudget.from_json(response.json())
+        except httpx.HTTPError as e:
+            _fetch_problem("rate limit status", e)
+            return
+        except ValueError:
+            logger.warning("Unable to read rate limit status: %s", response.text)
+            return
+
+        if budget:
+            self._pace_to_budget(token, budget)
+
+    def _pace_to_budget(self, token: PooledToken, budget: RateLimitBudget) -> None:
+        """Spread the remaining server budget of a token evenly until it resets."""
+        if budget.resource != CORE_RESOURCE:
+            return
+        token.observe(budget)
+        limiter = token.rate_limiter
+        if limiter is None:
+            return
+
+        window = budget.seconds_until_reset()
+        if budget.remaining <= 0:
+            logger.warning(
+                "GitHub REST RateLimit exhausted for %.0fs%s",
+                window,
+                f" (token {self._token_index(token)})" if len(self.tokens) > 1 else "",
+            )
+            limiter.update(emission_interval=limiter.emission_interval, burst=1)
+            limiter.defer(window)
+            return
+
+        limiter.update(
+            emission_interval=max(
+                window / budget.remaining, self._shared.min_emission_interval
+            ),
+            burst=min(self._shared.rate_limit_burst, budget.remaining),
+        )
+        logger.debug(
+            "GitHub REST RateLimit %s/%s used, %s remaining for %.0fs",
+            budget.used,
+            budget.limit,
+            budget.remaining,
+            window,
+        )
+
+    def _token_index(self, token: PooledToken) -> int:
+        return list(self.tokens).index(token)
+
+    def _headers_for(self, token: PooledToken) -> httpx.Headers:
+        headers = httpx.Headers(self.default_headers)
+        headers["Authorization"] = f"Bearer {token.token}"
+        return headers
+
+    async def _wait_for_rate_limit(self, account: str | None) -> PooledToken:
+        """Wait for a slot and return the token to send the request with."""
+        started = time.monotonic()
+        try:
+            return await self._acquire_token(account)
+        finally:
+            self.rate_limit_wait_seconds += time.monotonic() - started
+
+    async def _acquire_token(self, account: str | None) -> PooledToken:
+        await self._shared.probe_rate_limit_once(self._probe_rate_limit)
+        await self.pause_gate.wait()
+        if self._shared.app is not None:
+            # each installation draws on its own budget
+            token = await self._shared.app.token_for(account)
+            await token.acquire()
+        else:
+            token = await self.tokens.acquire()
+        # the server may have asked us to back off while we waited for a slot
+        await self.pause_gate.wait()
+        return token
+
     async def _get(
         self,
         url: str,
@@ -201,21 +577,58 @@ class GithubRestApiClient:
 
         DO NOT CALL THIS DIRECTLY. ONLY USE _get_retrying
         """
-        can_try_hit: bool = await self.rate_limiter.test(self.rate_limit)
-        if not can_try_hit:
-            raise RateLimitedError(url)
-        can_hit: bool = await self.rate_limiter.hit(self.rate_limit)
-        if not can_hit:
-            raise RateLimitedError(url)
-
         merged_headers = httpx.Headers(self.default_headers)
         merged_headers.update(headers)
-        response = await self.session.get(
+        request = self.session.build_request(
+            "GET",
             url,
             params=params,
             headers=merged_headers,
         )
+        token = await self._wait_for_rate_limit(_account_of(request.url, self.base_url))
+        request.headers["Authorization"] = f"Bearer {token.token}"
+        identity = token.identity or self._shared.cache_identity
+        cached = self.http_cache.get(request, identity) if self.http_cache else None
+        if cached:
+            request.headers.update(cached.validators())
+
+        response = await self.session.send(request)
+        budget = RateLimitBudget.from_headers(response.headers)
+        if budget:
+            self._pace_to_budget(token, budget)
+        pause = _rate_limited_pause(response)
+        if pause is not None:
+            if (
+                budget
+                and budget.remaining <= 0
+                and (self._shared.app is not None or self.tokens.has_available())
+            ):
+                # only this token is exhausted: it is parked and the other
+                # tokens (or installations) carry on
+                logger.info(
+                    "%s %s - %s - parking token %s for %.0fs",
+                    response.status_code,
+                    response.reason_phrase,
+                    response.request.url.path,
+                    self._token_index(token),
+                    pause,
+                )
+                raise RateLimitedError(url)
+            logger.warning(
+                "%s %s - %s - pausing all requests for %.0fs",
+                response.status_code,
+                response.reason_phrase,
+                response.request.url.path,
+                pause,
+            )
+            self.pause_gate.close_for(pause)
+            raise RateLimitedError(url)
+        if cached and response.status_code == httpx.codes.NOT_MODIFIED:
+            logger.debug("Not modified, using cached %s", request.url)
+            return cached.to_response(request)
         response.raise_for_status()
+        if self.http_cache:
+            self.http_cache.put(response, identity)
         return response
 
     async def _get_retrying(
@@ -226,34 +639,146 @@ class GithubRestApiClient:
     ) -> httpx.Response:
         return await self.retryer(self._get, url, params, headers)
 
+    async def _get_page(
+        self,
+        url: str | httpx.URL,
+        params: types.QueryParamTypes | None = None,
+        headers: types.HeaderTypes | None = None,
+    ) -> httpx.Response | None:
+        if "&page=100" in str(url):
+            logger.warning(
+                "The GithubAPI has reached the maximum page size "
+                "of 100. The returned data may be incomplete for request: %s",
+                url,
+            )
+        return await self._get_retrying(url, headers=headers, params=params)
+
     async def _get_paginated(
         self,
         path: str,
         params: types.QueryParamTypes | None = None,
         headers: types.HeaderTypes | None = None,
+        *,
+        sequential_pages: bool = False,
     ) -> AsyncGenerator[types.JSONType]:
+        """Yield the items of every page of a listing.
+
+        With ``sequential_pages`` each page is only requested once the previous
+        one is used up, so a caller that stops early wastes no requests.
+        """
         url = f"{self.base_url}/{path}"
         query_params = {"per_page": self.per_page}
         if params:
             query_params.update(params)
 
-        while url is not None:
-            if "&page=100" in url:
-                logger.warning(
-                    "The GithubAPI has reached the maximum page size "
-                    "of 100. The returned data may be incomplete for request: %s",
-                    url,
-                )
+        response = await self._get_page(url, query_params, headers)
+        if response is None:
+            return
 
-            response = await self._get_retrying(
-                url, headers=headers, params=query_params
-            )
-            if response is None:
-                return
+        async with self._remaining_pages(
+            response, query_params, headers, sequential=sequential_pages
+        ) as pages:
             for tag in response.json():
                 yield tag
+            async for page in pages:
+                for tag in page.json():
+                    yield tag
+
+    def _remaining_pages(
+        self,
+        first_page: httpx.Response,
+        params: types.QueryParamTypes | None,
+        headers: types.HeaderTypes | None,
+        *,
+        sequential: bool = False,
+    ) -> AbstractAsyncContextManager[AsyncIterator[httpx.Response]]:
+        page_urls = _remaining_page_urls(first_page)
+        if page_urls and self.max_page_fan_out > 1 and not sequential:
+            pages = self._fan_out_pages(page_urls, params, headers)
+        else:
+            pages = self._follow_next_pages(first_page, params, headers)
+
+        if self.page_prefetch > 0 and not sequential:
+            return self._read_ahead(pages)
+        return aclosing(pages)
+
+    async def _fan_out_pages(
+        self,
+        page_urls: list[httpx.URL],
+        params: types.QueryParamTypes | None,
+        headers: types.HeaderTypes | None,
+    ) -> AsyncGenerator[httpx.Response]:
+        """Request pages whose numbers are known up front concurrently."""
+        async with aclosing(
+            bounded_map(
+                lambda page_url: self._get_page(page_url, params, headers),
+                page_urls,
+                limit=self.max_page_fan_out,
+                order=self.page_order,
+            )
+        ) as pages:
+            async for page in pages:
+                if page is None:
+                    return
+                yield page
+
+    async def _follow_next_pages(
+        self,
+        page: httpx.Response,
+        params: types.QueryParamTypes | None,
+        headers: types.HeaderTypes | None,
+    ) -> AsyncGenerator[httpx.Response]:
+        while (url := _next_page_url(page)) is not None:
+            page = await self._get_page(url, params, headers)
+            if page is None:
+                return
+            yield page
+
+    @asynccontextmanager
+    async def _read_ahead(
+        self,
+        pages: AsyncGenerator[httpx.Response],
+    ) -> AsyncGenerator[AsyncIterator[httpx.Response]]:
+        """Pull pages in a background task while the caller works on earlier ones.
+
+        The next request goes out as soon as its link is known rather than once
+        the caller has consumed the previous page, and up to page_prefetch pages
+        are kept ready. The background task is cancelled when the caller leaves.
+        """
+        ready: asyncio.Queue[httpx.Response | Exception | None] = asyncio.Queue()
+        # a page counts against page_prefetch from the moment it is requested
+        # until the caller takes it
+        slots = asyncio.Semaphore(self.page_prefetch)
+
+        async def produce() -> None:
+            try:
+                async with aclosing(pages):
+                    while True:
+                        await slots.acquire()
+                        try:
+                            page = await anext(pages)
+                        except StopAsyncIteration:
+                            break
+                        ready.put_nowait(page)
+            except Exception as e:  # handed over to the caller by drain()
+                ready.put_nowait(e)
+                return
+            ready.put_nowait(None)
+
+        async def drain() -> AsyncGenerator[httpx.Response]:
+            while (page := await ready.get()) is not None:
+                if isinstance(page, Exception):
+                    raise page
+                slots.release()
+                yield page
 
-            url = response.links.get("next", {}).get("url")
+        producer = asyncio.ensure_future(produce())
+        try:
+            yield drain()
+        finally:
+            producer.cancel()
+            # wait for it to close the pages and their response
+            await asyncio.gather(producer, return_exceptions=True)
 
     async def _get_item(
         self,
@@ -273,9 +798,16 @@ class GithubRestApiClient:
         *,
         org_login: str,
         repo_type: enums.OrgRepoType | None = None,
+        sort: enums.RepoSort | None = None,
+        direction: enums.SortDirection | None = None,
+        sequential_pages: bool = False,
+        raise_errors: bool = False,
     ) -> AsyncGenerator[types.GithubRepo]:
         """Fetches repositories for the specified organization.
 
+        With raise_errors the error that ends the listing early is raised after
+        it is logged, so that it is not mistaken for the end of the listing.
+
         Note: In order to see the security_and_analysis block for a repository you
         must have admin permissions for the repository or be an owner or security
         manager for the organization that owns the repository.
@@ -289,13 +821,21 @@ class GithubRestApiClient:
             params = {}
             if repo_type:
                 params["type"] = repo_type
+            if sort:
+                params["sort"] = sort
+            if direction:
+                params["direction"] = direction
             async for response in self._get_paginated(
-                f"orgs/{org_login}/repos", params=params
+                f"orgs/{org_login}/repos",
+                params=params,
+                sequential_pages=sequential_pages,
             ):
                 yield response
 
         except httpx.HTTPError as e:
             _fetch_problem(f"repos for org {org_login}", e)
+            if raise_errors:
+                raise
 
     async def fetch_members_for_org(
         self,
@@ -324,6 +864,30 @@ class GithubRestApiClient:
         except httpx.HTTPError as e:
             _fetch_problem(f"members for org {org_login}", e)
 
+    async def fetch_outside_collaborators_for_org(
+        self, org_login: str
+    ) -> list[types.GithubUser] | None:
+        """Fetch every user who is a collaborator on at least one repository of
+        the organization without being a member of it.
+
+        Returns None if they cannot be listed, e.g. because org_login is a user
+        or the token is not an organization owner's.
+
+        https://docs.github.com/en/enterprise-server@3.12/rest/orgs/outside-collaborators?apiVersion=2022-11-28#list-outside-collaborators-for-an-organization
+
+        Fine-grained access tokens require the "Members" organization permissions (read)
+        """
+        try:
+            return [
+                user
+                async for user in self._get_paginated(
+                    f"orgs/{org_login}/outside_collaborators"
+                )
+            ]
+        except httpx.HTTPError as e:
+            _fetch_problem(f"outside collaborators for org {org_login}", e)
+            return None
+
     async def fetch_all_organizations(self) -> AsyncGenerator[types.GithubOrg]:
         """Fetches all organizations, in the order that they were created.
 
@@ -398,9 +962,13 @@ class GithubRestApiClient:
         *,
         owner_login: str,
         repo_name: str,
+        raise_errors: bool = False,
     ) -> AsyncGenerator[str]:
         """Fetch languages for the specified repository.
 
+        With raise_errors an error is raised after it is logged, so that it is
+        not mistaken for a repository without languages.
+
         https://docs.github.com/en/enterprise-server@3.12/rest/repos/repos?apiVersion=2022-11-28#list-repository-languages
 
         Fine-grained access tokens require the "Metadata" repository permissions (read).
@@ -414,15 +982,21 @@ class GithubRestApiClient:
 
         except httpx.HTTPError as e:
             _fetch_problem(f"languages for repo {owner_login}/{repo_name}", e)
+            if raise_errors:
+                raise
 
     async def fetch_webhooks_for_repo(
         self,
         *,
         owner_login: str,
         repo_name: str,
+        raise_errors: bool = False,
     ) -> AsyncGenerator[types.Webhook]:
         """Try to get types.webhook data for this repo.
 
+        With raise_errors an error is raised after it is logged, so that it is
+        not mistaken for a repository without webhooks.
+
         https://docs.github.com/en/enterprise-server@3.12/rest/repos/webhooks?apiVersion=2022-11-28#list-repository-webhooks
 
         Fine-grained access tokens require the "Webhooks" repository permissions (read).
@@ -435,6 +1009,8 @@ class GithubRestApiClient:
 
         except httpx.HTTPError as e:
             _fetch_problem(f"webhooks for repo {owner_login}/{repo_name}", e)
+            if raise_errors:
+                raise
 
     async def fetch_collaborators_for_repo(
         self,
@@ -442,9 +1018,13 @@ class GithubRestApiClient:
         owner_login: str,
         repo_name: str,
         affiliation: enums.CollaboratorAffiliation,
+        raise_errors: bool = False,
     ) -> AsyncGenerator[types.GithubUser]:
         """Try to get collaborator data for this repo.
 
+        With raise_errors an error is raised after it is logged, so that it is
+        not mistaken for a repository without collaborators.
+
         For organization-owned repositories, the list of collaborators includes
         outside collaborators, organization members that are direct collaborators,
         organization members with access through team memberships, organization
@@ -471,6 +1051,8 @@ class GithubRestApiClient:
 
         except httpx.HTTPError as e:
             _fetch_problem(f"collaborators for repo {owner_login}/{repo_name}", e)
+            if raise_errors:
+                raise
 
     async def fetch_all_public_repos(self) -> AsyncGenerator[types.GithubRepo]:
         """
@@ -542,7 +1124,8 @@ class GithubRestApiClient:
     async def fetch_members_for_team(
         self,
         *,
-        team_id: int,
+        org_login: str,
+        slug: str,
         role: enums.TeamMemberRole | None = None,
     ) -> AsyncGenerator[types.GithubUser]:
         """Fetch all users that have a given role for a specified team.
@@ -554,18 +1137,18 @@ class GithubRestApiClient:
 
         To list members in a team, the team must be visible to the authenticated user.
 
-        https://docs.github.com/en/enterprise-server@3.12/rest/teams/members?apiVersion=2022-11-28#list-team-members-legacy
+        https://docs.github.com/en/enterprise-server@3.12/rest/teams/members?apiVersion=2022-11-28#list-team-members
         """
         try:
             params = {}
             if role:
                 params["role"] = role
             async for member in self._get_paginated(
-                f"teams/{team_id}/members", params=params
+                f"orgs/{org_login}/teams/{slug}/members", params=params
             ):
                 yield member
         except httpx.HTTPError as e:
-            _fetch_problem(f"members for team {team_id}", e)
+            _fetch_problem(f"members for team {org_login}/{slug}", e)
 
     async def fetch_repos_for_team(
         self,
@@ -618,15 +1201,46 @@ class GithubRestApiClient:
         except httpx.HTTPError as e:
             _fetch_problem(f"teams for repo {owner_login}/{repo_name}", e)
 
+    async def fetch_protected_branches_for_repo(
+        self, *, owner_login: str, repo_name: str, raise_errors: bool = False
+    ) -> list[types.GithubBranch] | None:
+        """Fetches the protected branches of a repository.
+
+        Returns None if they cannot be listed, so that an error is not mistaken
+        for a repository without protected branches, or with raise_errors raises
+        the error after it is logged.
+
+        https://docs.github.com/en/enterprise-server@3.12/rest/branches/branches?apiVersion=2022-11-28#list-branches
+
+        Fine-grained access tokens require the "Contents" repository permissions (read)
+        """
+        try:
+            return [
+                branch
+                async for branch in self._get_paginated(
+                    f"repos/{owner_login}/{repo_name}/branches",
+                    params={"protected": "true"},
+                )
+            ]
+        except httpx.HTTPError as e:
+            _fetch_problem(f"protected branches for repo {owner_login}/{repo_name}", e)
+            if raise_errors:
+                raise
+            return None
+
     async def fetch_branch_protection(
         self,
         *,
         owner_login: str,
         repo_name: str,
         branch: str,
+        raise_errors: bool = False,
     ) -> types.BranchProtection | None:
         """Fetches the branch protection for a given branch.
 
+        Returns None if the branch is not protected. Other errors are raised
+        after they are logged with raise_errors, and return None otherwise.
+
         https://docs.github.com/en/enterprise-server@3.12/rest/branches/branch-protection?apiVersion=2022-11-28#get-branch-protection
         """
 
@@ -651,4 +1265,6 @@ class GithubRestApiClient:
                         f"repo {owner_login}/{repo_name}",
                         e,
                     )
+                    if raise_errors:
+                        raise
             return None
@@ -0,0 +1,186 @@
+"""httpcache
+
+An on-disk cache of GET responses that are revalidated with conditional requests.
+
+GitHub does not count `304 Not Modified` answers against the rate limit, so
+replaying a cached body after a successful revalidation saves both time and
+budget on repeated crawls.
+https://docs.github.com/en/enterprise-server@3.12/rest/using-the-rest-api/best-practices-for-using-the-rest-api?apiVersion=2022-11-28#use-conditional-requests-if-appropriate
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+from nodestream_github.logging import get_plugin_logger
+
+DEFAULT_HTTP_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 256 MiB
+# only what is needed to replay a page, including its pagination links
+_CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link")
+# shrink to this share of the maximum so eviction does not run on every write
+_EVICTION_TARGET = 0.9
+
+logger = get_plugin_logger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    etag: str | None
+    last_modified: str | None
+    headers: dict[str, str]
+    body: bytes
+
+    def validators(self) -> dict[str, str]:
+        """Headers that turn the next request into a conditional request."""
+        validators = {}
+        if self.etag:
+            validators["If-None-Match"] = self.etag
+        if self.last_modified:
+            validators["If-Modified-Since"] = self.last_modified
+        return validators
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            httpx.codes.OK,
+            headers=self.headers,
+            content=self.body,
+            request=request,
+        )
+
+
+class ConditionalRequestCache:
+    """Stores ETag, Last-Modified and a compressed body per request in SQLite.
+
+    Entries are evicted least recently used first once the stored bodies grow
+    beyond ``max_bytes``.
+    """
+
+    def __init__(self, path: str | Path, *, max_bytes: int | None = None):
+        if max_bytes is None:
+            max_bytes = DEFAULT_HTTP_CACHE_MAX_BYTES
+        elif max_bytes < 1:
+            msg = "http_cache_max_bytes must be an integer greater than 0"
+            raise ValueError(msg)
+
+        self._max_bytes = max_bytes
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key BLOB PRIMARY KEY,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " headers BLOB NOT NULL,"
+            " body BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " accessed REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+        )
+        (self._size,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @property
+    def size(self) -> int:
+        """Bytes taken up by the stored (compressed) bodies and headers."""
+        return self._size
+
+    @staticmethod
+    def key(request: httpx.Request, identity: str) -> bytes:
+        """Key a request by its full URL and the identity of its credentials.
+
+        Different credentials can see different data for the same URL, so they
+        are part of the (hashed) key. The identity is a stable name rather than
+        the bearer token, which changes whenever an installation token is
+        reissued.
+        """
+        digest = hashlib.sha256(str(request.url).encode())
+        digest.update(b"\0")
+        digest.update(identity.encode())
+        return digest.digest()
+
+    def get(self, request: httpx.Request, identity: str) -> CachedResponse | None:
+        key = self.key(request, identity)
+        row = self._db.execute(
+            "SELECT etag, last_modified, headers, body FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        self._db.execute(
+            "UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key)
+        )
+        etag, last_modified, headers, body = row
+        return CachedResponse(
+            etag=etag,
+            last_modified=last_modified,
+            headers=json.loads(zlib.decompress(headers)),
+            body=zlib.decompress(body),
+        )
+
+    def put(self, response: httpx.Response, identity: str) -> None:
+        """Store a successful response if it can be revalidated later."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not response.is_success or not (etag or last_modified):
+            return
+
+        headers = zlib.compress(
+            json.dumps({
+                name: response.headers[name]
+                for name in _CACHED_HEADERS
+                if name in response.headers
+            }).encode()
+        )
+        body = zlib.compress(response.content)
+        size = len(headers) + len(body)
+        if size > self.max_bytes:
+            return
+
+        key = self.key(response.request, identity)
+        (previous,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses"
+            " (key, etag, last_modified, headers, body, size, accessed)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, etag, last_modified, headers, body, size, time.time()),
+        )
+        self._size += size - previous
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        target = self.max_bytes * _EVICTION_TARGET
+        evicted = 0
+        rows = self._db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed"
+        ).fetchall()
+        for key, size in rows:
+            if self._size <= target:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._size -= size
+            evicted += 1
+        logger.debug("Evicted %s responses from the HTTP cache", evicted)
+
+    def close(self) -> None:
+        self._db.close()
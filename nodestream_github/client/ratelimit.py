@@ -0,0 +1,172 @@
+"""ratelimit
+
+Client-side request pacing for the GitHub REST API.
+"""
+
+import asyncio
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Self
+
+import httpx
+
+CORE_RESOURCE = "core"
+
+
+def retry_after_seconds(headers: httpx.Headers) -> float | None:
+    """Read a Retry-After header given either in seconds or as an HTTP date."""
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (moment - datetime.now(tz=UTC)).total_seconds())
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitBudget:
+    """A snapshot of the server side rate limit for one resource."""
+
+    limit: int
+    remaining: int
+    reset: float  # epoch seconds
+    used: int = 0
+    resource: str = CORE_RESOURCE
+
+    def seconds_until_reset(self, now: float | None = None) -> float:
+        return max(0.0, self.reset - (time.time() if now is None else now))
+
+    @classmethod
+    def from_headers(cls, headers: httpx.Headers) -> Self | None:
+        """Read the X-RateLimit-* headers, if the server sent them."""
+        try:
+            limit = int(headers["X-RateLimit-Limit"])
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset = float(headers["X-RateLimit-Reset"])
+        except (KeyError, ValueError):
+            return None
+        try:
+            used = int(headers.get("X-RateLimit-Used", limit - remaining))
+        except ValueError:
+            used = limit - remaining
+        return cls(
+            limit=limit,
+            remaining=remaining,
+            reset=reset,
+            used=used,
+            resource=headers.get("X-RateLimit-Resource", CORE_RESOURCE),
+        )
+
+    @classmethod
+    def from_json(
+        cls, payload: Mapping[str, Any], resource: str = CORE_RESOURCE
+    ) -> Self | None:
+        """Read one resource from the body of GET /rate_limit."""
+        try:
+            data = payload["resources"][resource]
+            return cls(
+                limit=int(data["limit"]),
+                remaining=int(data["remaining"]),
+                reset=float(data["reset"]),
+                used=int(data.get("used", data["limit"] - data["remaining"])),
+                resource=resource,
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+class GcraRateLimiter:
+    """Generic Cell Rate Algorithm limiter.
+
+    The only state kept is the theoretical arrival time (TAT) of the next request,
+    so every call is O(1). Reserving a slot is synchronous and therefore atomic
+    with respect to the event loop, which means callers are granted slots in the
+    order they asked for them and each one sleeps exactly until its slot opens.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        period: float = 60.0,
+        burst: int = 1,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            msg = "rate must be greater than 0"
+            raise ValueError(msg)
+        if burst < 1:
+            msg = "burst must be an integer greater than 0"
+            raise ValueError(msg)
+
+        self._emission_interval = period / rate
+        self._burst = burst
+        self._clock = clock
+        self._tat = clock()
+
+    @property
+    def emission_interval(self) -> float:
+        """Seconds between two requests once the burst allowance is spent."""
+        return self._emission_interval
+
+    @property
+    def burst(self) -> int:
+        return self._burst
+
+    def update(self, *, emission_interval: float, burst: int) -> None:
+        """Change the pacing for every slot that has not been reserved yet."""
+        self._emission_interval = emission_interval
+        self._burst = max(1, burst)
+
+    def defer(self, seconds: float) -> None:
+        """Hold back every new reservation for the next ``seconds``."""
+        self._tat = max(self._tat, self._clock() + seconds)
+
+    def reserve(self) -> float:
+        """Claim the next free slot and return how many seconds until it opens."""
+        now = self._clock()
+        tat = max(self._tat, now)
+        tolerance = self._emission_interval * (self._burst - 1)
+        self._tat = tat + self._emission_interval
+        return max(0.0, tat - tolerance - now)
+
+    async def acquire(self) -> None:
+        """Wait until the caller is allowed to send one request."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class PauseGate:
+    """A gate shared by every request of a client.
+
+    While the server asks us to back off the gate is closed and every request
+    waits in front of it; closing it again while it is closed only extends the
+    pause.
+    """
+
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._open_at = clock()
+
+    @property
+    def is_closed(self) -> bool:
+        return self._clock() < self._open_at
+
+    def close_for(self, seconds: float) -> None:
+        self._open_at = max(self._open_at, self._clock() + seconds)
+
+    async def wait(self) -> None:
+        """Return once the gate is open."""
+        # not an Event: the deadline may move further out while we sleep
+        while (delay := self._open_at - self._clock()) > 0:  # noqa: ASYNC110
+            await asyncio.sleep(delay)
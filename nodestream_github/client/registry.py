@@ -0,0 +1,203 @@
+"""registry
+
+Process-wide registry of the connections shared by every client for the same
+GitHub host and credentials.
+
+Each extractor and transformer builds its own client, but all clients for one
+(host, tokens) pair share a single connection pool. The rate budget and local
+limiter of every token are shared by every connection to the host that uses
+it, so several pipelines running in one process together stay within the
+limit, even when their token pools only partly overlap.
+"""
+
+import asyncio
+import hashlib
+from collections import Counter
+from collections.abc import Callable, Coroutine, Sequence
+from functools import partial
+from typing import Any
+
+import httpx
+
+from nodestream_github.logging import get_plugin_logger
+
+from .appauth import GithubAppAuth
+from .httpcache import ConditionalRequestCache
+from .ratelimit import GcraRateLimiter, PauseGate
+from .tokenpool import PooledToken, TokenPool
+
+ConnectionKey = tuple[str, tuple[str | None, ...]]
+TokenKey = tuple[str, str | None]
+# hands out the shared state of a static token, creating it if needed
+ShareToken = Callable[[str | None, Callable[[], PooledToken]], PooledToken]
+
+logger = get_plugin_logger(__name__)
+
+
+class SharedConnection:
+    """The session and rate limit state shared by the clients of one key."""
+
+    def __init__(
+        self,
+        *,
+        session: httpx.AsyncClient,
+        auth_tokens: Sequence[str | None],
+        rate_limit_per_minute: int,
+        rate_limit_burst: int,
+        min_emission_interval: float,
+        http_cache: ConditionalRequestCache | None = None,
+        share_token: ShareToken | None = None,
+    ):
+        self.session = session
+        self.rate_limit_per_minute = rate_limit_per_minute
+        self.rate_limit_burst = rate_limit_burst
+        # an explicitly configured rate stays a ceiling once the server budget
+        # takes over the pacing
+        self.min_emission_interval = min_emission_interval
+        self.rate_limiting = True
+        self.tokens = TokenPool()
+        # the pool rotates between its tokens, so cached responses are shared by
+        # all of them; the server still revalidates each with the token it gets
+        self.cache_identity = (
+            "tokens:"
+            + hashlib.sha256(
+                "\0".join(sorted(token or "" for token in auth_tokens)).encode()
+            ).hexdigest()
+        )
+        # the static tokens whose state came from share_token
+        self.shared_tokens: list[str | None] = []
+        for token in auth_tokens:
+            if share_token is None:
+                self.new_token(token)
+            else:
+                self.tokens.add(share_token(token, partial(self._pooled, token)))
+                self.shared_tokens.append(token)
+        # set when authenticating as a GitHub App installation
+        self.app: GithubAppAuth | None = None
+        self.rate_limit_probe: asyncio.Future[None] | None = None
+        self.pause_gate = PauseGate()
+        self.http_cache = http_cache
+        self.references = 0
+
+    @property
+    def rate_limiter(self) -> GcraRateLimiter | None:
+        """The limiter of the first token."""
+        return next((token.rate_limiter for token in self.tokens), None)
+
+    def _pooled(self, token: str | None) -> PooledToken:
+        """A token with the configured rate and burst."""
+        return PooledToken(
+            token,
+            (
+                GcraRateLimiter(self.rate_limit_per_minute, 60, self.rate_limit_burst)
+                if self.rate_limiting
+                else None
+            ),
+        )
+
+    def new_token(self, token: str | None = None) -> PooledToken:
+        """Add a token of this connection alone to the pool."""
+        pooled = self._pooled(token)
+        self.tokens.add(pooled)
+        return pooled
+
+    def authenticate_as_app(
+        self, *, base_url: str, headers: httpx.Headers, **settings: Any
+    ) -> None:
+        """Send requests with installation tokens of a GitHub App."""
+        self.app = GithubAppAuth(
+            session=self.session,
+            base_url=base_url,
+            headers=headers,
+            new_token=self.new_token,
+            **settings,
+        )
+
+    def disable_rate_limiting(self) -> None:
+        self.rate_limiting = False
+        for token in self.tokens:
+            token.rate_limiter = None
+
+    async def probe_rate_limit_once(
+        self, probe: Callable[[], Coroutine[Any, Any, None]]
+    ) -> None:
+        """Run ``probe`` for the first caller; every other caller awaits its result."""
+        if self.rate_limit_probe is None:
+            self.rate_limit_probe = asyncio.ensure_future(probe())
+        # shielded so a cancelled caller cannot cancel the probe for everyone else
+        await asyncio.shield(self.rate_limit_probe)
+
+    async def aclose(self) -> None:
+        await self.session.aclose()
+        if self.http_cache:
+            self.http_cache.close()
+
+
+class ClientRegistry:
+    """Hands out one reference counted connection per (host, tokens), and the
+    state of every (host, token) to the connections that use it."""
+
+    def __init__(self):
+        self._connections: dict[ConnectionKey, SharedConnection] = {}
+        self._tokens: dict[TokenKey, PooledToken] = {}
+        self._token_references: Counter[TokenKey] = Counter()
+
+    def __contains__(self, key: ConnectionKey) -> bool:
+        return key in self._connections
+
+    def acquire(
+        self, key: ConnectionKey, connect: Callable[[], SharedConnection]
+    ) -> SharedConnection:
+        """Take a reference to the connection for ``key``, creating it if needed.
+
+        Only the first client for a key configures the connection; the
+        connection and rate limit settings of later clients are ignored.
+        """
+        connection = self._connections.get(key)
+        if connection is None:
+            connection = self._connections[key] = connect()
+        else:
+            logger.debug("Sharing the connection to %s", key[0])
+        connection.references += 1
+        return connection
+
+    def share_token(
+        self, base_url: str, token: str | None, create: Callable[[], PooledToken]
+    ) -> PooledToken:
+        """Take a reference to the budget and limiter of ``token`` on the host.
+
+        Only the first connection with the token configures its limiter.
+        """
+        key = (base_url, token)
+        pooled = self._tokens.get(key)
+        if pooled is None:
+            pooled = self._tokens[key] = create()
+        self._token_references[key] += 1
+        return pooled
+
+    def _release_token(self, key: TokenKey) -> None:
+        self._token_references[key] -= 1
+        if self._token_references[key] <= 0:
+            del self._token_references[key]
+            self._tokens.pop(key, None)
+
+    async def release(self, key: ConnectionKey) -> None:
+        """Drop a reference and close the connection once nobody uses it."""
+        connection = self._connections.get(key)
+        if connection is None:
+            return
+        connection.references -= 1
+        if connection.references <= 0:
+            del self._connections[key]
+            for token in connection.shared_tokens:
+                self._release_token((key[0], token))
+            await connection.aclose()
+
+    def clear(self) -> None:
+        """Forget every connection and token without closing them."""
+        self._connections.clear()
+        self._tokens.clear()
+        self._token_references.clear()
+
+
+CLIENT_REGISTRY = ClientRegistry()
@@ -0,0 +1,99 @@
+"""tokenpool
+
+Spread requests over several auth tokens, each with its own rate budget.
+
+GitHub limits requests per user, so a pool of tokens for different (service)
+accounts multiplies the budget a crawl can spend.
+"""
+
+import math
+import time
+from collections.abc import Callable, Iterable, Iterator
+
+from .ratelimit import GcraRateLimiter, RateLimitBudget
+
+
+class PooledToken:
+    """One auth token, its local limiter and the last budget the server sent."""
+
+    def __init__(
+        self,
+        token: str | None,
+        rate_limiter: GcraRateLimiter | None,
+        *,
+        identity: str | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.token = token
+        # a stable name for the credentials, while the token may be reissued
+        self.identity = identity
+        self.rate_limiter = rate_limiter
+        self.budget: RateLimitBudget | None = None
+        self.dispatched = 0
+        self._remaining: int | None = None
+        self._clock = clock
+
+    @property
+    def remaining(self) -> float:
+        """Requests left until the reset, infinite while the budget is unknown."""
+        if self.budget is None or self._remaining is None:
+            return math.inf
+        if self.budget.seconds_until_reset(self._clock()) <= 0:
+            return self.budget.limit
+        return self._remaining
+
+    def parked_for(self) -> float:
+        """Seconds until an exhausted token may be used again, 0 if it may now."""
+        if self.budget is None or self.remaining > 0:
+            return 0.0
+        return self.budget.seconds_until_reset(self._clock())
+
+    def observe(self, budget: RateLimitBudget) -> None:
+        self.budget = budget
+        self._remaining = budget.remaining
+
+    async def acquire(self) -> None:
+        """Wait until the limiter lets one more request through and count it
+        against the budget until the server reports back."""
+        self.dispatched += 1
+        if self._remaining is not None:
+            self._remaining -= 1
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+
+
+class TokenPool:
+    """Hands each request to the token with the most remaining budget.
+
+    Exhausted tokens are parked until their budget resets. Once every token is
+    exhausted the one that resets first is used, and its (deferred) limiter
+    holds the request back until then.
+    """
+
+    def __init__(self, tokens: Iterable[PooledToken] = ()):
+        self._tokens = list(tokens)
+
+    def __iter__(self) -> Iterator[PooledToken]:
+        return iter(self._tokens)
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def add(self, token: PooledToken) -> None:
+        self._tokens.append(token)
+
+    def has_available(self) -> bool:
+        return any(token.parked_for() <= 0 for token in self._tokens)
+
+    def choose(self) -> PooledToken:
+        available = [token for token in self._tokens if token.parked_for() <= 0]
+        if not available:
+            return min(self._tokens, key=PooledToken.parked_for)
+        # ties (e.g. unknown budgets) go to the token used least so far
+        return max(available, key=lambda token: (token.remaining, -token.dispatched))
+
+    async def acquire(self) -> PooledToken:
+        """Pick a token and wait until its limiter lets one more request through."""
+        token = self.choose()
+        await token.acquire()
+        return token
@@ -0,0 +1,84 @@
+"""collaborators
+
+List the collaborators of a repository with one request per repository page
+instead of two.
+
+Listing direct and outside collaborators separately paginates every repository
+twice. Direct collaborators include the outside ones, so with an index of each
+organization's outside collaborators, fetched once per organization, one direct
+listing can be classified locally into both affiliations.
+"""
+
+import asyncio
+from collections.abc import AsyncGenerator
+
+from .client import GithubRestApiClient
+from .logging import get_plugin_logger
+from .types import GithubUser
+from .types.enums import CollaboratorAffiliation
+
+logger = get_plugin_logger(__name__)
+
+
+class OutsideCollaboratorIndex:
+    """The logins of the outside collaborators of every organization seen."""
+
+    def __init__(self, client: GithubRestApiClient):
+        self.client = client
+        self._orgs: dict[str, asyncio.Future[frozenset[str] | None]] = {}
+
+    async def outside_collaborators(self, org_login: str) -> frozenset[str] | None:
+        """The outside collaborators of ``org_login``, listed on first use.
+
+        None if they cannot be listed, e.g. because the owner is a user.
+        """
+        if org_login not in self._orgs:
+            self._orgs[org_login] = asyncio.ensure_future(self._index(org_login))
+        # shielded so a cancelled repo cannot cancel the listing for the others
+        return await asyncio.shield(self._orgs[org_login])
+
+    async def _index(self, org_login: str) -> frozenset[str] | None:
+        users = await self.client.fetch_outside_collaborators_for_org(org_login)
+        if users is None:
+            return None
+        logger.debug(
+            "indexed %s outside collaborators of org=%s", len(users), org_login
+        )
+        return frozenset(user["login"] for user in users)
+
+    async def fetch_collaborators_for_repo(
+        self, *, owner_login: str, repo_name: str, raise_errors: bool = False
+    ) -> AsyncGenerator[tuple[GithubUser, CollaboratorAffiliation]]:
+        """Yield the same collaborators and affiliations as listing the direct
+        and then the outside collaborators of the repository.
+
+        Falls back to the two listings if the owner has no outside collaborator
+        index.
+        """
+        outside = await self.outside_collaborators(owner_login)
+        if outside is None:
+            for affiliation in (
+                CollaboratorAffiliation.DIRECT,
+                CollaboratorAffiliation.OUTSIDE,
+            ):
+                async for user in self.client.fetch_collaborators_for_repo(
+                    owner_login=owner_login,
+                    repo_name=repo_name,
+                    affiliation=affiliation,
+                    raise_errors=raise_errors,
+                ):
+                    yield user, affiliation
+            return
+
+        outside_users = []
+        async for user in self.client.fetch_collaborators_for_repo(
+            owner_login=owner_login,
+            repo_name=repo_name,
+            affiliation=CollaboratorAffiliation.DIRECT,
+            raise_errors=raise_errors,
+        ):
+            yield user, CollaboratorAffiliation.DIRECT
+            if user["login"] in outside:
+                outside_users.append(user)
+        for user in outside_users:
+            yield user, CollaboratorAffiliation.OUTSIDE
@@ -0,0 +1,163 @@
+"""concurrency
+
+Helpers for running GitHub requests concurrently with a bounded window.
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Iterable,
+)
+from typing import TypeVar
+
+from .types.enums import ResultOrder
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def _as_async_iterator(
+    items: Iterable[T] | AsyncIterable[T],
+) -> AsyncGenerator[T]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+def concurrency_limit(value: int | None, *, default: int, name: str) -> int:
+    """The ``name`` option of an extractor, ``default`` when unset."""
+    if value is None:
+        return default
+    if value < 1:
+        msg = f"{name} must be an integer greater than 0"
+        raise ValueError(msg)
+    return value
+
+
+async def bounded_map(
+    func: Callable[[T], Awaitable[R]],
+    items: Iterable[T] | AsyncIterable[T],
+    *,
+    limit: int,
+    order: ResultOrder = ResultOrder.LISTING,
+) -> AsyncGenerator[R]:
+    """Run ``func`` for every item with at most ``limit`` calls in flight.
+
+    Results are yielded in the order of ``items``, or as soon as each call finishes
+    with ``ResultOrder.COMPLETION``. Finished results that have not been yielded
+    yet count against ``limit``, so memory stays bounded as well. If a call raises,
+    or the consumer stops early, every call still in flight is cancelled.
+    """
+    if limit < 1:
+        msg = "limit must be an integer greater than 0"
+        raise ValueError(msg)
+
+    iterator = _as_async_iterator(items)
+    in_flight: deque[asyncio.Future[R]] = deque()
+    exhausted = False
+
+    async def fill() -> None:
+        nonlocal exhausted
+        while not exhausted and len(in_flight) < limit:
+            try:
+                item = await anext(iterator)
+            except StopAsyncIteration:
+                exhausted = True
+            else:
+                in_flight.append(asyncio.ensure_future(func(item)))
+
+    try:
+        await fill()
+        while in_flight:
+            if order == ResultOrder.COMPLETION:
+                done, _ = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                future = next(iter(done))
+                in_flight.remove(future)
+            else:
+                future = in_flight.popleft()
+            result = await future
+            await fill()
+            yield result
+    finally:
+        for future in in_flight:
+            future.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+        await iterator.aclose()
+
+
+async def merge(
+    sources: Iterable[AsyncIterable[T]],
+    *,
+    limit: int | None = None,
+    buffer: int = 1,
+) -> AsyncGenerator[T]:
+    """Yield the items of several async iterables as soon as any of them has one.
+
+    At most ``limit`` sources (all of them if None) are consumed at once, started
+    in the order of ``sources``, and at most ``buffer`` items wait to be taken.
+    If a source raises, the error is raised here; if the consumer stops early or
+    fails, every source still running is cancelled.
+    """
+    if buffer < 1:
+        msg = "buffer must be an integer greater than 0"
+        raise ValueError(msg)
+    if limit is not None and limit < 1:
+        msg = "limit must be an integer greater than 0"
+        raise ValueError(msg)
+
+    # items arrive wrapped in a tuple, errors bare and the end as None
+    ready: asyncio.Queue[tuple[T] | BaseException | None] = asyncio.Queue()
+    # an item counts against buffer from the moment it is produced until taken
+    slots = asyncio.Semaphore(buffer)
+    running = asyncio.Semaphore(limit) if limit else None
+
+    async def consume(source: AsyncIterable[T]) -> None:
+        try:
+            async for item in source:
+                await slots.acquire()
+                ready.put_nowait((item,))
+        finally:
+            if running:
+                running.release()
+
+    def failed(task: asyncio.Task[None]) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            ready.put_nowait(task.exception())
+
+    async def produce() -> None:
+        tasks = []
+        try:
+            for source in sources:
+                if running:
+                    await running.acquire()
+                task = asyncio.ensure_future(consume(source))
+                task.add_done_callback(failed)
+                tasks.append(task)
+            await asyncio.gather(*tasks, return_exceptions=True)
+            ready.put_nowait(None)
+        except Exception as e:  # raised to the consumer
+            ready.put_nowait(e)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while (item := await ready.get()) is not None:
+            if isinstance(item, BaseException):
+                raise item
+            slots.release()
+            yield item[0]
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
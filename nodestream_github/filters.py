@@ -0,0 +1,151 @@
+"""filters
+
+Narrow down what the extractors fetch before any request is spent on it.
+
+Organizations are scoped with allow and deny lists of logins or glob patterns.
+An allow list without patterns is used as is, so the organizations of the whole
+instance are never listed. Repositories are filtered on their listing payload,
+before they are enriched.
+"""
+
+from collections.abc import AsyncGenerator, Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, time
+from fnmatch import fnmatchcase
+from typing import Any
+
+from .client import GithubRestApiClient
+from .logging import get_plugin_logger
+from .types import GithubOrgSummary, GithubRepo
+
+_GLOB_CHARS = frozenset("*?[")
+
+logger = get_plugin_logger(__name__)
+
+
+def _patterns(value: str | Iterable[str] | None) -> tuple[str, ...]:
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        value = [value]
+    # logins are case insensitive
+    return tuple(pattern.lower() for pattern in value)
+
+
+def _is_glob(pattern: str) -> bool:
+    return not _GLOB_CHARS.isdisjoint(pattern)
+
+
+def parse_timestamp(value: str | date | None) -> datetime | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif not isinstance(value, datetime):
+        # YAML loads unquoted dates as dates; a date means its midnight
+        value = datetime.combine(value, time.min)
+    # GitHub timestamps are in UTC
+    return value if value.tzinfo else value.replace(tzinfo=UTC)
+
+
+def _visibility(repo: GithubRepo) -> str:
+    # older servers only report the private flag
+    return repo.get("visibility") or ("private" if repo.get("private") else "public")
+
+
+@dataclass(frozen=True)
+class OrgScope:
+    """Which organizations to extract; all of them by default."""
+
+    orgs: tuple[str, ...] = ()
+    exclude_orgs: tuple[str, ...] = ()
+
+    @staticmethod
+    def of(
+        orgs: str | Iterable[str] | None = None,
+        exclude_orgs: str | Iterable[str] | None = None,
+    ) -> "OrgScope":
+        return OrgScope(orgs=_patterns(orgs), exclude_orgs=_patterns(exclude_orgs))
+
+    def includes(self, login: str) -> bool:
+        login = login.lower()
+        if any(fnmatchcase(login, pattern) for pattern in self.exclude_orgs):
+            return False
+        return not self.orgs or any(
+            fnmatchcase(login, pattern) for pattern in self.orgs
+        )
+
+    async def organizations(
+        self, client: GithubRestApiClient
+    ) -> AsyncGenerator[GithubOrgSummary]:
+        """The organizations in scope, listing every organization only if the
+        allow list is empty or has patterns."""
+        if self.orgs and not any(_is_glob(pattern) for pattern in self.orgs):
+            for login in dict.fromkeys(self.orgs):
+                if self.includes(login):
+                    yield {"login": login}
+            return
+
+        async for org in client.fetch_all_organizations():
+            if self.includes(org["login"]):
+                yield org
+            else:
+                logger.debug("skipped out of scope GithubOrg{login=%s}", org["login"])
+
+
+@dataclass(frozen=True)
+class RepoFilter:
+    """Keeps the repos whose listing fields match every condition that is set.
+
+    ``names`` and ``exclude_names`` are glob patterns matched against the name
+    and the full name of a repo.
+    """
+
+    archived: bool | None = None
+    disabled: bool | None = None
+    fork: bool | None = None
+    visibility: frozenset[str] = field(default_factory=frozenset)
+    pushed_after: datetime | None = None
+    names: tuple[str, ...] = ()
+    exclude_names: tuple[str, ...] = ()
+
+    @staticmethod
+    def from_dict(raw_dict: dict[str, Any]) -> "RepoFilter":
+        unknown = raw_dict.keys() - RepoFilter.__dataclass_fields__.keys()
+        if unknown:
+            msg = f"unknown repo filters: {', '.join(sorted(unknown))}"
+            raise ValueError(msg)
+        visibility = raw_dict.get("visibility") or ()
+        if isinstance(visibility, str):
+            visibility = [visibility]
+        return RepoFilter(
+            archived=raw_dict.get("archived"),
+            disabled=raw_dict.get("disabled"),
+            fork=raw_dict.get("fork"),
+            visibility=frozenset(visibility),
+            pushed_after=parse_timestamp(raw_dict.get("pushed_after")),
+            names=_patterns(raw_dict.get("names")),
+            exclude_names=_patterns(raw_dict.get("exclude_names")),
+        )
+
+    def _name_matches(self, repo: GithubRepo, patterns: tuple[str, ...]) -> bool:
+        names = (
+            str(repo.get("name", "")).lower(),
+            str(repo.get("full_name", "")).lower(),
+        )
+        return any(fnmatchcase(name, pattern) for pattern in patterns for name in names)
+
+    def keeps(self, repo: GithubRepo) -> bool:
+        for flag in ("archived", "disabled", "fork"):
+            wanted = getattr(self, flag)
+            if wanted is not None and bool(repo.get(flag)) != wanted:
+                return False
+        if self.visibility and _visibility(repo) not in self.visibility:
+            return False
+        if self.pushed_after is not None:
+            pushed_at = parse_timestamp(repo.get("pushed_at"))
+            if pushed_at is None or pushed_at <= self.pushed_after:
+                return False
+        if self.names and not self._name_matches(repo, self.names):
+            return False
+        return not self._name_matches(repo, self.exclude_names)
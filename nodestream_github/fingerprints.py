@@ -0,0 +1,100 @@
+"""fingerprints
+
+An on-disk store of the enrichments of every repository, keyed by node_id and
+reused while the repository's fingerprint has not changed.
+
+Most repositories have the same pushed_at, updated_at and permissions from one
+run to the next, so fetching their languages, webhooks and collaborators again
+would only spend rate budget. Changes that do not touch the fingerprint (a new
+webhook, say) are picked up once the stored enrichment reaches its maximum age.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from .logging import get_plugin_logger
+from .types import GithubRepo, JSONType
+
+DEFAULT_ENRICHMENT_MAX_AGE_SECONDS = 7 * 24 * 60 * 60  # 1 week
+# listing fields that change along with the enrichments
+_FINGERPRINT_FIELDS = ("pushed_at", "updated_at", "permissions")
+
+logger = get_plugin_logger(__name__)
+
+
+def fingerprint(repo: GithubRepo, enrichments: Iterable[str]) -> str:
+    """Hash the listing fields that change along with the enrichments, and which
+    enrichments are wanted, so a config change refreshes them as well."""
+    data = [repo.get(name) for name in _FINGERPRINT_FIELDS]
+    data.append(sorted(enrichments))
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+class EnrichmentStore:
+    """Stores a fingerprint and the compressed enrichments per node_id in SQLite."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_age_seconds: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if max_age_seconds is None:
+            max_age_seconds = DEFAULT_ENRICHMENT_MAX_AGE_SECONDS
+        elif max_age_seconds < 0:
+            msg = "enrichment_max_age_seconds must not be negative"
+            raise ValueError(msg)
+
+        self._max_age = max_age_seconds
+        self._clock = clock
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS enrichments ("
+            " node_id TEXT PRIMARY KEY,"
+            " fingerprint TEXT NOT NULL,"
+            " payload BLOB NOT NULL,"
+            " stored REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+    def get(self, node_id: str, fingerprint: str) -> dict[str, JSONType] | None:
+        """The stored enrichments, if the fingerprint matches and they are fresh."""
+        row = self._db.execute(
+            "SELECT fingerprint, payload, stored FROM enrichments WHERE node_id = ?",
+            (node_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        stored_fingerprint, payload, stored = row
+        if stored_fingerprint != fingerprint:
+            return None
+        if self._clock() - stored > self._max_age:
+            return None
+        return json.loads(zlib.decompress(payload))
+
+    def put(
+        self, node_id: str, fingerprint: str, enrichments: dict[str, JSONType]
+    ) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO enrichments"
+            " (node_id, fingerprint, payload, stored) VALUES (?, ?, ?, ?)",
+            (
+                node_id,
+                fingerprint,
+                zlib.compress(json.dumps(enrichments).encode()),
+                self._clock(),
+            ),
+        )
+
+    def close(self) -> None:
+        self._db.close()
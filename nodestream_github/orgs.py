@@ -5,17 +5,23 @@ Developed using Enterprise Server 3.12
 https://docs.github.com/en/enterprise-server@3.12/rest?apiVersion=2022-11-28
 """
 
+import asyncio
 from collections.abc import AsyncGenerator
 from typing import Any
 
 from nodestream.pipeline import Extractor
+from nodestream.pipeline.step import StepContext
 
 from .client import GithubRestApiClient
+from .concurrency import bounded_map, concurrency_limit
+from .filters import OrgScope
 from .interpretations.relationship.repository import simplify_repo
 from .interpretations.relationship.user import simplify_user
 from .logging import get_plugin_logger
-from .types import OrgRecord, SimplifiedUser
-from .types.enums import OrgMemberRole
+from .types import OrgRecord, SimplifiedRepo, SimplifiedUser
+from .types.enums import OrgMemberRole, ResultOrder
+
+DEFAULT_MAX_CONCURRENT_ORGS = 4
 
 logger = get_plugin_logger(__name__)
 
@@ -26,52 +32,82 @@ class GithubOrganizationsExtractor(Extractor):
         *,
         include_members: bool | None = True,
         include_repositories: bool | None = True,
+        orgs: list[str] | None = None,
+        exclude_orgs: list[str] | None = None,
+        max_concurrent_orgs: int | None = None,
+        org_order: ResultOrder | str | None = None,
         **kwargs: Any,
     ):
 
         self.include_members = include_members is True
         self.include_repositories = include_repositories is True
+        self.org_scope = OrgScope.of(orgs, exclude_orgs)
+
+        self.max_concurrent_orgs = concurrency_limit(
+            max_concurrent_orgs,
+            default=DEFAULT_MAX_CONCURRENT_ORGS,
+            name="max_concurrent_orgs",
+        )
+        self.org_order = ResultOrder(org_order or ResultOrder.LISTING)
 
         self.client = GithubRestApiClient(**kwargs)
 
+    async def finish(self, context: StepContext):
+        await super().finish(context)
+        await self.client.aclose()
+
     async def extract_records(self) -> AsyncGenerator[OrgRecord]:
-        async for org in self.client.fetch_all_organizations():
-            enhanced_org = await self._extract_organization(org["login"])
+        async for enhanced_org in bounded_map(
+            self._extract_organization,
+            self._list_org_logins(),
+            limit=self.max_concurrent_orgs,
+            order=self.org_order,
+        ):
             if enhanced_org:
                 logger.debug("yielded GithubOrg{login=%s}", enhanced_org["login"])
                 yield enhanced_org
 
+    async def _list_org_logins(self) -> AsyncGenerator[str]:
+        async for org in self.org_scope.organizations(self.client):
+            yield org["login"]
+
     async def _extract_organization(self, login: str) -> OrgRecord | None:
-        full_org = await self.client.fetch_full_org(login)
+        async with asyncio.TaskGroup() as group:
+            full_org = group.create_task(self.client.fetch_full_org(login))
+            members = group.create_task(self._fetch_all_members(login))
+            repositories = group.create_task(self._fetch_repositories(login))
+
+        full_org = full_org.result()
         if not full_org:
             return None
-
-        if self.include_members:
-            full_org["members"] = [
-                user async for user in self._fetch_all_members(login)
-            ]
-        else:
-            full_org["members"] = []
-
-        if self.include_repositories:
-            full_org["repositories"] = [
-                simplify_repo(repo)
-                async for repo in self.client.fetch_repos_for_org(org_login=login)
-            ]
-        else:
-            full_org["repositories"] = []
-
+        full_org["members"] = members.result()
+        full_org["repositories"] = repositories.result()
         return full_org
 
-    async def _fetch_all_members(self, login: str) -> AsyncGenerator[SimplifiedUser]:
-        async for admin in self.client.fetch_members_for_org(
-            org_login=login,
-            role=OrgMemberRole.ADMIN,
-        ):
-            yield simplify_user(admin) | {"role": "admin"}
-
-        async for member in self.client.fetch_members_for_org(
-            org_login=login,
-            role=OrgMemberRole.MEMBER,
-        ):
-            yield simplify_user(member) | {"role": "member"}
+    async def _fetch_repositories(self, login: str) -> list[SimplifiedRepo]:
+        if not self.include_repositories:
+            return []
+        return [
+            simplify_repo(repo)
+            async for repo in self.client.fetch_repos_for_org(org_login=login)
+        ]
+
+    async def _fetch_all_members(self, login: str) -> list[SimplifiedUser]:
+        if not self.include_members:
+            return []
+        admins, members = await asyncio.gather(
+            self._fetch_members(login, OrgMemberRole.ADMIN),
+            self._fetch_members(login, OrgMemberRole.MEMBER),
+        )
+        return admins + members
+
+    async def _fetch_members(
+        self, login: str, role: OrgMemberRole
+    ) -> list[SimplifiedUser]:
+        return [
+            simplify_user(member) | {"role": str(role)}
+            async for member in self.client.fetch_members_for_org(
+                org_login=login,
+                role=role,
+            )
+        ]
@@ -5,16 +5,28 @@ Developed using Enterprise Server 3.12
 https://docs.github.com/en/enterprise-server@3.12/rest?apiVersion=2022-11-28
 """
 
+import asyncio
+from collections import Counter
 from collections.abc import AsyncGenerator
-from dataclasses import dataclass
+from contextlib import aclosing
+from dataclasses import dataclass, field
 from typing import Any
 
+import httpx
 from nodestream.pipeline import Extractor
+from nodestream.pipeline.step import StepContext
 
+from .branchprotection import DefaultBranchProtection, UnprotectedRepoCache
 from .client import GithubRestApiClient
+from .collaborators import OutsideCollaboratorIndex
+from .concurrency import bounded_map, concurrency_limit, merge
+from .filters import OrgScope, RepoFilter, parse_timestamp
+from .fingerprints import EnrichmentStore, fingerprint
 from .interpretations.relationship.user import simplify_user
 from .logging import get_plugin_logger
 from .types import (
+    BranchProtection,
+    GithubOrg,
     GithubRepo,
     GithubUser,
     JSONType,
@@ -22,7 +34,20 @@ from .types import (
     SimplifiedUser,
     Webhook,
 )
-from .types.enums import CollaboratorAffiliation, OrgRepoType, UserRepoType
+from .types.enums import (
+    CollaboratorAffiliation,
+    OrgRepoType,
+    RepoEnrichment,
+    RepoSort,
+    ResultOrder,
+    SortDirection,
+    UserRepoType,
+)
+from .usercounts import UserRepoCounts
+from .watermarks import WatermarkStore
+
+DEFAULT_MAX_CONCURRENT_REPOS = 8
+DEFAULT_MAX_CONCURRENT_ORGS = 4
 
 logger = get_plugin_logger(__name__)
 
@@ -37,6 +62,13 @@ def _dict_val_to_bool(d: dict[str, Any], key: str) -> bool:
     return True  # key is present
 
 
+def _is_public(repo: GithubRepo) -> bool:
+    visibility = repo.get("visibility")
+    if visibility is not None:
+        return visibility == "public"
+    return not repo.get("private", False)
+
+
 @dataclass
 class CollectWhichRepos:
     all_public: bool = False
@@ -44,6 +76,7 @@ class CollectWhichRepos:
     org_private: bool = False
     user_public: bool = False
     user_private: bool = False
+    org_scope: OrgScope = field(default_factory=OrgScope)
 
     @property
     def org_any(self) -> bool:
@@ -64,6 +97,48 @@ class CollectWhichRepos:
             org_private=org_all or _dict_val_to_bool(raw_dict, "org_private"),
             user_public=user_all or _dict_val_to_bool(raw_dict, "user_public"),
             user_private=user_all or _dict_val_to_bool(raw_dict, "user_private"),
+            org_scope=OrgScope.of(raw_dict.get("orgs"), raw_dict.get("exclude_orgs")),
+        )
+
+
+@dataclass
+class SkipRule:
+    """Skips enrichments of the repos whose listing fields match ``when``.
+
+    Every field in ``when`` must equal the given value, or one of them if a list
+    is given.
+    """
+
+    name: str
+    when: dict[str, Any]
+    skip: frozenset[RepoEnrichment]
+
+    def matches(self, repo: GithubRepo) -> bool:
+        for key, expected in self.when.items():
+            value = repo.get(key)
+            if isinstance(expected, list):
+                if value not in expected:
+                    return False
+            elif value != expected:
+                return False
+        return True
+
+    @staticmethod
+    def from_dict(raw_dict: dict[str, Any]) -> "SkipRule":
+        when = raw_dict.get("when") or {}
+        skip = raw_dict.get("skip") or []
+        if not when or not skip:
+            msg = "skip rules need both 'when' and 'skip'"
+            raise ValueError(msg)
+        if isinstance(skip, str):
+            skip = [skip]
+        name = raw_dict.get("name") or ", ".join(
+            f"{key}={value}" for key, value in when.items()
+        )
+        return SkipRule(
+            name=name,
+            when=dict(when),
+            skip=frozenset(RepoEnrichment(enrichment) for enrichment in skip),
         )
 
 
@@ -75,6 +150,21 @@ class GithubReposExtractor(Extractor):
         include_languages: bool | None = True,
         include_webhooks: bool | None = True,
         include_collaborators: bool | None = True,
+        index_outside_collaborators: bool | None = False,
+        include_branch_protection: bool | None = False,
+        branch_protection_cache_path: str | None = None,
+        branch_protection_cache_ttl_seconds: float | None = None,
+        repo_filter: RepoFilter | dict[str, Any] | None = None,
+        watermark_path: str | None = None,
+        enrichment_store_path: str | None = None,
+        enrichment_max_age_seconds: float | None = None,
+        watermark_sort: RepoSort | str | None = None,
+        user_repo_counts_path: str | None = None,
+        user_repo_counts_max_age_seconds: float | None = None,
+        skip_rules: list[SkipRule | dict[str, Any]] | None = None,
+        max_concurrent_repos: int | None = None,
+        max_concurrent_orgs: int | None = None,
+        repo_order: ResultOrder | str | None = None,
         **kwargs: Any,
     ):
         if isinstance(collecting, CollectWhichRepos):
@@ -87,8 +177,78 @@ class GithubReposExtractor(Extractor):
         self.include_languages = include_languages is True
         self.include_webhooks = include_webhooks is True
         self.include_collaborators = include_collaborators is True
+        if isinstance(repo_filter, dict):
+            repo_filter = RepoFilter.from_dict(repo_filter)
+        self.repo_filter = repo_filter or RepoFilter()
+        # listed repos the filter dropped in the last extraction
+        self.filtered_out = 0
+        # incremental org listings, most recently changed first, that stop at
+        # the watermark of the last successful run
+        self.watermarks = WatermarkStore(watermark_path) if watermark_path else None
+        self.watermark_sort = RepoSort(watermark_sort or RepoSort.PUSHED)
+        if self.watermark_sort not in {RepoSort.PUSHED, RepoSort.UPDATED}:
+            msg = "watermark_sort must be 'pushed' or 'updated'"
+            raise ValueError(msg)
+        # written by the users extractor, to skip users that own no repos
+        self.user_repo_counts = (
+            UserRepoCounts(
+                user_repo_counts_path, max_age_seconds=user_repo_counts_max_age_seconds
+            )
+            if user_repo_counts_path
+            else None
+        )
+        # repo listings of users owning no repos skipped in the last extraction
+        self.user_listings_skipped = 0
+        # enrichments of unchanged repos are reused from the last runs
+        self.enrichment_store = (
+            EnrichmentStore(
+                enrichment_store_path, max_age_seconds=enrichment_max_age_seconds
+            )
+            if enrichment_store_path
+            else None
+        )
+        # repos whose stored enrichments were reused in the last extraction
+        self.enrichments_reused = 0
+        self.skip_rules = [
+            rule if isinstance(rule, SkipRule) else SkipRule.from_dict(rule)
+            for rule in skip_rules or []
+        ]
+        # enrichment requests each rule skipped in the last extraction
+        self.skipped_by_rule: Counter[str] = Counter()
+
+        self.max_concurrent_repos = concurrency_limit(
+            max_concurrent_repos,
+            default=DEFAULT_MAX_CONCURRENT_REPOS,
+            name="max_concurrent_repos",
+        )
+        self.max_concurrent_orgs = concurrency_limit(
+            max_concurrent_orgs,
+            default=DEFAULT_MAX_CONCURRENT_ORGS,
+            name="max_concurrent_orgs",
+        )
+        self.repo_order = ResultOrder(repo_order or ResultOrder.LISTING)
+        # repos listed by more than one collection mode in the last extraction
+        self.duplicates_skipped = 0
 
         self.client = GithubRestApiClient(**kwargs)
+        # classify one direct collaborator listing per repo with an org-wide
+        # index of outside collaborators, instead of listing both affiliations
+        self.outside_collaborators = (
+            OutsideCollaboratorIndex(self.client)
+            if index_outside_collaborators is True
+            else None
+        )
+        self.branch_protection = (
+            DefaultBranchProtection(
+                self.client,
+                UnprotectedRepoCache(
+                    branch_protection_cache_path,
+                    ttl_seconds=branch_protection_cache_ttl_seconds,
+                ),
+            )
+            if include_branch_protection is True
+            else None
+        )
         logger.info(
             "%s, %s, %s",
             self.include_collaborators,
@@ -96,18 +256,122 @@ class GithubReposExtractor(Extractor):
             self.include_languages,
         )
 
+    async def finish(self, context: StepContext):
+        await super().finish(context)
+        if self.branch_protection:
+            self.branch_protection.unprotected.save()
+        if self.enrichment_store:
+            self.enrichment_store.close()
+        await self.client.aclose()
+
     async def extract_records(self) -> AsyncGenerator[RepositoryRecord]:
-        if self.collecting.all_public:
-            async for repo in self.client.fetch_all_public_repos():
-                yield await self._extract_repo(repo)
+        self.skipped_by_rule.clear()
+        self.enrichments_reused = 0
+        async for record in bounded_map(
+            self._extract_repo_isolated,
+            self._list_repos(),
+            limit=self.max_concurrent_repos,
+            order=self.repo_order,
+        ):
+            if record is not None:
+                yield record
 
-        if self.collecting.org_any:
-            async for repo in self._fetch_repos_by_org():
-                yield await self._extract_repo(repo)
+        if self.watermarks:
+            self.watermarks.save()
+        if self.enrichment_store:
+            logger.info(
+                "Reused the stored enrichments of %s unchanged repos",
+                self.enrichments_reused,
+            )
+        for rule in self.skip_rules:
+            logger.info(
+                "Skip rule '%s' skipped %s enrichment requests",
+                rule.name,
+                self.skipped_by_rule[rule.name],
+            )
+
+    def _skipped_enrichments(self, repo: GithubRepo) -> set[RepoEnrichment]:
+        """The enrichments the skip rules leave out for this repo, counted
+        against the first rule that skips each one."""
+        skipped = set()
+        for rule in self.skip_rules:
+            if not rule.matches(repo):
+                continue
+            for enrichment in rule.skip - skipped:
+                if self._enabled(enrichment):
+                    self.skipped_by_rule[rule.name] += 1
+                skipped.add(enrichment)
+        return skipped
+
+    def _enabled(self, enrichment: RepoEnrichment) -> bool:
+        match enrichment:
+            case RepoEnrichment.LANGUAGES:
+                return self.include_languages
+            case RepoEnrichment.WEBHOOKS:
+                return self.include_webhooks
+            case RepoEnrichment.COLLABORATORS:
+                return self.include_collaborators
+            case RepoEnrichment.DEFAULT_BRANCH_PROTECTION:
+                return self.branch_protection is not None
 
+    async def _list_repos(self) -> AsyncGenerator[GithubRepo]:
+        """List the repos of every collection mode, all modes at the same time.
+
+        Repos the filter drops, and repos listed by several modes (e.g.
+        all_public and org_public) after the first time, are skipped before
+        anything is fetched to enrich them.
+        """
+        modes = []
+        if self.collecting.all_public:
+            modes.append(self.client.fetch_all_public_repos())
+        if self.collecting.org_any:
+            modes.append(self._fetch_repos_by_org())
         if self.collecting.user_any:
-            async for repo in self._fetch_repos_by_user():
-                yield await self._extract_repo(repo)
+            modes.append(self._fetch_repos_by_user())
+
+        # the integer ids take far less memory than the node_id strings
+        seen: set[int | str] = set()
+        self.duplicates_skipped = 0
+        self.filtered_out = 0
+        self.user_listings_skipped = 0
+        async for repo in merge(modes, buffer=self.max_concurrent_repos):
+            key = repo.get("id", repo.get("node_id"))
+            if not self.repo_filter.keeps(repo):
+                self.filtered_out += 1
+                logger.debug("filtered out GithubRepo{%s}", repo.get("full_name"))
+            elif key is None:
+                yield repo
+            elif key in seen:
+                self.duplicates_skipped += 1
+                logger.debug("skipped duplicate GithubRepo{%s}", repo.get("full_name"))
+            else:
+                seen.add(key)
+                yield repo
+
+        if self.duplicates_skipped:
+            logger.info(
+                "Skipped %s repos listed by more than one collection mode",
+                self.duplicates_skipped,
+            )
+        if self.filtered_out:
+            logger.info("Filtered out %s listed repos", self.filtered_out)
+        if self.user_listings_skipped:
+            logger.info(
+                "Skipped the repo listings of %s users that own no repos",
+                self.user_listings_skipped,
+            )
+
+    async def _extract_repo_isolated(self, repo: GithubRepo) -> RepositoryRecord | None:
+        """Extract one repo without letting its failure end the whole extraction."""
+        owner_login = (repo.get("owner") or {}).get("login")
+        try:
+            return await self._extract_repo(repo)
+        except Exception:
+            logger.exception("Unable to extract GithubRepo{%s}", repo.get("full_name"))
+            if self.watermarks and owner_login:
+                # list the repo again the next time
+                self.watermarks.fail(owner_login)
+            return None
 
     async def _extract_repo(self, repo: GithubRepo) -> RepositoryRecord:
         owner = repo.pop("owner", {})
@@ -116,12 +380,56 @@ class GithubReposExtractor(Extractor):
         elif owner:
             repo["org_owner"] = owner
 
-        if self.include_languages:
-            repo["languages"] = await self._add_languages(owner, repo)
-        if self.include_webhooks:
-            repo["webhooks"] = await self._add_webhooks(owner, repo)
-        if self.include_collaborators:
-            repo["collaborators"] = await self._add_collaborators(owner, repo)
+        skipped = self._skipped_enrichments(repo)
+        fetchers = {
+            RepoEnrichment.LANGUAGES: self._add_languages,
+            RepoEnrichment.WEBHOOKS: self._add_webhooks,
+            RepoEnrichment.COLLABORATORS: self._add_collaborators,
+            RepoEnrichment.DEFAULT_BRANCH_PROTECTION: self._add_branch_protection,
+        }
+        wanted = [
+            str(enrichment)
+            for enrichment in fetchers
+            if self._enabled(enrichment) and enrichment not in skipped
+        ]
+        node_id = repo.get("node_id")
+        repo_fingerprint = fingerprint(repo, wanted)
+        if self.enrichment_store and node_id and wanted:
+            stored = self.enrichment_store.get(node_id, repo_fingerprint)
+            if stored is not None:
+                repo.update(stored)
+                self.enrichments_reused += 1
+                logger.debug("reused enrichments of GithubRepo{%s}", repo["full_name"])
+                return repo
+
+        failed = []
+
+        async def enrich(enrichment: RepoEnrichment) -> JSONType:
+            try:
+                return await fetchers[enrichment](owner, repo)
+            except httpx.HTTPError:
+                # already logged by the client; the repo goes without it
+                failed.append(enrichment)
+                if enrichment is RepoEnrichment.DEFAULT_BRANCH_PROTECTION:
+                    return None
+                return []
+
+        # the sub-resources are independent, so fetch them at the same time
+        tasks = {}
+        async with asyncio.TaskGroup() as group:
+            for enrichment in wanted:
+                tasks[enrichment] = group.create_task(
+                    enrich(RepoEnrichment(enrichment))
+                )
+        enrichments = {key: task.result() for key, task in tasks.items()}
+        repo.update(enrichments)
+        if failed:
+            # stored, the failure would be reused until the repo changes
+            logger.debug(
+                "not storing the enrichments of GithubRepo{%s}", repo["full_name"]
+            )
+        elif self.enrichment_store and node_id and wanted:
+            self.enrichment_store.put(node_id, repo_fingerprint, enrichments)
 
         logger.debug("yielded GithubRepo{full_name=%s}", repo["full_name"])
         return repo
@@ -129,20 +437,46 @@ class GithubReposExtractor(Extractor):
     async def _add_collaborators(
         self, owner: GithubUser, repo: GithubRepo
     ) -> list[SimplifiedUser]:
-        collaborators = []
-        async for user in self.client.fetch_collaborators_for_repo(
-            owner_login=owner["login"],
-            repo_name=repo["name"],
-            affiliation=CollaboratorAffiliation.DIRECT,
-        ):
-            collaborators.append(simplify_user(user) | {"affiliation": "direct"})
-        async for user in self.client.fetch_collaborators_for_repo(
-            owner_login=owner["login"],
-            repo_name=repo["name"],
-            affiliation=CollaboratorAffiliation.OUTSIDE,
-        ):
-            collaborators.append(simplify_user(user) | {"affiliation": "outside"})
-        return collaborators
+        index = self.outside_collaborators
+        if index is not None and owner.get("type") != "User":
+            collaborators = index.fetch_collaborators_for_repo(
+                owner_login=owner["login"], repo_name=repo["name"], raise_errors=True
+            )
+            return [
+                simplify_user(user) | {"affiliation": str(affiliation)}
+                async for user, affiliation in collaborators
+            ]
+
+        direct, outside = await asyncio.gather(
+            self._collaborators(owner, repo, CollaboratorAffiliation.DIRECT),
+            self._collaborators(owner, repo, CollaboratorAffiliation.OUTSIDE),
+        )
+        return direct + outside
+
+    async def _collaborators(
+        self,
+        owner: GithubUser,
+        repo: GithubRepo,
+        affiliation: CollaboratorAffiliation,
+    ) -> list[SimplifiedUser]:
+        return [
+            simplify_user(user) | {"affiliation": str(affiliation)}
+            async for user in self.client.fetch_collaborators_for_repo(
+                owner_login=owner["login"],
+                repo_name=repo["name"],
+                affiliation=affiliation,
+                raise_errors=True,
+            )
+        ]
+
+    async def _add_branch_protection(
+        self, owner: GithubUser, repo: GithubRepo
+    ) -> BranchProtection | None:
+        if not owner:
+            return None
+        return await self.branch_protection.fetch(
+            owner_login=owner["login"], repo=repo, raise_errors=True
+        )
 
     async def _add_webhooks(self, owner: GithubUser, repo: GithubRepo) -> list[Webhook]:
         return [
@@ -150,6 +484,7 @@ class GithubReposExtractor(Extractor):
             async for hook in self.client.fetch_webhooks_for_repo(
                 owner_login=owner["login"],
                 repo_name=repo["name"],
+                raise_errors=True,
             )
         ]
 
@@ -159,23 +494,107 @@ class GithubReposExtractor(Extractor):
             async for lang in self.client.fetch_languages_for_repo(
                 owner_login=owner["login"],
                 repo_name=repo["name"],
+                raise_errors=True,
             )
         ]
 
     async def _fetch_repos_by_org(self) -> AsyncGenerator[GithubRepo]:
-        async for org in self.client.fetch_all_organizations():
-            if self.collecting.org_public:
-                async for repo in self.client.fetch_repos_for_org(
-                    org_login=org["login"],
-                    repo_type=OrgRepoType.PUBLIC,
-                ):
+        """List the repos of several orgs at the same time, the largest first.
+
+        A few huge orgs take most of the time, so starting them first keeps
+        them from being the only listings still running at the end.
+        """
+        orgs = [
+            org["login"]
+            async for org in self.collecting.org_scope.organizations(self.client)
+        ]
+        sizes = [
+            size
+            async for size in bounded_map(
+                self._org_size, orgs, limit=self.max_concurrent_orgs
+            )
+        ]
+        # sorted() is stable, so orgs of the same size keep their listing order
+        orgs = [
+            org_login
+            for _, org_login in sorted(
+                zip(sizes, orgs, strict=True), key=lambda pair: pair[0], reverse=True
+            )
+        ]
+
+        listings = (self._fetch_repos_for_org(org_login) for org_login in orgs)
+        async for repo in merge(
+            listings, limit=self.max_concurrent_orgs, buffer=self.max_concurrent_repos
+        ):
+            yield repo
+
+    async def _org_size(self, org_login: str) -> int:
+        org: GithubOrg | None = await self.client.fetch_full_org(org_login)
+        if org is None:
+            return 0
+        return (org.get("public_repos") or 0) + (org.get("total_private_repos") or 0)
+
+    async def _fetch_repos_for_org(self, org_login: str) -> AsyncGenerator[GithubRepo]:
+        """List the org repos the config asks for in a single pass.
+
+        Whenever private repos are wanted one type=all listing is split locally
+        on visibility, instead of paginating the public and private listings
+        separately. Unlike those two, it also returns internal repos.
+        """
+        repo_type = (
+            OrgRepoType.ALL if self.collecting.org_private else OrgRepoType.PUBLIC
+        )
+        if self.watermarks is None:
+            listing = self.client.fetch_repos_for_org(
+                org_login=org_login, repo_type=repo_type
+            )
+        else:
+            listing = self._fetch_changed_repos_for_org(org_login, repo_type)
+
+        async for repo in listing:
+            # internal repos count as private
+            if _is_public(repo):
+                if self.collecting.org_public:
                     yield repo
-            if self.collecting.org_private:
-                async for repo in self.client.fetch_repos_for_org(
-                    org_login=org["login"],
-                    repo_type=OrgRepoType.PRIVATE,
-                ):
+            elif self.collecting.org_private:
+                yield repo
+
+    async def _fetch_changed_repos_for_org(
+        self, org_login: str, repo_type: OrgRepoType
+    ) -> AsyncGenerator[GithubRepo]:
+        """List the repos changed since the watermark, newest first, and stop
+        paginating at the first older one.
+
+        The watermark of an org whose listing fails partway is not advanced, so
+        the repos on the pages it did not reach are listed the next time.
+        """
+        watermark = self.watermarks.get(org_login)
+        changed_at_key = f"{self.watermark_sort}_at"
+        listing = self.client.fetch_repos_for_org(
+            org_login=org_login,
+            repo_type=repo_type,
+            sort=self.watermark_sort,
+            direction=SortDirection.DESC,
+            # pages past the watermark would be wasted
+            sequential_pages=True,
+            raise_errors=True,
+        )
+        async with aclosing(listing):
+            try:
+                async for repo in listing:
+                    changed_at = parse_timestamp(repo.get(changed_at_key))
+                    if watermark and changed_at and changed_at < watermark:
+                        logger.debug(
+                            "reached the watermark of org=%s at %s",
+                            org_login,
+                            repo.get("full_name"),
+                        )
+                        return
+                    self.watermarks.advance(org_login, changed_at)
                     yield repo
+            except httpx.HTTPError:
+                # already logged by the client
+                self.watermarks.fail(org_login)
 
     async def _fetch_repos_by_user(self) -> AsyncGenerator[GithubRepo]:
         """Fetches repositories for the specified user.
@@ -186,6 +605,9 @@ class GithubReposExtractor(Extractor):
         repository permissions (read)
         """
         async for user in self.client.fetch_all_users():
+            if self.user_repo_counts and self.user_repo_counts.get(user["login"]) == 0:
+                self.user_listings_skipped += 1
+                continue
             async for repo in self.client.fetch_repos_for_user(
                 user_login=user["login"],
                 repo_type=UserRepoType.OWNER,
@@ -0,0 +1,35 @@
+"""state
+
+Small JSON files that carry state from one run to the next.
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+from .logging import get_plugin_logger
+
+logger = get_plugin_logger(__name__)
+
+
+def load_state(path: Path | None) -> dict[str, Any]:
+    """The state saved at ``path``, empty if there is none or it is unreadable."""
+    if path is None or not path.exists():
+        return {}
+    try:
+        state = json.loads(path.read_text())
+    except (OSError, ValueError):
+        logger.warning("Ignoring unreadable state file %s", path, exc_info=True)
+        return {}
+    if not isinstance(state, dict):
+        logger.warning("Ignoring state file %s without a JSON object", path)
+        return {}
+    return state
+
+
+def save_state(path: Path, state: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # written aside and renamed, so a crash never leaves a truncated file
+    partial = path.with_suffix(path.suffix + ".tmp")
+    partial.write_text(json.dumps(state))
+    partial.replace(path)
@@ -5,70 +5,146 @@ Developed using Enterprise Server 3.12
 https://docs.github.com/en/enterprise-server@3.12/rest?apiVersion=2022-11-28
 """
 
+import asyncio
 from collections.abc import AsyncGenerator
 from typing import Any
 
 from nodestream.pipeline import Extractor
+from nodestream.pipeline.step import StepContext
 
 from .client import GithubRestApiClient
+from .concurrency import bounded_map, concurrency_limit
+from .filters import OrgScope
 from .interpretations.relationship.repository import simplify_repo
 from .interpretations.relationship.user import simplify_user
 from .logging import get_plugin_logger
-from .types import GithubTeam, GithubTeamSummary, SimplifiedUser, TeamRecord
-from .types.enums import TeamMemberRole
+from .types import (
+    GithubOrgSummary,
+    GithubTeam,
+    GithubTeamSummary,
+    SimplifiedRepo,
+    SimplifiedUser,
+    TeamRecord,
+)
+from .types.enums import ResultOrder, TeamMemberRole
+
+DEFAULT_MAX_CONCURRENT_TEAMS = 8
 
 logger = get_plugin_logger(__name__)
 
 
 class GithubTeamsExtractor(Extractor):
-    def __init__(self, **github_client_kwargs: Any):
+    def __init__(
+        self,
+        *,
+        orgs: list[str] | None = None,
+        exclude_orgs: list[str] | None = None,
+        hydrate_teams: bool | None = True,
+        max_concurrent_teams: int | None = None,
+        team_order: ResultOrder | str | None = None,
+        **github_client_kwargs: Any,
+    ):
+        self.org_scope = OrgScope.of(orgs, exclude_orgs)
+        # without hydration the team record is built from the listing summary
+        self.hydrate_teams = hydrate_teams is not False
+
+        self.max_concurrent_teams = concurrency_limit(
+            max_concurrent_teams,
+            default=DEFAULT_MAX_CONCURRENT_TEAMS,
+            name="max_concurrent_teams",
+        )
+        self.team_order = ResultOrder(team_order or ResultOrder.LISTING)
+
         self.client = GithubRestApiClient(**github_client_kwargs)
 
+    async def finish(self, context: StepContext):
+        await super().finish(context)
+        await self.client.aclose()
+
     async def extract_records(self) -> AsyncGenerator[TeamRecord]:
-        async for page in self.client.fetch_all_organizations():
-            login = page["login"]
+        # finished teams waiting to be yielded count against the limit, so at
+        # most max_concurrent_teams records are held in memory
+        async for team_record in bounded_map(
+            self._fetch_team,
+            self._list_teams(),
+            limit=self.max_concurrent_teams,
+            order=self.team_order,
+        ):
+            if team_record:
+                logger.debug(
+                    "yielded GithubTeam{org=%s,slug=%s}",
+                    team_record["organization"]["login"],
+                    team_record["slug"],
+                )
+                yield team_record
+
+    async def _list_teams(
+        self,
+    ) -> AsyncGenerator[tuple[GithubOrgSummary, GithubTeamSummary]]:
+        async for org in self.org_scope.organizations(self.client):
+            login = org["login"]
+            if not self.hydrate_teams and "node_id" not in org:
+                # a literal scope only knows the login, teams need the node_id
+                org = await self.client.fetch_full_org(login) or org
             async for team in self.client.fetch_teams_for_org(org_login=login):
-                team_record = await self._fetch_team(login, team)
-                if team_record:
-                    logger.debug(
-                        "yielded GithubTeam{org=%s,slug=%s}",
-                        team_record["organization"]["login"],
-                        team_record["slug"],
-                    )
-                    yield team_record
-
-    async def _fetch_members(self, team: GithubTeam) -> AsyncGenerator[SimplifiedUser]:
+                yield org, team
+
+    async def _fetch_members(
+        self, team: GithubTeam, role: TeamMemberRole
+    ) -> list[SimplifiedUser]:
+        if team.get("members_count") == 0:
+            return []
         logger.debug(
-            "Getting members for team %s/%s",
+            "Getting %s members for team %s/%s",
+            role,
             team["organization"]["login"],
             team["slug"],
         )
-
-        async for member in self.client.fetch_members_for_team(
-            team_id=team["id"],
-            role=TeamMemberRole.MEMBER,
-        ):
-            yield member | {"role": "member"}
-        async for member in self.client.fetch_members_for_team(
-            team_id=team["id"],
-            role=TeamMemberRole.MAINTAINER,
-        ):
-            yield member | {"role": "maintainer"}
-
-    async def _fetch_team(
-        self, login: str, team_summary: GithubTeamSummary
-    ) -> GithubTeam | None:
-        team = await self.client.fetch_team(org_login=login, slug=team_summary["slug"])
-        if not team:
-            return None
-        team["members"] = [
-            simplify_user(member) async for member in self._fetch_members(team)
+        return [
+            simplify_user(member) | {"role": str(role)}
+            async for member in self.client.fetch_members_for_team(
+                org_login=team["organization"]["login"],
+                slug=team["slug"],
+                role=role,
+            )
         ]
-        team["repos"] = [
+
+    async def _fetch_repos(self, team: GithubTeam) -> list[SimplifiedRepo]:
+        if team.get("repos_count") == 0:
+            return []
+        return [
             simplify_repo(repo)
             async for repo in self.client.fetch_repos_for_team(
-                org_login=login,
+                org_login=team["organization"]["login"],
                 slug=team["slug"],
             )
         ]
+
+    async def _fetch_team(
+        self, org_and_summary: tuple[GithubOrgSummary, GithubTeamSummary]
+    ) -> GithubTeam | None:
+        org, team_summary = org_and_summary
+        if self.hydrate_teams:
+            team = await self.client.fetch_team(
+                org_login=org["login"], slug=team_summary["slug"]
+            )
+            if not team:
+                return None
+        else:
+            team = team_summary | {"organization": org}
+
+        async with asyncio.TaskGroup() as group:
+            members = group.create_task(
+                self._fetch_members(team, TeamMemberRole.MEMBER)
+            )
+            maintainers = group.create_task(
+                self._fetch_members(team, TeamMemberRole.MAINTAINER)
+            )
+            repos = group.create_task(self._fetch_repos(team))
+
+        team["members"] = members.result() + maintainers.result()
+        team["repos"] = repos.result()
+        if not self.hydrate_teams:
+            team["members_count"] = len(team["members"])
+            team["repos_count"] = len(team["repos"])
         return team
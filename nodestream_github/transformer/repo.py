@@ -4,9 +4,11 @@ from collections.abc import AsyncGenerator
 from typing import Any
 
 from nodestream.pipeline import Transformer
+from nodestream.pipeline.step import StepContext
 
 from nodestream_github import types
 from nodestream_github.client import GithubRestApiClient
+from nodestream_github.collaborators import OutsideCollaboratorIndex
 from nodestream_github.interpretations.relationship.repository import simplify_repo
 from nodestream_github.logging import get_plugin_logger
 from nodestream_github.types.enums import CollaboratorAffiliation
@@ -24,6 +26,10 @@ class RepoFullNameTransformer(Transformer, ABC):
         self.client = GithubRestApiClient(**kwargs)
         self.full_name_key = full_name_key
 
+    async def finish(self, context: StepContext):
+        await super().finish(context)
+        await self.client.aclose()
+
     async def transform_record(
         self,
         record: types.GithubRepo,
@@ -44,8 +50,19 @@ class RepoFullNameTransformer(Transformer, ABC):
 
 
 class RepoToUserCollaboratorsTransformer(RepoFullNameTransformer):
-    def __init__(self, *, full_name_key: str = "full_name", **kwargs: Any):
+    def __init__(
+        self,
+        *,
+        full_name_key: str = "full_name",
+        index_outside_collaborators: bool | None = False,
+        **kwargs: Any,
+    ):
         super().__init__(full_name_key=full_name_key, **kwargs)
+        self.outside_collaborators = (
+            OutsideCollaboratorIndex(self.client)
+            if index_outside_collaborators is True
+            else None
+        )
 
     async def _transform(
         self,
@@ -56,6 +73,19 @@ class RepoToUserCollaboratorsTransformer(RepoFullNameTransformer):
 
         logging.debug("Transforming repo %s/%s", repo_owner, repo_name)
 
+        if self.outside_collaborators is not None:
+            async for (
+                collaborator,
+                affiliation,
+            ) in self.outside_collaborators.fetch_collaborators_for_repo(
+                owner_login=repo_owner, repo_name=repo_name
+            ):
+                yield collaborator | {
+                    "repository": simplified_repo,
+                    "affiliation": affiliation,
+                }
+            return
+
         async for collaborator in self.client.fetch_collaborators_for_repo(
             owner_login=repo_owner,
             repo_name=repo_name,
@@ -1,6 +1,7 @@
 from .github import (
     BranchProtection,
     GithubAuditLog,
+    GithubBranch,
     GithubOrg,
     GithubOrgSummary,
     GithubRepo,
@@ -22,6 +23,7 @@ from .httpx import HeaderTypes, PrimitiveData, QueryParamTypes
 __all__ = [
     "BranchProtection",
     "GithubAuditLog",
+    "GithubBranch",
     "GithubOrg",
     "GithubOrgSummary",
     "GithubRepo",
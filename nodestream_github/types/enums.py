@@ -17,6 +17,18 @@ class OrgRepoType(StrEnum):
     INTERNAL = "internal"
 
 
+class RepoSort(StrEnum):
+    CREATED = "created"
+    UPDATED = "updated"
+    PUSHED = "pushed"
+    FULL_NAME = "full_name"
+
+
+class SortDirection(StrEnum):
+    ASC = "asc"
+    DESC = "desc"
+
+
 class UserRepoType(StrEnum):
     ALL = "all"
     OWNER = "owner"
@@ -33,3 +45,19 @@ class TeamMemberRole(StrEnum):
     ALL = "all"
     MAINTAINER = "maintainer"
     MEMBER = "member"
+
+
+class ResultOrder(StrEnum):
+    """Order in which results of concurrent requests are handed back."""
+
+    LISTING = "listing"
+    COMPLETION = "completion"
+
+
+class RepoEnrichment(StrEnum):
+    """The per-repo requests of GithubReposExtractor, named by their record key."""
+
+    LANGUAGES = "languages"
+    WEBHOOKS = "webhooks"
+    COLLABORATORS = "collaborators"
+    DEFAULT_BRANCH_PROTECTION = "default_branch_protection"
@@ -13,6 +13,7 @@ Webhook: TypeAlias = JSONObject
 GithubTeam: TypeAlias = JSONObject
 GithubTeamSummary: TypeAlias = JSONObject
 GithubAuditLog: TypeAlias = JSONObject
+GithubBranch: TypeAlias = JSONObject
 
 LanguageRecord: TypeAlias = JSONObject
 OrgRecord: TypeAlias = JSONObject
@@ -0,0 +1,85 @@
+"""usercounts
+
+How many repositories each user owns, as reported by their full profile.
+
+Most users of an instance own no repositories, yet listing the repositories of
+every user costs a request each. The full profile of a user reports
+public_repos and owned_private_repos, so users known to own nothing are not
+listed. The user listing the repos extractor walks has no counts, so the users
+extractor can save the counts it sees to a JSON file for it to reuse.
+"""
+
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from .logging import get_plugin_logger
+from .state import load_state, save_state
+from .types import GithubUser
+
+DEFAULT_REPO_COUNT_MAX_AGE_SECONDS = 24 * 60 * 60  # 1 day
+
+logger = get_plugin_logger(__name__)
+
+
+def repo_count(user: GithubUser) -> int | None:
+    """The number of repositories ``user`` owns, None if the profile is partial."""
+    public = user.get("public_repos")
+    if public is None:
+        return None
+    # only reported to the user and to site admins; a token without it cannot
+    # list the private repositories of the user either
+    return public + (user.get("owned_private_repos") or 0)
+
+
+class UserRepoCounts:
+    """The repository count of every user seen, saved to a JSON file.
+
+    A count is only trusted for ``max_age_seconds`` after it was recorded, so a
+    user given repositories after the users extractor last saw them is skipped
+    until they are seen again, for that long at most.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_age_seconds: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if max_age_seconds is None:
+            max_age_seconds = DEFAULT_REPO_COUNT_MAX_AGE_SECONDS
+        elif max_age_seconds < 0:
+            msg = "user_repo_counts_max_age_seconds must not be negative"
+            raise ValueError(msg)
+        self._max_age = max_age_seconds
+        self._clock = clock
+        self._path = Path(path)
+        self._counts: dict[str, dict[str, float]] = load_state(self._path)
+
+    def _is_fresh(self, entry: dict[str, float] | None) -> bool:
+        # entries of other formats are as good as unknown
+        if not isinstance(entry, dict):
+            return False
+        return self._clock() - entry.get("recorded_at", 0) <= self._max_age
+
+    def get(self, login: str) -> int | None:
+        entry = self._counts.get(login.lower())
+        return entry["count"] if self._is_fresh(entry) else None
+
+    def record(self, user: GithubUser) -> None:
+        count = repo_count(user)
+        if count is not None:
+            self._counts[user["login"].lower()] = {
+                "count": count,
+                "recorded_at": self._clock(),
+            }
+
+    def save(self) -> None:
+        live = {
+            login: entry
+            for login, entry in self._counts.items()
+            if self._is_fresh(entry)
+        }
+        logger.debug("saving the repo counts of %s users", len(live))
+        save_state(self._path, live)
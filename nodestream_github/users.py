@@ -5,37 +5,127 @@ Developed using Enterprise Server 3.12
 https://docs.github.com/en/enterprise-server@3.12/rest?apiVersion=2022-11-28
 """
 
+import time
 from collections.abc import AsyncGenerator
 from typing import Any
 
 from nodestream.pipeline import Extractor
+from nodestream.pipeline.step import StepContext
 
 from .client import GithubRestApiClient
+from .concurrency import bounded_map, concurrency_limit
 from .interpretations.relationship.repository import simplify_repo
 from .logging import get_plugin_logger
-from .types import SimplifiedUser, UserRecord
-from .types.enums import UserRepoType
+from .types import GithubUser, SimplifiedUser, UserRecord
+from .types.enums import ResultOrder, UserRepoType
+from .usercounts import UserRepoCounts, repo_count
+
+DEFAULT_MAX_CONCURRENT_USERS = 8
 
 logger = get_plugin_logger(__name__)
 
 
 class GithubUserExtractor(Extractor):
-    def __init__(self, *, include_repos: bool = True, **github_client_kwargs: Any):
+    def __init__(
+        self,
+        *,
+        include_repos: bool = True,
+        max_concurrent_users: int | None = None,
+        user_order: ResultOrder | str | None = None,
+        user_repo_counts_path: str | None = None,
+        user_repo_counts_max_age_seconds: float | None = None,
+        **github_client_kwargs: Any,
+    ):
         self.include_repos = include_repos is True  # handle None
+        # written here and read by the repos extractor, which skips the repo
+        # listings of users that own no repos
+        self.repo_counts = (
+            UserRepoCounts(
+                user_repo_counts_path, max_age_seconds=user_repo_counts_max_age_seconds
+            )
+            if user_repo_counts_path
+            else None
+        )
+
+        self.max_concurrent_users = concurrency_limit(
+            max_concurrent_users,
+            default=DEFAULT_MAX_CONCURRENT_USERS,
+            name="max_concurrent_users",
+        )
+        self.user_order = ResultOrder(user_order or ResultOrder.LISTING)
+
         self.client = GithubRestApiClient(**github_client_kwargs)
+        self.users_extracted = 0
+        self.seconds_elapsed = 0.0
+        # repo listings of users owning no repos skipped in the last extraction
+        self.repo_listings_skipped = 0
+
+    @property
+    def users_per_second(self) -> float:
+        if not self.seconds_elapsed:
+            return 0.0
+        return self.users_extracted / self.seconds_elapsed
+
+    async def finish(self, context: StepContext):
+        await super().finish(context)
+        await self.client.aclose()
 
     async def extract_records(self) -> AsyncGenerator[UserRecord]:
-        """Scrapes the GitHub REST api for all users and converts them to records."""
-        async for user_short in self.client.fetch_all_users():
-            login = user_short["login"]
-            user = await self.client.fetch_user(username=login)
-            if user is None:
-                continue
+        """Scrapes the GitHub REST api for all users and converts them to records.
+
+        Up to ``max_concurrent_users`` users are hydrated at once while the user
+        listing keeps paginating.
+        """
+        self.users_extracted = 0
+        self.repo_listings_skipped = 0
+        started = time.monotonic()
+        waited_before = self.client.rate_limit_wait_seconds
+        try:
+            async for user in bounded_map(
+                self._extract_user,
+                self.client.fetch_all_users(),
+                limit=self.max_concurrent_users,
+                order=self.user_order,
+            ):
+                if user is None:
+                    continue
+                self.users_extracted += 1
+                logger.debug("yielded GithubUser{login=%s}", user["login"])
+                yield user
+        finally:
+            self.seconds_elapsed = time.monotonic() - started
+            logger.info(
+                "Extracted %s users in %.1fs (%.2f users/s), %.1fs waiting on the"
+                " rate limiter",
+                self.users_extracted,
+                self.seconds_elapsed,
+                self.users_per_second,
+                self.client.rate_limit_wait_seconds - waited_before,
+            )
             if self.include_repos:
-                logger.debug("including repos for %s", user)
-                user["repositories"] = await self._user_repos(login=login)
-            logger.debug("yielded GithubUser{login=%s}", login)
-            yield user
+                logger.info(
+                    "Skipped the repo listings of %s users that own no repos",
+                    self.repo_listings_skipped,
+                )
+        if self.repo_counts:
+            self.repo_counts.save()
+
+    async def _extract_user(self, user_short: GithubUser) -> UserRecord | None:
+        login = user_short["login"]
+        user = await self.client.fetch_user(username=login)
+        if user is None:
+            return None
+        if self.repo_counts:
+            self.repo_counts.record(user)
+        if not self.include_repos:
+            return user
+        if repo_count(user) == 0:
+            self.repo_listings_skipped += 1
+            user["repositories"] = []
+        else:
+            logger.debug("including repos for %s", login)
+            user["repositories"] = await self._user_repos(login=login)
+        return user
 
     async def _user_repos(self, *, login: str) -> list[SimplifiedUser]:
         return [
@@ -0,0 +1,62 @@
+"""watermarks
+
+Remember, per organization, how recently its newest repository changed.
+
+Incremental runs list the repositories of an organization most recently
+changed first and stop at the first one that has not changed since the last
+successful run, so most organizations take a single page.
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+from .filters import parse_timestamp
+from .logging import get_plugin_logger
+from .state import load_state, save_state
+
+logger = get_plugin_logger(__name__)
+
+
+class WatermarkStore:
+    """The watermark of every organization, saved to a JSON file.
+
+    New watermarks only take effect once saved, at the end of a successful
+    run, so an interrupted run is listed again in full the next time. An
+    organization whose listing failed, or one of whose repositories could not
+    be extracted, keeps its old watermark, so those repositories are listed
+    again the next time too.
+    """
+
+    def __init__(self, path: str | Path):
+        self._path = Path(path)
+        self._watermarks: dict[str, str] = load_state(self._path)
+        self._pending: dict[str, datetime] = {}
+        self._failed: set[str] = set()
+
+    def get(self, org_login: str) -> datetime | None:
+        """The watermark of the last successful run."""
+        return parse_timestamp(self._watermarks.get(org_login.lower()))
+
+    def advance(self, org_login: str, changed_at: str | datetime | None) -> None:
+        """Raise the watermark of the current run to ``changed_at``."""
+        changed_at = parse_timestamp(changed_at)
+        if changed_at is None:
+            return
+        key = org_login.lower()
+        if key not in self._pending or changed_at > self._pending[key]:
+            self._pending[key] = changed_at
+
+    def fail(self, org_login: str) -> None:
+        """Keep the watermark of the last successful run for the current run."""
+        self._failed.add(org_login.lower())
+
+    def save(self) -> None:
+        for key, changed_at in self._pending.items():
+            if key in self._failed:
+                logger.info("kept the watermark of org=%s after a failure", key)
+            else:
+                self._watermarks[key] = changed_at.isoformat()
+        self._pending.clear()
+        self._failed.clear()
+        save_state(self._path, self._watermarks)
+        logger.debug("saved the watermarks of %s orgs", len(self._watermarks))
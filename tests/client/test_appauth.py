@@ -0,0 +1,210 @@
+import base64
+import json
+import time
+from datetime import UTC, datetime
+
+import pytest
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from pytest_httpx import HTTPXMock
+from pytest_mock import MockerFixture
+
+from nodestream_github.client.appauth import GithubAppAuthError, sign_app_jwt
+from nodestream_github.client.githubclient import GithubRestApiClient
+from nodestream_github.types.enums import TeamMemberRole
+from tests.mocks.githubrest import DEFAULT_HOSTNAME, GithubHttpxMock
+
+APP_ID = 1234
+INSTALLATIONS = [
+    {"id": 11, "account": {"login": "org-a", "type": "Organization"}},
+    {"id": 22, "account": {"login": "Org-B", "type": "Organization"}},
+]
+
+
+@pytest.fixture(scope="module")
+def private_key() -> rsa.RSAPrivateKey:
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture(scope="module")
+def private_key_pem(private_key: rsa.RSAPrivateKey) -> str:
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+def expires_in(seconds: float) -> str:
+    return datetime.fromtimestamp(time.time() + seconds, tz=UTC).isoformat()
+
+
+def decode(segment: str) -> dict:
+    return json.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+
+
+def app_client(private_key_pem: str, **kwargs: object) -> GithubRestApiClient:
+    return GithubRestApiClient(
+        github_hostname=DEFAULT_HOSTNAME,
+        app_id=APP_ID,
+        app_private_key=private_key_pem,
+        max_retries=0,
+        **kwargs,
+    )
+
+
+def test_sign_app_jwt(private_key: rsa.RSAPrivateKey, private_key_pem: str):
+    token = sign_app_jwt("1234", private_key_pem, now=1_000_000)
+
+    header, payload, signature = token.split(".")
+    assert decode(header) == {"alg": "RS256", "typ": "JWT"}
+    assert decode(payload) == {"iat": 999_940, "exp": 1_000_540, "iss": "1234"}
+    private_key.public_key().verify(
+        base64.urlsafe_b64decode(signature + "=" * (-len(signature) % 4)),
+        f"{header}.{payload}".encode(),
+        padding.PKCS1v15(),
+        hashes.SHA256(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_requests_use_installation_of_their_org(
+    gh_rest_mock: GithubHttpxMock, httpx_mock: HTTPXMock, private_key_pem: str
+):
+    client = app_client(private_key_pem)
+
+    gh_rest_mock.app_installations(json=INSTALLATIONS)
+    gh_rest_mock.installation_access_token(
+        installation_id=11, json={"token": "token-a", "expires_at": expires_in(3600)}
+    )
+    gh_rest_mock.installation_access_token(
+        installation_id=22, json={"token": "token-b", "expires_at": expires_in(3600)}
+    )
+    for login, token in [("org-a", "token-a"), ("org-b", "token-b")]:
+        gh_rest_mock.get_org(
+            org_name=login,
+            match_headers={"Authorization": f"Bearer {token}"},
+            json={"login": login},
+            is_reusable=True,
+        )
+    gh_rest_mock.all_orgs(
+        match_headers={"Authorization": "Bearer token-a"},
+        json=[{"login": "org-a"}, {"login": "org-b"}],
+    )
+
+    assert [org["login"] async for org in client.fetch_all_organizations()] == [
+        "org-a",
+        "org-b",
+    ]
+    assert await client.fetch_full_org("org-b") == {"login": "org-b"}
+    assert await client.fetch_full_org("org-a") == {"login": "org-a"}
+    assert await client.fetch_full_org("org-b") == {"login": "org-b"}
+
+    app_requests = [
+        request for request in httpx_mock.get_requests() if "/app/" in request.url.path
+    ]
+    assert len(app_requests) == 3
+    for request in app_requests:
+        _header, payload, _signature = (
+            request.headers["Authorization"].removeprefix("Bearer ").split(".")
+        )
+        assert decode(payload)["iss"] == str(APP_ID)
+    # every installation has its own budget
+    assert len(client.tokens) == 2
+
+
+@pytest.mark.asyncio
+async def test_team_members_use_installation_of_their_org(
+    gh_rest_mock: GithubHttpxMock, httpx_mock: HTTPXMock, private_key_pem: str
+):
+    client = app_client(private_key_pem)
+
+    gh_rest_mock.app_installations(json=INSTALLATIONS)
+    gh_rest_mock.installation_access_token(
+        installation_id=11, json={"token": "token-a", "expires_at": expires_in(3600)}
+    )
+    gh_rest_mock.installation_access_token(
+        installation_id=22, json={"token": "token-b", "expires_at": expires_in(3600)}
+    )
+    for login, token in [("org-a", "token-a"), ("Org-B", "token-b")]:
+        gh_rest_mock.get_members_for_team(
+            org_login=login,
+            slug="core",
+            role=TeamMemberRole.MEMBER,
+            match_headers={"Authorization": f"Bearer {token}"},
+            json=[{"login": f"{login}-member"}],
+        )
+
+    for login in ["org-a", "Org-B"]:
+        members = client.fetch_members_for_team(
+            org_login=login, slug="core", role=TeamMemberRole.MEMBER
+        )
+        assert [member["login"] async for member in members] == [f"{login}-member"]
+
+    member_requests = [
+        request
+        for request in httpx_mock.get_requests()
+        if request.url.path.endswith("/members")
+    ]
+    assert [request.headers["Authorization"] for request in member_requests] == [
+        "Bearer token-a",
+        "Bearer token-b",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_installation_token_is_refreshed_before_it_expires(
+    gh_rest_mock: GithubHttpxMock, httpx_mock: HTTPXMock, private_key_pem: str
+):
+    client = app_client(private_key_pem, app_token_refresh_margin_seconds=600)
+
+    gh_rest_mock.app_installations(json=INSTALLATIONS[:1])
+    gh_rest_mock.installation_access_token(
+        installation_id=11, json={"token": "token-1", "expires_at": expires_in(300)}
+    )
+    gh_rest_mock.installation_access_token(
+        installation_id=11, json={"token": "token-2", "expires_at": expires_in(3600)}
+    )
+    gh_rest_mock.get_org(org_name="org-a", json={"login": "org-a"}, is_reusable=True)
+
+    for _ in range(3):
+        assert await client.fetch_full_org("org-a") == {"login": "org-a"}
+
+    org_requests = httpx_mock.get_requests(url=f"{gh_rest_mock.base_url}/orgs/org-a")
+    assert [request.headers["Authorization"] for request in org_requests] == [
+        "Bearer token-2",
+        "Bearer token-2",
+        "Bearer token-2",
+    ]
+    assert len(httpx_mock.get_requests(method="POST")) == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_default_installation_is_logged_not_raised(
+    gh_rest_mock: GithubHttpxMock,
+    private_key_pem: str,
+    caplog: pytest.LogCaptureFixture,
+):
+    client = app_client(private_key_pem, app_installation_id=99)
+
+    gh_rest_mock.app_installations(json=INSTALLATIONS, is_reusable=True)
+
+    with caplog.at_level("WARNING"):
+        assert await client.fetch_full_org("org-a") is None
+    assert "installation 99 not found" in caplog.text
+
+
+def test_app_requires_private_key():
+    with pytest.raises(ValueError, match="app_private_key"):
+        GithubRestApiClient(github_hostname=DEFAULT_HOSTNAME, app_id=APP_ID)
+
+
+def test_app_requires_cryptography(mocker: MockerFixture):
+    mocker.patch("nodestream_github.client.appauth.find_spec", return_value=None)
+
+    with pytest.raises(GithubAppAuthError, match=r"nodestream-plugin-github\[app\]"):
+        GithubRestApiClient(
+            github_hostname="no-cryptography.example.com",
+            app_id=APP_ID,
+            app_private_key="unused",
+        )
@@ -1,11 +1,15 @@
+import asyncio
+import time
+from contextlib import aclosing
+from pathlib import Path
+from typing import Any
+
 import httpx
 import pytest
 from pytest_httpx import HTTPXMock
+from pytest_mock import MockerFixture
 
-from nodestream_github.client.githubclient import (
-    GithubRestApiClient,
-    RateLimitedError,
-)
+from nodestream_github.client.githubclient import GithubRestApiClient
 from tests.mocks.githubrest import DEFAULT_BASE_URL, DEFAULT_HOSTNAME
 
 
@@ -41,23 +45,409 @@ async def test_retry_bad_status(httpx_mock: HTTPXMock, status_code: int):
         _ignore = [item async for item in client._get_paginated("example")]
 
 
+def rate_limit_status(*, limit: int, remaining: int, reset: float) -> dict:
+    core = {
+        "limit": limit,
+        "remaining": remaining,
+        "reset": int(reset),
+        "used": limit - remaining,
+    }
+    return {"resources": {"core": core}, "rate": core}
+
+
+def rate_limit_headers(*, limit: int, remaining: int, reset: float) -> dict:
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(int(reset)),
+        "X-RateLimit-Used": str(limit - remaining),
+        "X-RateLimit-Resource": "core",
+    }
+
+
 @pytest.mark.asyncio
-async def test_retry_ratelimited(httpx_mock: HTTPXMock):
+async def test_ratelimited_requests_wait_for_slot(
+    httpx_mock: HTTPXMock, mocker: MockerFixture
+):
+    # github.com is used so the probe is not answered by the conftest default
     client = GithubRestApiClient(
         auth_token="test-auth-token",
-        github_hostname=DEFAULT_HOSTNAME,
         user_agent="test-user-agent",
-        max_retries=2,
+        max_retries=0,
         rate_limit_per_minute=1,
+        rate_limit_burst=1,
     )
+    sleep = mocker.patch("asyncio.sleep")
 
     httpx_mock.add_response(
-        url=f"{DEFAULT_BASE_URL}/example?per_page=100", json=["a", "b"]
+        url="https://api.github.com/rate_limit",
+        json=rate_limit_status(limit=5000, remaining=5000, reset=time.time() + 3600),
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/example?per_page=100",
+        json=["a", "b"],
+        is_reusable=True,
+    )
+
+    _ignored = [item async for item in client._get_paginated("example")]
+    sleep.assert_not_called()
+    items = [item async for item in client._get_paginated("example")]
+
+    assert items == ["a", "b"]
+    sleep.assert_awaited_once()
+    assert sleep.await_args.args[0] == pytest.approx(60, abs=1)
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_probe_paces_remaining_budget(httpx_mock: HTTPXMock):
+    client = GithubRestApiClient(auth_token="test-auth-token", max_retries=0)
+
+    httpx_mock.add_response(
+        url="https://api.github.com/rate_limit",
+        json=rate_limit_status(limit=5000, remaining=1000, reset=time.time() + 2000),
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/example?per_page=100",
+        json=["a"],
+        is_reusable=True,
     )
 
     _ignored = [item async for item in client._get_paginated("example")]
-    with pytest.raises(RateLimitedError):
-        _ignored = [item async for item in client._get_paginated("example")]
+    _ignored = [item async for item in client._get_paginated("example")]
+
+    assert client.rate_limiter.emission_interval == pytest.approx(2, abs=0.01)
+    assert client.rate_limiter.burst == client.rate_limit_per_minute
+    assert len(httpx_mock.get_requests(url="https://api.github.com/rate_limit")) == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_disabled_skips_limiter(httpx_mock: HTTPXMock):
+    client = GithubRestApiClient(
+        auth_token="test-auth-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        rate_limit_per_minute=1,
+    )
+
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=100",
+        json=["a"],
+        is_reusable=True,
+    )
+
+    for _ in range(3):
+        assert [item async for item in client._get_paginated("example")] == ["a"]
+    assert client.rate_limiter is None
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_wait_is_counted(httpx_mock: HTTPXMock):
+    client = GithubRestApiClient(
+        auth_token="test-auth-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+    )
+    httpx_mock.add_response(url=f"{DEFAULT_BASE_URL}/example?per_page=100", json=["a"])
+
+    client.pause_gate.close_for(0.05)
+    assert [item async for item in client._get_paginated("example")] == ["a"]
+    await client.aclose()
+
+    assert client.rate_limit_wait_seconds >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_headers_adjust_pacing(
+    httpx_mock: HTTPXMock, mocker: MockerFixture
+):
+    client = GithubRestApiClient(auth_token="test-auth-token", max_retries=0)
+    sleep = mocker.patch("asyncio.sleep")
+    reset = time.time() + 100
+
+    httpx_mock.add_response(
+        url="https://api.github.com/rate_limit",
+        json=rate_limit_status(limit=5000, remaining=5000, reset=reset),
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/example?per_page=100",
+        json=["a"],
+        headers=rate_limit_headers(limit=5000, remaining=10, reset=reset),
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/example?per_page=100",
+        json=["b"],
+        headers=rate_limit_headers(limit=5000, remaining=0, reset=reset),
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/example?per_page=100",
+        json=["c"],
+    )
+
+    assert [item async for item in client._get_paginated("example")] == ["a"]
+    assert client.rate_limiter.emission_interval == pytest.approx(10, abs=0.1)
+    assert client.rate_limiter.burst == 10
+
+    assert [item async for item in client._get_paginated("example")] == ["b"]
+    assert [item async for item in client._get_paginated("example")] == ["c"]
+    sleep.assert_awaited_once()
+    # the reset header is in whole seconds
+    assert sleep.await_args.args[0] == pytest.approx(100, abs=2)
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_probe_failure_keeps_configured_rate(httpx_mock: HTTPXMock):
+    client = GithubRestApiClient(auth_token="test-auth-token", max_retries=0)
+
+    httpx_mock.add_response(
+        url="https://api.github.com/rate_limit",
+        status_code=httpx.codes.INTERNAL_SERVER_ERROR,
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/example?per_page=100", json=["a"]
+    )
+
+    assert [item async for item in client._get_paginated("example")] == ["a"]
+    assert client.rate_limiter.emission_interval == pytest.approx(
+        60 / client.rate_limit_per_minute
+    )
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_after_retries_is_logged_not_raised(
+    httpx_mock: HTTPXMock, mocker: MockerFixture
+):
+    client = GithubRestApiClient(
+        auth_token="test-auth-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=2,
+        max_retry_wait_seconds=0,
+    )
+    mocker.patch.object(client.pause_gate, "wait")
+
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/organizations?per_page=100",
+        status_code=httpx.codes.TOO_MANY_REQUESTS,
+        headers={"Retry-After": "0"},
+        is_reusable=True,
+    )
+
+    assert [org async for org in client.fetch_all_organizations()] == []
+    assert (
+        len(
+            httpx_mock.get_requests(
+                url=f"{DEFAULT_BASE_URL}/organizations?per_page=100"
+            )
+        )
+        == 2
+    )
+
+
+@pytest.mark.parametrize(
+    ("status_code", "headers", "json", "expected_pause"),
+    [
+        (httpx.codes.FORBIDDEN, {"Retry-After": "0"}, None, 0),
+        (httpx.codes.TOO_MANY_REQUESTS, {"Retry-After": "7"}, None, 7),
+        (httpx.codes.TOO_MANY_REQUESTS, {}, None, 60),
+        (
+            httpx.codes.FORBIDDEN,
+            {},
+            {"message": "You have exceeded a secondary rate limit."},
+            60,
+        ),
+    ],
+)
+@pytest.mark.asyncio
+async def test_secondary_rate_limit_pauses_and_retries(
+    httpx_mock: HTTPXMock,
+    mocker: MockerFixture,
+    status_code: int,
+    headers: dict[str, str],
+    json: dict | None,
+    expected_pause: float,
+):
+    client = GithubRestApiClient(
+        auth_token="test-auth-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=2,
+    )
+    close_for = mocker.spy(client.pause_gate, "close_for")
+    mocker.patch.object(client.pause_gate, "wait")
+
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=100",
+        status_code=status_code,
+        headers=headers,
+        json=json,
+    )
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=100", json=["a", "b"]
+    )
+
+    items = [item async for item in client._get_paginated("example")]
+
+    assert items == ["a", "b"]
+    close_for.assert_called_once_with(expected_pause)
+
+
+@pytest.mark.asyncio
+async def test_primary_rate_limit_exhausted_pauses_until_reset(
+    httpx_mock: HTTPXMock, mocker: MockerFixture
+):
+    client = GithubRestApiClient(
+        auth_token="test-auth-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=2,
+    )
+    close_for = mocker.spy(client.pause_gate, "close_for")
+    mocker.patch.object(client.pause_gate, "wait")
+
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=100",
+        status_code=httpx.codes.FORBIDDEN,
+        headers=rate_limit_headers(limit=5000, remaining=0, reset=time.time() + 120),
+        json={"message": "API rate limit exceeded"},
+    )
+    httpx_mock.add_response(url=f"{DEFAULT_BASE_URL}/example?per_page=100", json=["a"])
+
+    assert [item async for item in client._get_paginated("example")] == ["a"]
+    # the reset header is in whole seconds
+    assert close_for.call_args.args[0] == pytest.approx(120, abs=2)
+
+
+@pytest.mark.asyncio
+async def test_token_pool_sends_requests_with_most_remaining_budget(
+    httpx_mock: HTTPXMock,
+):
+    client = GithubRestApiClient(auth_tokens=["token-a", "token-b"], max_retries=0)
+    reset = time.time() + 3600
+
+    for token, remaining in [("token-a", 10), ("token-b", 4000)]:
+        httpx_mock.add_response(
+            url="https://api.github.com/rate_limit",
+            match_headers={"Authorization": f"Bearer {token}"},
+            json=rate_limit_status(limit=5000, remaining=remaining, reset=reset),
+        )
+    httpx_mock.add_response(
+        url="https://api.github.com/example?per_page=100",
+        match_headers={"Authorization": "Bearer token-b"},
+        json=["a"],
+    )
+
+    assert [item async for item in client._get_paginated("example")] == ["a"]
+    assert client.default_headers["Authorization"] == "Bearer token-a"
+    assert [token.budget.remaining for token in client.tokens] == [10, 4000]
+
+
+@pytest.mark.asyncio
+async def test_exhausted_token_is_parked_and_retried_with_another(
+    httpx_mock: HTTPXMock, mocker: MockerFixture
+):
+    client = GithubRestApiClient(
+        auth_token="token-a",
+        auth_tokens=["token-a", "token-b"],
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=2,
+    )
+    close_for = mocker.spy(client.pause_gate, "close_for")
+
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=100",
+        match_headers={"Authorization": "Bearer token-a"},
+        status_code=httpx.codes.FORBIDDEN,
+        headers=rate_limit_headers(limit=5000, remaining=0, reset=time.time() + 120),
+        json={"message": "API rate limit exceeded"},
+    )
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=100",
+        match_headers={"Authorization": "Bearer token-b"},
+        json=["a"],
+        is_reusable=True,
+    )
+
+    assert [item async for item in client._get_paginated("example")] == ["a"]
+    assert [item async for item in client._get_paginated("example")] == ["a"]
+    close_for.assert_not_called()
+    token_a, _ = client.tokens
+    # the reset header is in whole seconds
+    assert token_a.parked_for() == pytest.approx(120, abs=2)
+
+
+@pytest.mark.asyncio
+async def test_forbidden_without_rate_limit_is_not_retried(httpx_mock: HTTPXMock):
+    client = GithubRestApiClient(
+        auth_token="test-auth-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=2,
+    )
+
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=100",
+        status_code=httpx.codes.FORBIDDEN,
+        json={"message": "Resource not accessible by integration"},
+    )
+
+    with pytest.raises(httpx.HTTPStatusError):
+        _ignore = [item async for item in client._get_paginated("example")]
+    assert not client.pause_gate.is_closed
+
+
+@pytest.mark.asyncio
+async def test_conditional_requests_use_cache(httpx_mock: HTTPXMock, tmp_path: Path):
+    def new_client() -> GithubRestApiClient:
+        return GithubRestApiClient(
+            auth_token="test-auth-token",
+            github_hostname=DEFAULT_HOSTNAME,
+            max_retries=0,
+            http_cache_path=str(tmp_path / "http-cache.db"),
+        )
+
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=100",
+        json=["a", "b"],
+        headers={"ETag": '"v1"'},
+    )
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=100",
+        match_headers={"If-None-Match": '"v1"'},
+        status_code=httpx.codes.NOT_MODIFIED,
+    )
+
+    assert [item async for item in new_client()._get_paginated("example")] == [
+        "a",
+        "b",
+    ]
+    assert [item async for item in new_client()._get_paginated("example")] == [
+        "a",
+        "b",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_conditional_requests_are_shared_by_the_token_pool(
+    httpx_mock: HTTPXMock, tmp_path: Path
+):
+    client = GithubRestApiClient(
+        auth_tokens=["token-a", "token-b"],
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        http_cache_path=str(tmp_path / "http-cache.db"),
+    )
+
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=100",
+        match_headers={"Authorization": "Bearer token-a"},
+        json=["a", "b"],
+        headers={"ETag": '"v1"'},
+    )
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=100",
+        match_headers={"Authorization": "Bearer token-b", "If-None-Match": '"v1"'},
+        status_code=httpx.codes.NOT_MODIFIED,
+    )
+
+    for _ in range(2):
+        items = [item async for item in client._get_paginated("example")]
+        assert items == ["a", "b"]
 
 
 @pytest.mark.asyncio
@@ -88,6 +478,189 @@ async def test_pagination(httpx_mock: HTTPXMock):
     assert items == ["a", "b", "c", "d"]
 
 
+def add_numbered_pages(httpx_mock: HTTPXMock, pages: list[list[str]]):
+    last_page = f'<{DEFAULT_BASE_URL}/example?per_page=2&page={len(pages)}>; rel="last"'
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=2",
+        json=pages[0],
+        headers={
+            "link": (
+                f'<{DEFAULT_BASE_URL}/example?per_page=2&page=2>; rel="next", '
+                + last_page
+            )
+        },
+    )
+    for number, page in enumerate(pages[1:], start=2):
+        httpx_mock.add_response(
+            url=f"{DEFAULT_BASE_URL}/example?per_page=2&page={number}",
+            json=page,
+        )
+
+
+@pytest.mark.asyncio
+async def test_pagination_fans_out_numbered_pages(httpx_mock: HTTPXMock):
+    client = GithubRestApiClient(
+        auth_token="test-auth-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=2,
+        max_page_fan_out=2,
+    )
+    add_numbered_pages(httpx_mock, [["a", "b"], ["c", "d"], ["e", "f"], ["g"]])
+
+    items = [item async for item in client._get_paginated("example")]
+
+    assert items == ["a", "b", "c", "d", "e", "f", "g"]
+
+
+@pytest.mark.asyncio
+async def test_pagination_fan_out_completion_order(httpx_mock: HTTPXMock):
+    client = GithubRestApiClient(
+        auth_token="test-auth-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=2,
+        max_page_fan_out=3,
+        page_order="completion",
+    )
+    add_numbered_pages(httpx_mock, [["a", "b"], ["c", "d"], ["e", "f"], ["g"]])
+
+    items = [item async for item in client._get_paginated("example")]
+
+    assert items[:2] == ["a", "b"]
+    assert sorted(items) == ["a", "b", "c", "d", "e", "f", "g"]
+
+
+@pytest.mark.asyncio
+async def test_pagination_without_fan_out_follows_next(httpx_mock: HTTPXMock):
+    client = GithubRestApiClient(
+        auth_token="test-auth-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=2,
+        max_page_fan_out=1,
+    )
+    add_numbered_pages(httpx_mock, [["a", "b"], ["c"]])
+
+    items = [item async for item in client._get_paginated("example")]
+
+    assert items == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_pagination_fan_out_page_failure(httpx_mock: HTTPXMock):
+    client = GithubRestApiClient(
+        auth_token="test-auth-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=2,
+        max_page_fan_out=4,
+    )
+    last_page = f'<{DEFAULT_BASE_URL}/example?per_page=2&page=3>; rel="last"'
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=2",
+        json=["a", "b"],
+        headers={
+            "link": (
+                f'<{DEFAULT_BASE_URL}/example?per_page=2&page=2>; rel="next", '
+                + last_page
+            )
+        },
+    )
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=2&page=2",
+        status_code=httpx.codes.INTERNAL_SERVER_ERROR,
+    )
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=2&page=3",
+        json=["e"],
+        is_optional=True,
+    )
+
+    with pytest.raises(httpx.HTTPStatusError):
+        _ignore = [item async for item in client._get_paginated("example")]
+
+
+def add_cursor_pages(httpx_mock: HTTPXMock, pages: list[list[str]]):
+    for number, page in enumerate(pages):
+        url = f"{DEFAULT_BASE_URL}/example?per_page=2"
+        if number:
+            url += f"&since={number}"
+        headers = {}
+        if number + 1 < len(pages):
+            next_url = f"{DEFAULT_BASE_URL}/example?per_page=2&since={number + 1}"
+            headers["link"] = f'<{next_url}>; rel="next"'
+        httpx_mock.add_response(url=url, json=page, headers=headers)
+
+
+@pytest.mark.parametrize(("page_prefetch", "expected_requests"), [(0, 2), (1, 3)])
+@pytest.mark.asyncio
+async def test_pagination_prefetches_next_page(
+    httpx_mock: HTTPXMock, page_prefetch: int, expected_requests: int
+):
+    client = GithubRestApiClient(
+        auth_token="test-auth-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=2,
+        page_prefetch=page_prefetch,
+    )
+    add_cursor_pages(httpx_mock, [["a", "b"], ["c", "d"], ["e"]])
+
+    items = client._get_paginated("example")
+    assert await anext(items) == "a"
+    await asyncio.sleep(0.05)
+
+    # the probe plus page one, and page two when it is read ahead
+    assert len(httpx_mock.get_requests()) == expected_requests
+    assert [item async for item in items] == ["b", "c", "d", "e"]
+
+
+@pytest.mark.asyncio
+async def test_pagination_prefetch_stops_with_the_caller(httpx_mock: HTTPXMock):
+    client = GithubRestApiClient(
+        auth_token="test-auth-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=2,
+        page_prefetch=1,
+    )
+    add_cursor_pages(httpx_mock, [["a", "b"], ["c", "d"]])
+
+    async with aclosing(client._get_paginated("example")) as items:
+        assert await anext(items) == "a"
+        await asyncio.sleep(0.05)
+
+    assert asyncio.all_tasks() == {asyncio.current_task()}
+
+
+@pytest.mark.asyncio
+async def test_pagination_prefetch_failure(httpx_mock: HTTPXMock):
+    client = GithubRestApiClient(
+        auth_token="test-auth-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=2,
+        page_prefetch=2,
+    )
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=2",
+        json=["a", "b"],
+        headers={
+            "link": f'<{DEFAULT_BASE_URL}/example?per_page=2&since=1>; rel="next"'
+        },
+    )
+    httpx_mock.add_response(
+        url=f"{DEFAULT_BASE_URL}/example?per_page=2&since=1",
+        status_code=httpx.codes.BAD_GATEWAY,
+    )
+
+    items = client._get_paginated("example")
+    assert [await anext(items), await anext(items)] == ["a", "b"]
+    with pytest.raises(httpx.HTTPStatusError):
+        await anext(items)
+
+
 @pytest.mark.asyncio
 async def test_pagination_truncate_warning(
     httpx_mock: HTTPXMock, caplog: pytest.LogCaptureFixture
@@ -127,6 +700,74 @@ async def test_pagination_truncate_warning(
     assert expected_warning in caplog.text
 
 
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({"max_page_fan_out": 0}, "max_page_fan_out"),
+        ({"page_order": "random"}, "random"),
+        ({"page_prefetch": -1}, "page_prefetch"),
+    ],
+)
+def test_invalid_pagination_args(kwargs: dict, message: str):
+    with pytest.raises(ValueError, match=message):
+        GithubRestApiClient(auth_token="test-auth-token", **kwargs)
+
+
+def test_connection_settings():
+    client = GithubRestApiClient(
+        auth_token="test-auth-token",
+        connect_timeout=1,
+        read_timeout=30,
+        write_timeout=2,
+        pool_timeout=3,
+    )
+
+    assert client.session.timeout == httpx.Timeout(connect=1, read=30, write=2, pool=3)
+
+
+def test_default_connection_settings():
+    client = GithubRestApiClient(auth_token="test-auth-token")
+
+    assert client.session.timeout == httpx.Timeout(5)
+
+
+def test_http2_falls_back_without_h2(
+    mocker: MockerFixture, caplog: pytest.LogCaptureFixture
+):
+    async_client = httpx.AsyncClient
+
+    def without_h2(**kwargs: Any) -> httpx.AsyncClient:
+        if kwargs.get("http2"):
+            msg = "Using http2=True, but the 'h2' package is not installed."
+            raise ImportError(msg)
+        return async_client(**kwargs)
+
+    mocker.patch("httpx.AsyncClient", side_effect=without_h2)
+
+    with caplog.at_level("WARNING"):
+        client = GithubRestApiClient(
+            auth_token="test-auth-token", http2=True, max_connections=8
+        )
+
+    assert isinstance(client.session, async_client)
+    assert "falling back to HTTP/1.1" in caplog.text
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({"max_connections": 0}, "max_connections"),
+        ({"max_keepalive_connections": -1}, "max_keepalive_connections"),
+        ({"keepalive_expiry": -1}, "keepalive_expiry"),
+        ({"connect_timeout": -1}, "connect_timeout"),
+        ({"read_timeout": -0.5}, "read_timeout"),
+    ],
+)
+def test_invalid_connection_args(kwargs: dict, message: str):
+    with pytest.raises(ValueError, match=message):
+        GithubRestApiClient(auth_token="test-auth-token", **kwargs)
+
+
 def test_all_null_args():
     # noinspection PyTypeChecker
     assert GithubRestApiClient(auth_token=None, github_hostname=None)
@@ -0,0 +1,105 @@
+import os
+from pathlib import Path
+
+import httpx
+import pytest
+
+from nodestream_github.client.httpcache import ConditionalRequestCache
+
+
+def response(
+    url: str = "https://example.com/items?page=2",
+    *,
+    authorization: str = "Bearer token-a",
+    content: bytes = b'["a", "b"]',
+    status_code: int = httpx.codes.OK,
+    **headers: str,
+) -> httpx.Response:
+    request = httpx.Request("GET", url, headers={"Authorization": authorization})
+    return httpx.Response(
+        status_code, headers=headers, content=content, request=request
+    )
+
+
+def test_round_trip(tmp_path: Path):
+    cache = ConditionalRequestCache(tmp_path / "cache.db")
+    stored = response(
+        ETag='"abc"',
+        Link='<https://example.com/items?page=3>; rel="next"',
+        **{"X-RateLimit-Remaining": "10"},
+    )
+
+    cache.put(stored, "user-a")
+    cached = cache.get(stored.request, "user-a")
+
+    assert cached.validators() == {"If-None-Match": '"abc"'}
+    replayed = cached.to_response(stored.request)
+    assert replayed.status_code == httpx.codes.OK
+    assert replayed.json() == ["a", "b"]
+    assert replayed.links["next"]["url"] == "https://example.com/items?page=3"
+    assert "X-RateLimit-Remaining" not in replayed.headers
+
+
+def test_survives_reopening(tmp_path: Path):
+    stored = response(**{"Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    ConditionalRequestCache(tmp_path / "cache.db").put(stored, "user-a")
+
+    cache = ConditionalRequestCache(tmp_path / "cache.db")
+
+    assert cache.size > 0
+    assert cache.get(stored.request, "user-a").validators() == {
+        "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"
+    }
+
+
+@pytest.mark.parametrize(
+    "stored",
+    [
+        response(),
+        response(ETag='"abc"', status_code=httpx.codes.NOT_FOUND),
+    ],
+)
+def test_skips_responses_without_validators(tmp_path: Path, stored: httpx.Response):
+    cache = ConditionalRequestCache(tmp_path / "cache.db")
+
+    cache.put(stored, "user-a")
+
+    assert cache.get(stored.request, "user-a") is None
+    assert cache.size == 0
+
+
+def test_keyed_by_url_and_credential_identity(tmp_path: Path):
+    cache = ConditionalRequestCache(tmp_path / "cache.db")
+    cache.put(response(ETag='"abc"'), "user-a")
+
+    # a reissued token of the same identity still finds the entry
+    assert (
+        cache.get(response(authorization="Bearer token-a2").request, "user-a")
+        is not None
+    )
+    assert cache.get(response().request, "user-b") is None
+    page_3 = response("https://example.com/items?page=3")
+    assert cache.get(page_3.request, "user-a") is None
+
+
+def test_evicts_least_recently_used(tmp_path: Path):
+    cache = ConditionalRequestCache(tmp_path / "cache.db", max_bytes=300)
+    # incompressible bodies so three entries cannot fit
+    first = response("https://example.com/1", ETag='"1"', content=os.urandom(80))
+    second = response("https://example.com/2", ETag='"2"', content=os.urandom(80))
+    third = response("https://example.com/3", ETag='"3"', content=os.urandom(80))
+
+    cache.put(first, "user-a")
+    cache.put(second, "user-a")
+    cache.get(first.request, "user-a")
+    cache.put(third, "user-a")
+
+    assert cache.size <= cache.max_bytes
+    assert cache.get(second.request, "user-a") is None
+    assert cache.get(first.request, "user-a") is not None
+    assert cache.get(third.request, "user-a") is not None
+
+
+def test_invalid_max_bytes(tmp_path: Path):
+    with pytest.raises(ValueError, match="http_cache_max_bytes"):
+        ConditionalRequestCache(tmp_path / "cache.db", max_bytes=0)
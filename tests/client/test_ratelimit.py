@@ -0,0 +1,95 @@
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+
+from nodestream_github.client.ratelimit import (
+    GcraRateLimiter,
+    PauseGate,
+    retry_after_seconds,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_reserve_paces_requests_in_order():
+    clock = FakeClock()
+    limiter = GcraRateLimiter(60, 60, 1, clock=clock)
+
+    assert [limiter.reserve() for _ in range(4)] == [0, 1, 2, 3]
+
+
+def test_reserve_allows_burst():
+    clock = FakeClock()
+    limiter = GcraRateLimiter(60, 60, 3, clock=clock)
+
+    assert [limiter.reserve() for _ in range(5)] == [0, 0, 0, 1, 2]
+
+
+def test_reserve_recovers_after_idle():
+    clock = FakeClock()
+    limiter = GcraRateLimiter(60, 60, 2, clock=clock)
+    assert [limiter.reserve() for _ in range(3)] == [0, 0, 1]
+
+    clock.now += 10
+
+    assert [limiter.reserve() for _ in range(3)] == [0, 0, 1]
+
+
+@pytest.mark.asyncio
+async def test_acquire_sleeps_until_slot(mocker: MockerFixture):
+    clock = FakeClock()
+    limiter = GcraRateLimiter(120, 60, 1, clock=clock)
+    sleep = mocker.patch("asyncio.sleep")
+
+    await limiter.acquire()
+    sleep.assert_not_called()
+    await limiter.acquire()
+    sleep.assert_awaited_once_with(0.5)
+
+
+@pytest.mark.parametrize(("rate", "burst"), [(0, 1), (-1, 1), (10, 0)])
+def test_invalid_arguments(rate: int, burst: int):
+    with pytest.raises(ValueError):  # noqa: PT011
+        GcraRateLimiter(rate, 60, burst)
+
+
+@pytest.mark.asyncio
+async def test_pause_gate_holds_until_reopened(mocker: MockerFixture):
+    clock = FakeClock()
+    gate = PauseGate(clock=clock)
+
+    async def advance(seconds: float):
+        clock.now += seconds
+
+    sleep = mocker.patch("asyncio.sleep", side_effect=advance)
+
+    await gate.wait()
+    sleep.assert_not_called()
+
+    gate.close_for(30)
+    gate.close_for(10)
+    assert gate.is_closed
+    await gate.wait()
+
+    assert not gate.is_closed
+    sleep.assert_awaited_once_with(30)
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({}, None),
+        ({"Retry-After": "42"}, 42),
+        ({"Retry-After": "-1"}, 0),
+        ({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}, 0),
+        ({"Retry-After": "soon"}, None),
+    ],
+)
+def test_retry_after_seconds(headers: dict[str, str], expected: float | None):
+    assert retry_after_seconds(httpx.Headers(headers)) == expected
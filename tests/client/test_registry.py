@@ -0,0 +1,134 @@
+import time
+
+import pytest
+from pytest_httpx import HTTPXMock
+from pytest_mock import MockerFixture
+
+from nodestream_github import GithubTeamsExtractor
+from nodestream_github.client.githubclient import GithubRestApiClient
+from nodestream_github.client.registry import CLIENT_REGISTRY
+from tests.client.test_githubclient import rate_limit_status
+from tests.mocks.githubrest import DEFAULT_HOSTNAME
+
+
+def test_clients_for_one_host_and_token_share_a_connection():
+    first = GithubRestApiClient(
+        auth_token="test-auth-token", github_hostname=DEFAULT_HOSTNAME, per_page=10
+    )
+    second = GithubRestApiClient(
+        auth_token="test-auth-token", github_hostname=DEFAULT_HOSTNAME, per_page=50
+    )
+
+    assert second.session is first.session
+    assert second.rate_limiter is first.rate_limiter
+    assert second.pause_gate is first.pause_gate
+    assert (first.per_page, second.per_page) == (10, 50)
+
+
+def test_first_client_configures_the_shared_connection():
+    first = GithubRestApiClient(
+        auth_token="test-auth-token", rate_limit_per_minute=30, rate_limit_burst=2
+    )
+    second = GithubRestApiClient(
+        auth_token="test-auth-token", rate_limit_per_minute=6000
+    )
+
+    assert second.rate_limit_per_minute == first.rate_limit_per_minute == 30
+    assert second.rate_limiter.burst == 2
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"auth_token": "other-auth-token", "github_hostname": DEFAULT_HOSTNAME},
+        {"auth_token": "test-auth-token"},
+    ],
+)
+def test_clients_for_other_credentials_do_not_share(kwargs: dict):
+    client = GithubRestApiClient(
+        auth_token="test-auth-token", github_hostname=DEFAULT_HOSTNAME
+    )
+
+    other = GithubRestApiClient(**kwargs)
+
+    assert other.session is not client.session
+    assert other.rate_limiter is not client.rate_limiter
+
+
+@pytest.mark.asyncio
+async def test_overlapping_token_pools_share_the_common_token():
+    first = GithubRestApiClient(
+        auth_tokens=["token-a", "token-b"], github_hostname=DEFAULT_HOSTNAME
+    )
+    second = GithubRestApiClient(
+        auth_tokens=["token-b", "token-c"], github_hostname=DEFAULT_HOSTNAME
+    )
+    a, b = first.tokens
+    other_b, c = second.tokens
+
+    assert second.session is not first.session
+    assert other_b is b
+    assert c.rate_limiter is not a.rate_limiter
+
+    await first.aclose()
+    third = GithubRestApiClient(
+        auth_tokens=["token-b"], github_hostname=DEFAULT_HOSTNAME
+    )
+    assert next(iter(third.tokens)) is b
+
+    await second.aclose()
+    await third.aclose()
+    fourth = GithubRestApiClient(
+        auth_tokens=["token-b"], github_hostname=DEFAULT_HOSTNAME
+    )
+    assert next(iter(fourth.tokens)) is not b
+
+
+@pytest.mark.asyncio
+async def test_last_client_closes_the_connection():
+    first = GithubRestApiClient(auth_token="test-auth-token")
+    second = GithubRestApiClient(auth_token="test-auth-token")
+    session = first.session
+
+    await first.aclose()
+    await first.aclose()
+    assert not session.is_closed
+
+    await second.aclose()
+    assert session.is_closed
+    assert ("https://api.github.com", ("test-auth-token",)) not in CLIENT_REGISTRY
+
+    third = GithubRestApiClient(auth_token="test-auth-token")
+    assert third.session is not session
+
+
+@pytest.mark.asyncio
+async def test_clients_share_one_rate_budget(httpx_mock: HTTPXMock):
+    first = GithubRestApiClient(auth_token="test-auth-token", max_retries=0)
+    second = GithubRestApiClient(auth_token="test-auth-token", max_retries=0)
+
+    httpx_mock.add_response(
+        url="https://api.github.com/rate_limit",
+        json=rate_limit_status(limit=5000, remaining=1000, reset=time.time() + 2000),
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/example?per_page=100",
+        json=["a"],
+        is_reusable=True,
+    )
+
+    _ignored = [item async for item in first._get_paginated("example")]
+    _ignored = [item async for item in second._get_paginated("example")]
+
+    assert second.rate_limiter.emission_interval == pytest.approx(2, abs=0.01)
+    assert len(httpx_mock.get_requests(url="https://api.github.com/rate_limit")) == 1
+
+
+@pytest.mark.asyncio
+async def test_extractor_releases_client_when_finished(mocker: MockerFixture):
+    extractor = GithubTeamsExtractor(auth_token="test-auth-token")
+    session = extractor.client.session
+
+    await extractor.finish(mocker.Mock())
+
+    assert session.is_closed
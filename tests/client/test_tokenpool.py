@@ -0,0 +1,87 @@
+import math
+
+import pytest
+
+from nodestream_github.client.ratelimit import GcraRateLimiter, RateLimitBudget
+from nodestream_github.client.tokenpool import PooledToken, TokenPool
+
+NOW = 1_000_000.0
+
+
+def pooled(
+    name: str, *, remaining: int | None = None, reset: float = NOW + 60
+) -> PooledToken:
+    token = PooledToken(name, None, clock=lambda: NOW)
+    if remaining is not None:
+        token.observe(RateLimitBudget(limit=5000, remaining=remaining, reset=reset))
+    return token
+
+
+def test_unknown_budget_is_unlimited():
+    token = pooled("a")
+
+    assert token.remaining == math.inf
+    assert token.parked_for() == 0
+
+
+def test_exhausted_token_is_parked_until_reset():
+    token = pooled("a", remaining=0, reset=NOW + 30)
+
+    assert token.parked_for() == pytest.approx(30)
+
+
+def test_budget_is_restored_after_reset():
+    token = pooled("a", remaining=0, reset=NOW - 1)
+
+    assert token.remaining == 5000
+    assert token.parked_for() == 0
+
+
+def test_choose_most_remaining_budget():
+    most = pooled("b", remaining=300)
+    pool = TokenPool([pooled("a", remaining=10), most, pooled("c", remaining=20)])
+
+    assert pool.choose() is most
+
+
+def test_choose_skips_parked_tokens():
+    available = pooled("b", remaining=1)
+    pool = TokenPool([pooled("a", remaining=0), available])
+
+    assert pool.has_available()
+    assert pool.choose() is available
+
+
+def test_choose_token_that_resets_first_when_all_are_exhausted():
+    first = pooled("b", remaining=0, reset=NOW + 5)
+    pool = TokenPool([pooled("a", remaining=0, reset=NOW + 50), first])
+
+    assert not pool.has_available()
+    assert pool.choose() is first
+
+
+@pytest.mark.asyncio
+async def test_acquire_spreads_unknown_budgets_round_robin():
+    pool = TokenPool([pooled("a"), pooled("b"), pooled("c")])
+
+    chosen = [(await pool.acquire()).token for _ in range(6)]
+
+    assert chosen == ["a", "b", "c", "a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_acquire_counts_dispatched_requests_against_budget():
+    pool = TokenPool([pooled("a", remaining=4), pooled("b", remaining=1)])
+
+    chosen = [(await pool.acquire()).token for _ in range(4)]
+
+    assert chosen == ["a", "a", "a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_token_limiter():
+    limiter = GcraRateLimiter(60, burst=1)
+    token = PooledToken("a", limiter)
+
+    assert await TokenPool([token]).acquire() is token
+    assert limiter.reserve() == pytest.approx(1, abs=0.1)
@@ -1,9 +1,31 @@
+from collections.abc import Iterator
+
+import httpx
 import pytest
 from pytest_httpx import HTTPXMock
 
+from nodestream_github.client.registry import CLIENT_REGISTRY
 from tests.mocks.githubrest import GithubHttpxMock
 
 
 @pytest.fixture
 def gh_rest_mock(httpx_mock: HTTPXMock) -> GithubHttpxMock:
     return GithubHttpxMock(httpx_mock)
+
+
+@pytest.fixture(autouse=True)
+def rate_limiting_disabled(httpx_mock: HTTPXMock) -> None:
+    """Answer the startup rate limit probe the way GHES does without rate limits."""
+    GithubHttpxMock(httpx_mock).rate_limit(
+        status_code=httpx.codes.NOT_FOUND,
+        json={"message": "Rate limiting is not enabled."},
+        is_optional=True,
+        is_reusable=True,
+    )
+
+
+@pytest.fixture(autouse=True)
+def isolated_client_registry() -> Iterator[None]:
+    """Keep clients of different tests from sharing a connection."""
+    yield
+    CLIENT_REGISTRY.clear()
@@ -8,6 +8,8 @@ from nodestream_github.types.enums import (
     CollaboratorAffiliation,
     OrgMemberRole,
     OrgRepoType,
+    RepoSort,
+    SortDirection,
     TeamMemberRole,
     UserRepoType,
 )
@@ -69,6 +71,21 @@ class GithubHttpxMock:
             **matchers,
         )
 
+    def rate_limit(self, **kwargs: Any) -> None:
+        self.add_response(url=f"{self.base_url}/rate_limit", **kwargs)
+
+    def app_installations(self, **kwargs: Any) -> None:
+        self.add_response(
+            url=f"{self.base_url}/app/installations?per_page=100", **kwargs
+        )
+
+    def installation_access_token(self, *, installation_id: int, **kwargs: Any):
+        self.add_response(
+            method="POST",
+            url=f"{self.base_url}/app/installations/{installation_id}/access_tokens",
+            **kwargs,
+        )
+
     def all_orgs(self, **kwargs: Any) -> None:
         self.add_response(
             url=f"{self.base_url}/organizations?per_page={self.per_page}", **kwargs
@@ -90,16 +107,25 @@ class GithubHttpxMock:
             **kwargs,
         )
 
+    def get_outside_collaborators_for_org(self, *, org_login: str, **kwargs: Any):
+        self.add_response(
+            url=f"{self.base_url}/orgs/{org_login}/outside_collaborators?per_page={self.per_page}",
+            **kwargs,
+        )
+
     def get_repos_for_org(
         self,
         *,
         org_name: str,
         repo_type: OrgRepoType | None = None,
+        sort: RepoSort | None = None,
+        direction: SortDirection | None = None,
         **kwargs: Any,
     ):
         type_param = f"&type={repo_type}" if repo_type else ""
+        sort_params = f"&sort={sort}&direction={direction}" if sort else ""
         self.add_response(
-            url=f"{self.base_url}/orgs/{org_name}/repos?per_page={self.per_page}{type_param}",
+            url=f"{self.base_url}/orgs/{org_name}/repos?per_page={self.per_page}{type_param}{sort_params}",
             **kwargs,
         )
 
@@ -117,12 +143,13 @@ class GithubHttpxMock:
     def get_members_for_team(
         self,
         *,
-        team_id: int,
+        org_login: str,
+        slug: str,
         role: TeamMemberRole,
         **kwargs: Any,
     ):
         self.add_response(
-            url=f"{self.base_url}/teams/{team_id}/members?per_page={self.per_page}&role={role}",
+            url=f"{self.base_url}/orgs/{org_login}/teams/{slug}/members?per_page={self.per_page}&role={role}",
             **kwargs,
         )
 
@@ -168,6 +195,22 @@ class GithubHttpxMock:
             **kwargs,
         )
 
+    def get_protected_branches_for_repo(
+        self, *, owner_login: str, repo_name: str, **kwargs: Any
+    ) -> None:
+        self.add_response(
+            url=f"{self.base_url}/repos/{owner_login}/{repo_name}/branches?per_page={self.per_page}&protected=true",
+            **kwargs,
+        )
+
+    def get_branch_protection(
+        self, *, owner_login: str, repo_name: str, branch: str, **kwargs: Any
+    ) -> None:
+        self.add_response(
+            url=f"{self.base_url}/repos/{owner_login}/{repo_name}/branches/{branch}/protection",
+            **kwargs,
+        )
+
     def all_users(self, **kwargs: Any):
         self.add_response(
             url=f"{self.base_url}/users?per_page={self.per_page}", **kwargs
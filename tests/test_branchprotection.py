@@ -1,11 +1,24 @@
+from pathlib import Path
+from unittest.mock import call
+
 import httpx
 import pytest
 from pytest_httpx import HTTPXMock
 from pytest_mock import MockerFixture
 
+from nodestream_github.branchprotection import (
+    DefaultBranchProtection,
+    UnprotectedRepoCache,
+)
 from nodestream_github.client import GithubRestApiClient
 from nodestream_github.client import githubclient as githubclient
-from tests.mocks.githubrest import DEFAULT_BASE_URL, DEFAULT_HOSTNAME
+from tests.data.repos import HELLO_WORLD_REPO
+from tests.mocks.githubrest import (
+    DEFAULT_BASE_URL,
+    DEFAULT_HOSTNAME,
+    DEFAULT_PER_PAGE,
+    GithubHttpxMock,
+)
 
 
 @pytest.mark.asyncio
@@ -57,12 +70,16 @@ async def test_fetch_branch_protection_404(
     )
 
     assert result is None
-    log_info.assert_called_once_with(
-        "Branch protection not found for branch %s on repo %s/%s",
-        "main",
-        "octocat",
-        "Hello-World",
-    )
+    # the first request also probes the server for its rate limit
+    assert log_info.call_args_list == [
+        call("GitHub REST rate limiting is disabled on the server."),
+        call(
+            "Branch protection not found for branch %s on repo %s/%s",
+            "main",
+            "octocat",
+            "Hello-World",
+        ),
+    ]
 
 
 @pytest.mark.asyncio
@@ -96,3 +113,85 @@ async def test_fetch_branch_protection_503(
         "",
         stacklevel=2,
     )
+
+
+@pytest.fixture
+def client() -> GithubRestApiClient:
+    return GithubRestApiClient(
+        auth_token="test-auth-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+    )
+
+
+@pytest.mark.asyncio
+async def test_protection_is_only_fetched_for_protected_default_branch(
+    client: GithubRestApiClient, gh_rest_mock: GithubHttpxMock
+):
+    enrichment = DefaultBranchProtection(client, UnprotectedRepoCache())
+    gh_rest_mock.get_protected_branches_for_repo(
+        owner_login="octocat",
+        repo_name="Hello-World",
+        json=[{"name": "release"}, {"name": "master"}],
+    )
+    gh_rest_mock.get_branch_protection(
+        owner_login="octocat",
+        repo_name="Hello-World",
+        branch="master",
+        json={"enabled": True},
+    )
+
+    protection = await enrichment.fetch(owner_login="octocat", repo=HELLO_WORLD_REPO)
+
+    assert protection == {"enabled": True}
+
+
+@pytest.mark.asyncio
+async def test_unprotected_repo_is_not_asked_about_again(
+    client: GithubRestApiClient, gh_rest_mock: GithubHttpxMock, tmp_path: Path
+):
+    path = tmp_path / "unprotected.json"
+    enrichment = DefaultBranchProtection(client, UnprotectedRepoCache(path))
+    gh_rest_mock.get_protected_branches_for_repo(
+        owner_login="octocat", repo_name="Hello-World", json=[{"name": "release"}]
+    )
+
+    assert await enrichment.fetch(owner_login="octocat", repo=HELLO_WORLD_REPO) is None
+    assert await enrichment.fetch(owner_login="octocat", repo=HELLO_WORLD_REPO) is None
+    enrichment.unprotected.save()
+
+    next_run = DefaultBranchProtection(client, UnprotectedRepoCache(path))
+    assert await next_run.fetch(owner_login="octocat", repo=HELLO_WORLD_REPO) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_listing_is_not_cached(
+    client: GithubRestApiClient, gh_rest_mock: GithubHttpxMock
+):
+    enrichment = DefaultBranchProtection(client, UnprotectedRepoCache())
+    gh_rest_mock.get_protected_branches_for_repo(
+        owner_login="octocat", repo_name="Hello-World", status_code=403
+    )
+
+    assert await enrichment.fetch(owner_login="octocat", repo=HELLO_WORLD_REPO) is None
+    assert "1296269:master" not in enrichment.unprotected
+
+
+def test_unprotected_cache_expires():
+    now = 1000.0
+    cache = UnprotectedRepoCache(ttl_seconds=60, clock=lambda: now)
+    cache.add("1:main")
+
+    assert "1:main" in cache
+    now += 61
+    assert "1:main" not in cache
+
+
+def test_unreadable_unprotected_cache_is_ignored(tmp_path: Path):
+    path = tmp_path / "unprotected.json"
+    path.write_text("{not json")
+
+    cache = UnprotectedRepoCache(path)
+
+    assert "1:main" not in cache
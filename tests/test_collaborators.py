@@ -0,0 +1,81 @@
+import pytest
+
+from nodestream_github.client import GithubRestApiClient
+from nodestream_github.collaborators import OutsideCollaboratorIndex
+from nodestream_github.types.enums import CollaboratorAffiliation
+from tests.data.users import OCTOCAT_USER_SHORT, TURBO_USER_SHORT
+from tests.mocks.githubrest import DEFAULT_HOSTNAME, DEFAULT_PER_PAGE, GithubHttpxMock
+
+
+@pytest.fixture
+def index() -> OutsideCollaboratorIndex:
+    return OutsideCollaboratorIndex(
+        GithubRestApiClient(
+            auth_token="test-token",
+            github_hostname=DEFAULT_HOSTNAME,
+            max_retries=0,
+            per_page=DEFAULT_PER_PAGE,
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_one_direct_listing_is_classified_with_the_org_index(
+    index: OutsideCollaboratorIndex, gh_rest_mock: GithubHttpxMock
+):
+    gh_rest_mock.get_outside_collaborators_for_org(
+        org_login="github", json=[TURBO_USER_SHORT]
+    )
+    for repo_name in ("Hello-World", "Hello-Moon"):
+        gh_rest_mock.get_collaborators_for_repo(
+            owner_login="github",
+            repo_name=repo_name,
+            affiliation=CollaboratorAffiliation.DIRECT,
+            json=[OCTOCAT_USER_SHORT, TURBO_USER_SHORT],
+        )
+
+    for repo_name in ("Hello-World", "Hello-Moon"):
+        collaborators = [
+            (user["login"], affiliation)
+            async for user, affiliation in index.fetch_collaborators_for_repo(
+                owner_login="github", repo_name=repo_name
+            )
+        ]
+
+        assert collaborators == [
+            ("octocat", CollaboratorAffiliation.DIRECT),
+            ("turbo", CollaboratorAffiliation.DIRECT),
+            ("turbo", CollaboratorAffiliation.OUTSIDE),
+        ]
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_both_listings_without_an_index(
+    index: OutsideCollaboratorIndex, gh_rest_mock: GithubHttpxMock
+):
+    gh_rest_mock.get_outside_collaborators_for_org(org_login="octocat", status_code=404)
+    gh_rest_mock.get_collaborators_for_repo(
+        owner_login="octocat",
+        repo_name="Hello-World",
+        affiliation=CollaboratorAffiliation.DIRECT,
+        json=[OCTOCAT_USER_SHORT],
+    )
+    gh_rest_mock.get_collaborators_for_repo(
+        owner_login="octocat",
+        repo_name="Hello-World",
+        affiliation=CollaboratorAffiliation.OUTSIDE,
+        json=[TURBO_USER_SHORT],
+    )
+
+    collaborators = [
+        (user["login"], affiliation)
+        async for user, affiliation in index.fetch_collaborators_for_repo(
+            owner_login="octocat", repo_name="Hello-World"
+        )
+    ]
+
+    assert collaborators == [
+        ("octocat", CollaboratorAffiliation.DIRECT),
+        ("turbo", CollaboratorAffiliation.OUTSIDE),
+    ]
+    assert await index.outside_collaborators("octocat") is None
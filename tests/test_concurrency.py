@@ -0,0 +1,222 @@
+import asyncio
+from contextlib import aclosing
+
+import pytest
+
+from nodestream_github.concurrency import bounded_map, concurrency_limit, merge
+from nodestream_github.types.enums import ResultOrder
+
+
+async def async_items(items: list[int]):
+    for item in items:
+        yield item
+
+
+@pytest.mark.asyncio
+async def test_bounded_map_keeps_listing_order():
+    async def slow_for_small(item: int) -> int:
+        await asyncio.sleep(0.01 * (5 - item))
+        return item * 10
+
+    results = [
+        result async for result in bounded_map(slow_for_small, [1, 2, 3, 4], limit=3)
+    ]
+
+    assert results == [10, 20, 30, 40]
+
+
+@pytest.mark.asyncio
+async def test_bounded_map_completion_order():
+    async def slow_for_small(item: int) -> int:
+        await asyncio.sleep(0.01 * (5 - item))
+        return item
+
+    results = [
+        result
+        async for result in bounded_map(
+            slow_for_small,
+            async_items([1, 2, 3, 4]),
+            limit=4,
+            order=ResultOrder.COMPLETION,
+        )
+    ]
+
+    assert results == [4, 3, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_bounded_map_respects_limit():
+    running = 0
+    peak = 0
+
+    async def track(item: int) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return item
+
+    results = [result async for result in bounded_map(track, range(10), limit=3)]
+
+    assert results == list(range(10))
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_bounded_map_cancels_in_flight_on_error():
+    cancelled = []
+
+    async def fail_first(item: int) -> int:
+        if item == 0:
+            msg = "boom"
+            raise RuntimeError(msg)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+        return item
+
+    with pytest.raises(RuntimeError, match="boom"):
+        _ignored = [
+            result async for result in bounded_map(fail_first, range(3), limit=3)
+        ]
+
+    assert sorted(cancelled) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_bounded_map_cancels_in_flight_when_closed_early():
+    cancelled = []
+
+    async def work(item: int) -> int:
+        if item:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(item)
+                raise
+        return item
+
+    results = bounded_map(work, range(3), limit=3)
+    async with aclosing(results):
+        assert await anext(results) == 0
+
+    assert sorted(cancelled) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_bounded_map_invalid_limit():
+    with pytest.raises(ValueError, match="limit"):
+        await anext(bounded_map(asyncio.sleep, [1], limit=0))
+
+
+def test_concurrency_limit():
+    assert concurrency_limit(None, default=8, name="max_concurrent_repos") == 8
+    assert concurrency_limit(2, default=8, name="max_concurrent_repos") == 2
+    with pytest.raises(ValueError, match="max_concurrent_repos must be"):
+        concurrency_limit(0, default=8, name="max_concurrent_repos")
+
+
+async def delayed_items(items: list[int], delay: float):
+    for item in items:
+        await asyncio.sleep(delay)
+        yield item
+
+
+@pytest.mark.asyncio
+async def test_merge_interleaves_sources():
+    results = [
+        item
+        async for item in merge([
+            delayed_items([1, 2, 3], 0.01),
+            delayed_items([10, 20, 30], 0.015),
+        ])
+    ]
+
+    assert sorted(results) == [1, 2, 3, 10, 20, 30]
+    assert results[:2] == [1, 10]
+
+
+@pytest.mark.asyncio
+async def test_merge_starts_sources_in_order_within_limit():
+    started = []
+
+    async def source(name: int):
+        started.append(name)
+        await asyncio.sleep(0.001)
+        yield name
+
+    results = [item async for item in merge((source(i) for i in range(4)), limit=2)]
+
+    assert sorted(results) == [0, 1, 2, 3]
+    assert started == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_merge_respects_limit():
+    running = 0
+    peak = 0
+
+    async def source(name: int):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        yield name
+        running -= 1
+
+    results = [item async for item in merge((source(i) for i in range(6)), limit=2)]
+
+    assert sorted(results) == list(range(6))
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_merge_raises_source_error_and_cancels_others():
+    cancelled = asyncio.Event()
+
+    async def failing():
+        await asyncio.sleep(0.001)
+        msg = "boom"
+        raise ValueError(msg)
+        yield  # pragma: no cover
+
+    async def endless():
+        try:
+            while True:
+                await asyncio.sleep(0.001)
+                yield 1
+        finally:
+            cancelled.set()
+
+    with pytest.raises(ValueError, match="boom"):
+        _ignored = [item async for item in merge([endless(), failing()])]
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_merge_cancels_sources_when_closed_early():
+    cancelled = asyncio.Event()
+
+    async def endless():
+        try:
+            while True:
+                await asyncio.sleep(0)
+                yield 1
+        finally:
+            cancelled.set()
+
+    async with aclosing(merge([endless()])) as merged:
+        assert await anext(merged) == 1
+
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_merge_invalid_args():
+    with pytest.raises(ValueError, match="buffer"):
+        await anext(merge([], buffer=0))
+    with pytest.raises(ValueError, match="limit"):
+        await anext(merge([], limit=0))
@@ -0,0 +1,101 @@
+from datetime import date
+
+import pytest
+from pytest_mock import MockerFixture
+
+from nodestream_github.client import GithubRestApiClient
+from nodestream_github.filters import OrgScope, RepoFilter
+from tests.data.orgs import org_summary
+from tests.data.repos import HELLO_WORLD_REPO, repo
+from tests.mocks.githubrest import DEFAULT_HOSTNAME, DEFAULT_PER_PAGE, GithubHttpxMock
+
+
+@pytest.fixture
+def client() -> GithubRestApiClient:
+    return GithubRestApiClient(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+    )
+
+
+@pytest.mark.parametrize(
+    ("scope", "login", "expected"),
+    [
+        (OrgScope(), "github", True),
+        (OrgScope.of(["github"]), "GitHub", True),
+        (OrgScope.of(["team-*"]), "team-a", True),
+        (OrgScope.of(["team-*"]), "github", False),
+        (OrgScope.of(exclude_orgs="*-archive"), "team-archive", False),
+        (OrgScope.of(["team-*"], ["team-archive"]), "team-archive", False),
+    ],
+)
+def test_org_scope_includes(scope: OrgScope, login: str, *, expected: bool):
+    assert scope.includes(login) is expected
+
+
+@pytest.mark.asyncio
+async def test_literal_org_list_is_not_listed(
+    client: GithubRestApiClient, mocker: MockerFixture
+):
+    list_orgs = mocker.patch.object(client, "fetch_all_organizations")
+    scope = OrgScope.of(["github", "example", "github"], exclude_orgs=["example"])
+
+    orgs = [org async for org in scope.organizations(client)]
+
+    assert orgs == [{"login": "github"}]
+    list_orgs.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_org_patterns_filter_the_org_listing(
+    client: GithubRestApiClient, gh_rest_mock: GithubHttpxMock
+):
+    gh_rest_mock.all_orgs(
+        json=[
+            org_summary(org_login="team-a", org_id=1),
+            org_summary(org_login="github", org_id=2),
+            org_summary(org_login="team-b", org_id=3),
+        ]
+    )
+    scope = OrgScope.of(["team-*"], exclude_orgs=["team-b"])
+
+    orgs = [org["login"] async for org in scope.organizations(client)]
+
+    assert orgs == ["team-a"]
+
+
+@pytest.mark.parametrize(
+    ("repo_filter", "expected"),
+    [
+        ({}, True),
+        ({"archived": False}, True),
+        ({"archived": True}, False),
+        ({"fork": False, "disabled": False}, True),
+        ({"visibility": "private"}, False),
+        ({"visibility": ["public", "internal"]}, True),
+        ({"pushed_after": "2011-01-01"}, True),
+        ({"pushed_after": "2011-01-26T19:06:43Z"}, False),
+        ({"pushed_after": date(2011, 1, 26)}, True),
+        ({"pushed_after": date(2011, 1, 27)}, False),
+        ({"names": ["hello-*"]}, True),
+        ({"names": ["octocat/*"]}, True),
+        ({"names": ["spoon-*"]}, False),
+        ({"exclude_names": ["*/hello-world"]}, False),
+    ],
+)
+def test_repo_filter(repo_filter: dict, *, expected: bool):
+    assert RepoFilter.from_dict(repo_filter).keeps(HELLO_WORLD_REPO) is expected
+
+
+def test_repo_filter_visibility_without_visibility_field():
+    private = repo(private=True)
+    del private["visibility"]
+
+    assert RepoFilter.from_dict({"visibility": "private"}).keeps(private)
+
+
+def test_unknown_repo_filter():
+    with pytest.raises(ValueError, match="unknown repo filters: stars"):
+        RepoFilter.from_dict({"stars": 10})
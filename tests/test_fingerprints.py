@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+
+from nodestream_github.fingerprints import EnrichmentStore, fingerprint
+from tests.data.repos import HELLO_WORLD_REPO
+
+ENRICHMENTS = {"languages": [{"name": "Java"}], "webhooks": []}
+
+
+def test_fingerprint_changes_with_listing_fields_and_enrichments():
+    base = fingerprint(HELLO_WORLD_REPO, ["languages", "webhooks"])
+
+    assert fingerprint(HELLO_WORLD_REPO, ["webhooks", "languages"]) == base
+    assert (
+        fingerprint(HELLO_WORLD_REPO | {"size": 1}, ["languages", "webhooks"]) == base
+    )
+    assert fingerprint(HELLO_WORLD_REPO, ["languages"]) != base
+    assert (
+        fingerprint(
+            HELLO_WORLD_REPO | {"pushed_at": "2024-01-01T00:00:00Z"},
+            ["languages", "webhooks"],
+        )
+        != base
+    )
+
+
+def test_stored_enrichments_are_reused_while_fingerprint_matches(tmp_path: Path):
+    store = EnrichmentStore(tmp_path / "enrichments.db")
+    store.put("node", "print", ENRICHMENTS)
+    store.close()
+
+    store = EnrichmentStore(tmp_path / "enrichments.db")
+
+    assert store.get("node", "print") == ENRICHMENTS
+    assert store.get("node", "other print") is None
+    assert store.get("other node", "print") is None
+
+
+def test_stored_enrichments_expire(tmp_path: Path):
+    now = 1000.0
+    store = EnrichmentStore(
+        tmp_path / "enrichments.db", max_age_seconds=60, clock=lambda: now
+    )
+    store.put("node", "print", ENRICHMENTS)
+
+    now += 61
+
+    assert store.get("node", "print") is None
+
+
+def test_invalid_max_age(tmp_path: Path):
+    with pytest.raises(ValueError, match="enrichment_max_age_seconds"):
+        EnrichmentStore(tmp_path / "enrichments.db", max_age_seconds=-1)
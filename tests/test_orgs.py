@@ -1,8 +1,10 @@
 import httpx
 import pytest
+from pytest_mock import MockerFixture
 
 from nodestream_github import GithubOrganizationsExtractor
-from nodestream_github.types.enums import OrgMemberRole
+from nodestream_github.concurrency import bounded_map
+from nodestream_github.types.enums import OrgMemberRole, ResultOrder
 from tests.data.orgs import (
     EXAMPLE_ORG,
     EXAMPLE_ORG_SUMMARY,
@@ -104,6 +106,10 @@ async def test_orgs_continue_through_org_detail_status_fail(
 ):
     gh_rest_mock.all_orgs(json=[GITHUB_ORG_SUMMARY, EXAMPLE_ORG_SUMMARY])
     gh_rest_mock.get_org(org_name="github", status_code=httpx.codes.NOT_FOUND)
+    # the listings of an org are requested along with its details
+    for role in (OrgMemberRole.ADMIN, OrgMemberRole.MEMBER):
+        gh_rest_mock.get_members_for_org(org_name="github", json=[], role=role)
+    gh_rest_mock.get_repos_for_org(org_name="github", json=[])
     gh_rest_mock.get_org(org_name="example", json=EXAMPLE_ORG)
 
     gh_rest_mock.get_members_for_org(
@@ -241,6 +247,10 @@ async def test_orgs_continue_through_org_detail_connection_fail(
         url=f"{DEFAULT_BASE_URL}/orgs/github",
         is_reusable=True,
     )
+    # the listings of an org are requested along with its details
+    for role in (OrgMemberRole.ADMIN, OrgMemberRole.MEMBER):
+        gh_rest_mock.get_members_for_org(org_name="github", json=[], role=role)
+    gh_rest_mock.get_repos_for_org(org_name="github", json=[])
     gh_rest_mock.get_org(org_name="example", json=EXAMPLE_ORG)
     gh_rest_mock.get_members_for_org(
         org_name="example",
@@ -384,3 +394,47 @@ async def test_skip_repositories(gh_rest_mock: GithubHttpxMock):
             "repositories": [],
         }
     ]
+
+
+@pytest.mark.asyncio
+async def test_extract_only_orgs_in_scope(gh_rest_mock: GithubHttpxMock):
+    org_extractor = GithubOrganizationsExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        include_members=False,
+        include_repositories=False,
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+        orgs=["*"],
+        exclude_orgs=["github"],
+    )
+    gh_rest_mock.all_orgs(json=[GITHUB_ORG_SUMMARY, EXAMPLE_ORG_SUMMARY])
+    gh_rest_mock.get_org(org_name="example", json=EXAMPLE_ORG)
+
+    all_records = [record async for record in org_extractor.extract_records()]
+
+    assert [record["login"] for record in all_records] == ["example"]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_options_are_passed_through(
+    gh_rest_mock: GithubHttpxMock, mocker: MockerFixture
+):
+    org_extractor = GithubOrganizationsExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        include_members=False,
+        include_repositories=False,
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+        max_concurrent_orgs=2,
+        org_order="completion",
+    )
+    spy = mocker.patch("nodestream_github.orgs.bounded_map", wraps=bounded_map)
+    gh_rest_mock.all_orgs(json=[GITHUB_ORG_SUMMARY])
+    gh_rest_mock.get_org(org_name="github", json=GITHUB_ORG)
+
+    records = [record async for record in org_extractor.extract_records()]
+
+    assert [record["login"] for record in records] == ["github"]
+    assert spy.call_args.kwargs == {"limit": 2, "order": ResultOrder.COMPLETION}
@@ -1,12 +1,21 @@
+import asyncio
+import json
+import time
+from collections.abc import AsyncGenerator, Callable
+from pathlib import Path
+
 import pytest
+from pytest_mock import MockerFixture
 
 from nodestream_github import GithubReposExtractor
 from nodestream_github.types.enums import (
     CollaboratorAffiliation,
     OrgRepoType,
+    RepoSort,
+    SortDirection,
     UserRepoType,
 )
-from tests.data.orgs import GITHUB_ORG_SUMMARY
+from tests.data.orgs import GITHUB_ORG, GITHUB_ORG_SUMMARY, org, org_summary
 from tests.data.repos import HELLO_WORLD_REPO, repo
 from tests.data.users import OCTOCAT_USER_SHORT, TURBO_USER_SHORT, user_short
 from tests.data.webhooks import HELLO_WORLD_WEBHOOK
@@ -39,15 +48,11 @@ async def test_pull_org_repos(gh_rest_mock: GithubHttpxMock):
     )
 
     gh_rest_mock.all_orgs(json=[GITHUB_ORG_SUMMARY])
+    gh_rest_mock.get_org(org_name="github", json=GITHUB_ORG)
     gh_rest_mock.get_repos_for_org(
         org_name="github",
-        repo_type=OrgRepoType.PUBLIC,
-        json=[HELLO_WORLD_REPO],
-    )
-    gh_rest_mock.get_repos_for_org(
-        org_name="github",
-        repo_type=OrgRepoType.PRIVATE,
-        json=[HELLO_WORLD_REPO],
+        repo_type=OrgRepoType.ALL,
+        json=[HELLO_WORLD_REPO, HELLO_WORLD_REPO | {"id": 2, "private": True}],
     )
     gh_rest_mock.get_languages_for_repo(
         owner_login="octocat",
@@ -79,6 +84,45 @@ async def test_pull_org_repos(gh_rest_mock: GithubHttpxMock):
     assert len([record async for record in extractor.extract_records()]) == 2
 
 
+@pytest.mark.parametrize(
+    ("collecting", "repo_type", "expected"),
+    [
+        ({"org_all": True}, OrgRepoType.ALL, ["Public", "Private", "Internal"]),
+        ({"org_private": True}, OrgRepoType.ALL, ["Private", "Internal"]),
+        ({"org_public": True}, OrgRepoType.PUBLIC, ["Public"]),
+    ],
+)
+@pytest.mark.asyncio
+async def test_org_repos_are_listed_once_and_split_on_visibility(
+    gh_rest_mock: GithubHttpxMock,
+    collecting: dict,
+    repo_type: OrgRepoType,
+    expected: list[str],
+):
+    extractor = GithubReposExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+        collecting=collecting,
+    )
+    gh_rest_mock.all_orgs(json=[GITHUB_ORG_SUMMARY])
+    gh_rest_mock.get_org(org_name="github", json=GITHUB_ORG)
+    gh_rest_mock.get_repos_for_org(
+        org_name="github",
+        repo_type=repo_type,
+        json=[
+            repo(repo_name="Public", visibility="public"),
+            repo(repo_name="Private", repo_id=2, private=True, visibility="private"),
+            repo(repo_name="Internal", repo_id=3, private=True, visibility="internal"),
+        ],
+    )
+
+    repos = [repo async for repo in extractor._list_repos()]
+
+    assert [repo["name"] for repo in repos] == expected
+
+
 @pytest.mark.asyncio
 async def test_pull_user_repos(gh_rest_mock: GithubHttpxMock):
     extractor = GithubReposExtractor(
@@ -126,12 +170,47 @@ async def test_pull_user_repos(gh_rest_mock: GithubHttpxMock):
     assert len([record async for record in extractor.extract_records()]) == 1
 
 
+@pytest.mark.asyncio
+async def test_user_repo_listing_skipped_for_users_owning_no_repos(
+    gh_rest_mock: GithubHttpxMock, tmp_path: Path
+):
+    counts_path = tmp_path / "repo_counts.json"
+    counts_path.write_text(
+        json.dumps({
+            "octocat": {"count": 0, "recorded_at": time.time()},
+            "turbo": {"count": 1, "recorded_at": time.time()},
+        })
+    )
+    extractor = GithubReposExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        user_agent="test-agent",
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+        collecting={"user_all": True},
+        user_repo_counts_path=str(counts_path),
+    )
+
+    gh_rest_mock.all_users(json=[OCTOCAT_USER_SHORT, TURBO_USER_SHORT])
+    gh_rest_mock.get_repos_for_user(
+        user_login="turbo",
+        type_param=UserRepoType.OWNER,
+        json=[],
+    )
+
+    assert [repo async for repo in extractor._list_repos()] == []
+    assert extractor.user_listings_skipped == 1
+
+
 @pytest.mark.asyncio
 async def test_extract_records(
     repo_extractor: GithubReposExtractor, gh_rest_mock: GithubHttpxMock
 ):
     gh_rest_mock.all_repos(
-        json=[HELLO_WORLD_REPO, repo(owner=GITHUB_ORG_SUMMARY, repo_name="Hello-Moon")],
+        json=[
+            HELLO_WORLD_REPO,
+            repo(owner=GITHUB_ORG_SUMMARY, repo_name="Hello-Moon", repo_id=1296270),
+        ],
     )
     gh_rest_mock.get_languages_for_repo(
         owner_login="octocat",
@@ -414,7 +493,7 @@ async def test_extract_records(
             "homepage": "https://github.com",
             "hooks_url": "https://HOSTNAME/repos/github/Hello-Moon/hooks",
             "html_url": "https://github.com/github/Hello-Moon",
-            "id": 1296269,
+            "id": 1296270,
             "is_template": False,
             "issue_comment_url": (
                 "https://HOSTNAME/repos/github/Hello-Moon/issues/comments{/number}"
@@ -434,7 +513,7 @@ async def test_extract_records(
             ),
             "mirror_url": "git:git.example.com/github/Hello-Moon",
             "name": "Hello-Moon",
-            "node_id": "MDEwOlJlcG9zaXRvcnkxMjk2MjY5",
+            "node_id": "MDEwOlJlcG9zaXRvcnkxMjk2Mjcw",
             "notifications_url": (
                 "https://HOSTNAME/repos/github/Hello-Moon/notifications{?since,all,participating}"
             ),
@@ -517,7 +596,10 @@ async def test_extract_records_no_additional_data(
     repo_extractor.include_webhooks = False
     repo_extractor.include_languages = False
     gh_rest_mock.all_repos(
-        json=[HELLO_WORLD_REPO, repo(owner=GITHUB_ORG_SUMMARY, repo_name="Hello-Moon")],
+        json=[
+            HELLO_WORLD_REPO,
+            repo(owner=GITHUB_ORG_SUMMARY, repo_name="Hello-Moon", repo_id=1296270),
+        ],
     )
     assert [record async for record in repo_extractor.extract_records()] == [
         {
@@ -700,7 +782,7 @@ async def test_extract_records_no_additional_data(
             "homepage": "https://github.com",
             "hooks_url": "https://HOSTNAME/repos/github/Hello-Moon/hooks",
             "html_url": "https://github.com/github/Hello-Moon",
-            "id": 1296269,
+            "id": 1296270,
             "is_template": False,
             "issue_comment_url": (
                 "https://HOSTNAME/repos/github/Hello-Moon/issues/comments{/number}"
@@ -719,7 +801,7 @@ async def test_extract_records_no_additional_data(
             ),
             "mirror_url": "git:git.example.com/github/Hello-Moon",
             "name": "Hello-Moon",
-            "node_id": "MDEwOlJlcG9zaXRvcnkxMjk2MjY5",
+            "node_id": "MDEwOlJlcG9zaXRvcnkxMjk2Mjcw",
             "notifications_url": (
                 "https://HOSTNAME/repos/github/Hello-Moon/notifications{?since,all,participating}"
             ),
@@ -767,3 +849,523 @@ async def test_extract_records_no_additional_data(
             "watchers_count": 80,
         },
     ]
+
+
+@pytest.mark.asyncio
+async def test_failing_repo_does_not_stop_extraction(
+    repo_extractor: GithubReposExtractor, gh_rest_mock: GithubHttpxMock
+):
+    repo_extractor.include_collaborators = False
+    repo_extractor.include_webhooks = False
+    broken = repo(owner=OCTOCAT_USER_SHORT, repo_name="Broken", repo_id=2)
+    del broken["owner"]
+    gh_rest_mock.all_repos(json=[broken, HELLO_WORLD_REPO])
+    gh_rest_mock.get_languages_for_repo(
+        owner_login="octocat",
+        repo_name="Hello-World",
+        json=["Java"],
+    )
+
+    records = [record async for record in repo_extractor.extract_records()]
+
+    assert [record["name"] for record in records] == ["Hello-World"]
+    assert records[0]["languages"] == [{"name": "Java"}]
+
+
+@pytest.mark.parametrize(
+    ("repo_order", "expected"),
+    [("listing", ["Slow", "Fast"]), ("completion", ["Fast", "Slow"])],
+)
+@pytest.mark.asyncio
+async def test_repos_are_enriched_concurrently(
+    gh_rest_mock: GithubHttpxMock,
+    mocker: MockerFixture,
+    repo_order: str,
+    expected: list[str],
+):
+    extractor = GithubReposExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        collecting={"all_public": True},
+        include_webhooks=False,
+        include_collaborators=False,
+        max_concurrent_repos=2,
+        repo_order=repo_order,
+    )
+    started = []
+
+    async def languages(_owner: dict, repo: dict) -> list:
+        started.append(repo["name"])
+        if repo["name"] == "Slow":
+            await asyncio.sleep(0.05)
+        return []
+
+    mocker.patch.object(extractor, "_add_languages", side_effect=languages)
+    gh_rest_mock.all_repos(
+        json=[
+            repo(owner=OCTOCAT_USER_SHORT, repo_name="Slow", repo_id=2),
+            repo(owner=OCTOCAT_USER_SHORT, repo_name="Fast", repo_id=3),
+        ],
+    )
+
+    records = [record async for record in extractor.extract_records()]
+
+    assert [record["name"] for record in records] == expected
+    assert started == ["Slow", "Fast"]
+
+
+@pytest.mark.asyncio
+async def test_largest_orgs_are_listed_first(gh_rest_mock: GithubHttpxMock):
+    extractor = GithubReposExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+        collecting={"org_public": True},
+        max_concurrent_orgs=1,
+    )
+    sizes = {"small": 1, "unknown": None, "large": 50}
+    gh_rest_mock.all_orgs(
+        json=[org_summary(org_login=login, org_id=i) for i, login in enumerate(sizes)]
+    )
+    for login, size in sizes.items():
+        if size is None:
+            gh_rest_mock.get_org(org_name=login, status_code=404)
+        else:
+            gh_rest_mock.get_org(
+                org_name=login,
+                json=org(org_login=login, public_repos=size, total_private_repos=0),
+            )
+        gh_rest_mock.get_repos_for_org(
+            org_name=login, repo_type=OrgRepoType.PUBLIC, json=[]
+        )
+
+    _ignored = [repo async for repo in extractor._list_repos()]
+
+    listed = [
+        request.url.path.split("/")[-2]
+        for request in gh_rest_mock.httpx_mock.get_requests()
+        if request.url.path.endswith("/repos")
+    ]
+    assert listed == ["large", "small", "unknown"]
+
+
+@pytest.mark.asyncio
+async def test_collection_modes_run_concurrently(
+    repo_extractor: GithubReposExtractor, mocker: MockerFixture
+):
+    repo_extractor.collecting.user_public = True
+    both_running = asyncio.Event()
+    running = set()
+
+    def mode(name: str) -> Callable[[], AsyncGenerator[dict]]:
+        async def listing():
+            running.add(name)
+            if len(running) == 2:
+                both_running.set()
+            await asyncio.wait_for(both_running.wait(), timeout=1)
+            yield {"name": name}
+
+        return listing
+
+    mocker.patch.object(
+        repo_extractor.client, "fetch_all_public_repos", side_effect=mode("public")
+    )
+    mocker.patch.object(
+        repo_extractor, "_fetch_repos_by_user", side_effect=mode("user")
+    )
+
+    names = [repo["name"] async for repo in repo_extractor._list_repos()]
+
+    assert sorted(names) == ["public", "user"]
+
+
+@pytest.mark.asyncio
+async def test_repos_listed_by_several_modes_are_extracted_once(
+    repo_extractor: GithubReposExtractor, mocker: MockerFixture
+):
+    repo_extractor.collecting.user_public = True
+    hello_world = repo(owner=OCTOCAT_USER_SHORT)
+    other = repo(owner=TURBO_USER_SHORT, repo_name="Other", repo_id=2)
+
+    async def listing(repos: list[dict]) -> AsyncGenerator[dict]:
+        for item in repos:
+            yield dict(item)
+
+    mocker.patch.object(
+        repo_extractor.client,
+        "fetch_all_public_repos",
+        return_value=listing([hello_world, other]),
+    )
+    mocker.patch.object(
+        repo_extractor, "_fetch_repos_by_user", return_value=listing([hello_world])
+    )
+
+    repos = [repo async for repo in repo_extractor._list_repos()]
+
+    assert sorted(repo["name"] for repo in repos) == ["Hello-World", "Other"]
+    assert repo_extractor.duplicates_skipped == 1
+
+
+@pytest.mark.asyncio
+async def test_collaborators_with_outside_collaborator_index(
+    gh_rest_mock: GithubHttpxMock,
+):
+    extractor = GithubReposExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+        index_outside_collaborators=True,
+    )
+    gh_rest_mock.get_outside_collaborators_for_org(
+        org_login="github", json=[TURBO_USER_SHORT]
+    )
+    for repo_name in ("Hello-World", "Hello-Moon"):
+        gh_rest_mock.get_collaborators_for_repo(
+            owner_login="github",
+            repo_name=repo_name,
+            affiliation=CollaboratorAffiliation.DIRECT,
+            json=[TURBO_USER_SHORT],
+        )
+
+    collaborators = [
+        await extractor._add_collaborators(
+            GITHUB_ORG_SUMMARY, repo(owner=GITHUB_ORG_SUMMARY, repo_name=repo_name)
+        )
+        for repo_name in ("Hello-World", "Hello-Moon")
+    ]
+
+    assert [[user["affiliation"] for user in users] for users in collaborators] == [
+        ["direct", "outside"],
+        ["direct", "outside"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_default_branch_protection(
+    gh_rest_mock: GithubHttpxMock, mocker: MockerFixture, tmp_path: Path
+):
+    cache_path = tmp_path / "unprotected.json"
+    extractor = GithubReposExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+        collecting={"all_public": True},
+        include_languages=False,
+        include_webhooks=False,
+        include_collaborators=False,
+        include_branch_protection=True,
+        branch_protection_cache_path=str(cache_path),
+    )
+    gh_rest_mock.all_repos(
+        json=[HELLO_WORLD_REPO, repo(repo_name="Unprotected", repo_id=2)]
+    )
+    gh_rest_mock.get_protected_branches_for_repo(
+        owner_login="octocat", repo_name="Hello-World", json=[{"name": "master"}]
+    )
+    gh_rest_mock.get_branch_protection(
+        owner_login="octocat",
+        repo_name="Hello-World",
+        branch="master",
+        json={"enabled": True},
+    )
+    gh_rest_mock.get_protected_branches_for_repo(
+        owner_login="octocat", repo_name="Unprotected", json=[]
+    )
+
+    records = [record async for record in extractor.extract_records()]
+    await extractor.finish(mocker.Mock())
+
+    assert [record["default_branch_protection"] for record in records] == [
+        {"enabled": True},
+        None,
+    ]
+    assert list(json.loads(cache_path.read_text())) == ["2:master"]
+
+
+@pytest.mark.asyncio
+async def test_skip_rules(gh_rest_mock: GithubHttpxMock):
+    extractor = GithubReposExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+        collecting={"all_public": True},
+        include_collaborators=False,
+        skip_rules=[
+            {"when": {"size": 0}, "skip": "languages"},
+            {
+                "name": "inactive",
+                "when": {"archived": True, "disabled": [True, False]},
+                "skip": ["languages", "webhooks", "collaborators"],
+            },
+        ],
+    )
+    gh_rest_mock.all_repos(
+        json=[
+            repo(repo_name="Empty", repo_id=2, size=0),
+            repo(repo_name="Archived", repo_id=3, archived=True),
+            HELLO_WORLD_REPO,
+        ]
+    )
+    for repo_name in ("Empty", "Hello-World"):
+        gh_rest_mock.get_webhooks_for_repo(
+            owner_login="octocat", repo_name=repo_name, json=[]
+        )
+    gh_rest_mock.get_languages_for_repo(
+        owner_login="octocat", repo_name="Hello-World", json=["Java"]
+    )
+
+    records = {record["name"]: record async for record in extractor.extract_records()}
+
+    assert "languages" not in records["Empty"]
+    assert records["Empty"]["webhooks"] == []
+    assert "languages" not in records["Archived"]
+    assert "webhooks" not in records["Archived"]
+    assert records["Hello-World"]["languages"] == [{"name": "Java"}]
+    assert extractor.skipped_by_rule == {"size=0": 1, "inactive": 2}
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        {"when": {"fork": True}},
+        {"skip": ["webhooks"]},
+        {"when": {"fork": True}, "skip": ["readme"]},
+    ],
+)
+def test_invalid_skip_rules(rule: dict):
+    with pytest.raises(ValueError, match=r"skip rules|RepoEnrichment"):
+        GithubReposExtractor(auth_token="test-token", skip_rules=[rule])
+
+
+@pytest.mark.asyncio
+async def test_repos_are_filtered_before_enrichment(gh_rest_mock: GithubHttpxMock):
+    extractor = GithubReposExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+        collecting={"org_public": True, "orgs": ["github"]},
+        include_webhooks=False,
+        include_collaborators=False,
+        repo_filter={"archived": False},
+    )
+    gh_rest_mock.get_org(org_name="github", json=GITHUB_ORG)
+    gh_rest_mock.get_repos_for_org(
+        org_name="github",
+        repo_type=OrgRepoType.PUBLIC,
+        json=[
+            repo(owner=GITHUB_ORG_SUMMARY, repo_name="Archived", archived=True),
+            repo(owner=GITHUB_ORG_SUMMARY, repo_name="Active", repo_id=2),
+        ],
+    )
+    gh_rest_mock.get_languages_for_repo(
+        owner_login="github", repo_name="Active", json=[]
+    )
+
+    records = [record async for record in extractor.extract_records()]
+
+    assert [record["name"] for record in records] == ["Active"]
+    assert extractor.filtered_out == 1
+
+
+@pytest.mark.asyncio
+async def test_org_listing_stops_at_watermark(
+    gh_rest_mock: GithubHttpxMock, tmp_path: Path
+):
+    watermark_path = tmp_path / "watermarks.json"
+    watermark_path.write_text(json.dumps({"github": "2011-01-26T00:00:00+00:00"}))
+    extractor = GithubReposExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+        collecting={"org_public": True, "orgs": ["github"]},
+        include_languages=False,
+        include_webhooks=False,
+        include_collaborators=False,
+        watermark_path=str(watermark_path),
+    )
+    next_page = (
+        f"<{gh_rest_mock.base_url}/orgs/github/repos?page=2>; "  # never requested
+        'rel="next"'
+    )
+    gh_rest_mock.get_org(org_name="github", json=GITHUB_ORG)
+    gh_rest_mock.get_repos_for_org(
+        org_name="github",
+        repo_type=OrgRepoType.PUBLIC,
+        sort=RepoSort.PUSHED,
+        direction=SortDirection.DESC,
+        json=[
+            repo(repo_name="New", repo_id=2, pushed_at="2011-02-01T00:00:00Z"),
+            repo(repo_name="Old", repo_id=3, pushed_at="2011-01-01T00:00:00Z"),
+        ],
+        headers={"link": next_page},
+    )
+
+    records = [record async for record in extractor.extract_records()]
+
+    assert [record["name"] for record in records] == ["New"]
+    assert json.loads(watermark_path.read_text()) == {
+        "github": "2011-02-01T00:00:00+00:00"
+    }
+
+
+@pytest.mark.asyncio
+async def test_watermark_kept_when_org_listing_fails_partway(
+    gh_rest_mock: GithubHttpxMock, tmp_path: Path
+):
+    watermark_path = tmp_path / "watermarks.json"
+    watermark_path.write_text(json.dumps({"github": "2011-01-26T00:00:00+00:00"}))
+    extractor = GithubReposExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+        collecting={"org_public": True, "orgs": ["github"]},
+        include_languages=False,
+        include_webhooks=False,
+        include_collaborators=False,
+        watermark_path=str(watermark_path),
+    )
+    next_page = (
+        f"{gh_rest_mock.base_url}/orgs/github/repos?per_page={DEFAULT_PER_PAGE}"
+        "&type=public&sort=pushed&direction=desc&page=2"
+    )
+    gh_rest_mock.get_org(org_name="github", json=GITHUB_ORG)
+    gh_rest_mock.get_repos_for_org(
+        org_name="github",
+        repo_type=OrgRepoType.PUBLIC,
+        sort=RepoSort.PUSHED,
+        direction=SortDirection.DESC,
+        json=[repo(repo_name="New", repo_id=2, pushed_at="2011-02-01T00:00:00Z")],
+        headers={"link": f'<{next_page}>; rel="next"'},
+    )
+    gh_rest_mock.add_response(url=next_page, status_code=500)
+
+    records = [record async for record in extractor.extract_records()]
+
+    assert [record["name"] for record in records] == ["New"]
+    assert json.loads(watermark_path.read_text()) == {
+        "github": "2011-01-26T00:00:00+00:00"
+    }
+
+
+@pytest.mark.asyncio
+async def test_watermark_kept_when_a_repo_fails_to_extract(
+    gh_rest_mock: GithubHttpxMock, mocker: MockerFixture, tmp_path: Path
+):
+    watermark_path = tmp_path / "watermarks.json"
+    extractor = GithubReposExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+        collecting={"org_public": True, "orgs": ["github"]},
+        include_languages=False,
+        include_webhooks=False,
+        include_collaborators=False,
+        watermark_path=str(watermark_path),
+    )
+    mocker.patch.object(extractor, "_extract_repo", side_effect=RuntimeError)
+    gh_rest_mock.get_org(org_name="github", json=GITHUB_ORG)
+    gh_rest_mock.get_repos_for_org(
+        org_name="github",
+        repo_type=OrgRepoType.PUBLIC,
+        sort=RepoSort.PUSHED,
+        direction=SortDirection.DESC,
+        json=[
+            repo(
+                owner=GITHUB_ORG_SUMMARY,
+                repo_name="New",
+                pushed_at="2011-02-01T00:00:00Z",
+            )
+        ],
+    )
+
+    assert [record async for record in extractor.extract_records()] == []
+    assert json.loads(watermark_path.read_text()) == {}
+
+
+def test_invalid_watermark_sort():
+    with pytest.raises(ValueError, match="watermark_sort"):
+        GithubReposExtractor(
+            auth_token="test-token",
+            watermark_path="state.json",
+            watermark_sort="created",
+        )
+
+
+@pytest.mark.asyncio
+async def test_unchanged_repos_reuse_stored_enrichments(
+    gh_rest_mock: GithubHttpxMock, mocker: MockerFixture, tmp_path: Path
+):
+    def extractor() -> GithubReposExtractor:
+        return GithubReposExtractor(
+            auth_token="test-token",
+            github_hostname=DEFAULT_HOSTNAME,
+            max_retries=0,
+            per_page=DEFAULT_PER_PAGE,
+            collecting={"all_public": True},
+            include_webhooks=False,
+            include_collaborators=False,
+            enrichment_store_path=str(tmp_path / "enrichments.db"),
+        )
+
+    gh_rest_mock.all_repos(json=[HELLO_WORLD_REPO], is_reusable=True)
+    gh_rest_mock.get_languages_for_repo(
+        owner_login="octocat", repo_name="Hello-World", json=["Java"]
+    )
+
+    first_run = extractor()
+    first = [record async for record in first_run.extract_records()]
+    await first_run.finish(mocker.Mock())
+    second_run = extractor()
+    second = [record async for record in second_run.extract_records()]
+    await second_run.finish(mocker.Mock())
+
+    assert first == second
+    assert second[0]["languages"] == [{"name": "Java"}]
+    assert (first_run.enrichments_reused, second_run.enrichments_reused) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_failed_enrichments_are_not_stored(
+    gh_rest_mock: GithubHttpxMock, mocker: MockerFixture, tmp_path: Path
+):
+    def extractor() -> GithubReposExtractor:
+        return GithubReposExtractor(
+            auth_token="test-token",
+            github_hostname=DEFAULT_HOSTNAME,
+            max_retries=0,
+            per_page=DEFAULT_PER_PAGE,
+            collecting={"all_public": True},
+            include_collaborators=False,
+            enrichment_store_path=str(tmp_path / "enrichments.db"),
+        )
+
+    gh_rest_mock.all_repos(json=[HELLO_WORLD_REPO], is_reusable=True)
+    gh_rest_mock.get_languages_for_repo(
+        owner_login="octocat", repo_name="Hello-World", status_code=500
+    )
+    gh_rest_mock.get_languages_for_repo(
+        owner_login="octocat", repo_name="Hello-World", json=["Java"]
+    )
+    gh_rest_mock.get_webhooks_for_repo(
+        owner_login="octocat", repo_name="Hello-World", json=[], is_reusable=True
+    )
+
+    first_run = extractor()
+    first = [record async for record in first_run.extract_records()]
+    await first_run.finish(mocker.Mock())
+    second_run = extractor()
+    second = [record async for record in second_run.extract_records()]
+    await second_run.finish(mocker.Mock())
+
+    assert first[0]["languages"] == []
+    assert second[0]["languages"] == [{"name": "Java"}]
+    assert second_run.enrichments_reused == 0
@@ -1,12 +1,21 @@
 import pytest
+from pytest_mock import MockerFixture
 
 from nodestream_github import GithubTeamsExtractor
-from nodestream_github.types.enums import TeamMemberRole
-from tests.data.orgs import GITHUB_ORG_SUMMARY
+from nodestream_github.concurrency import bounded_map
+from nodestream_github.types.enums import ResultOrder, TeamMemberRole
+from tests.data.orgs import GITHUB_ORG, GITHUB_ORG_SUMMARY
 from tests.data.repos import HELLO_WORLD_REPO
-from tests.data.teams import JUSTICE_LEAGUE_TEAM, JUSTICE_LEAGUE_TEAM_SUMMARY
+from tests.data.teams import (
+    JUSTICE_LEAGUE_TEAM,
+    JUSTICE_LEAGUE_TEAM_SUMMARY,
+)
 from tests.data.users import OCTOCAT_USER_SHORT, TURBO_USER_SHORT
-from tests.mocks.githubrest import DEFAULT_HOSTNAME, DEFAULT_PER_PAGE, GithubHttpxMock
+from tests.mocks.githubrest import (
+    DEFAULT_HOSTNAME,
+    DEFAULT_PER_PAGE,
+    GithubHttpxMock,
+)
 
 
 @pytest.fixture
@@ -35,12 +44,14 @@ async def test_extract_records(
         json=JUSTICE_LEAGUE_TEAM,
     )
     gh_rest_mock.get_members_for_team(
-        team_id=1,
+        org_login="github",
+        slug="justice-league",
         role=TeamMemberRole.MEMBER,
         json=[OCTOCAT_USER_SHORT],
     )
     gh_rest_mock.get_members_for_team(
-        team_id=1,
+        org_login="github",
+        slug="justice-league",
         role=TeamMemberRole.MAINTAINER,
         json=[TURBO_USER_SHORT],
     )
@@ -168,3 +179,99 @@ async def test_extract_records(
         "updated_at": "2017-08-17T12:37:15Z",
         "url": "https://HOSTNAME/teams/1",
     }]
+
+
+@pytest.mark.asyncio
+async def test_extract_records_skips_listings_of_empty_teams(
+    teams_extractor: GithubTeamsExtractor, gh_rest_mock: GithubHttpxMock
+):
+    gh_rest_mock.all_orgs(json=[GITHUB_ORG_SUMMARY])
+    gh_rest_mock.list_teams_for_org(
+        org_login="github",
+        json=[JUSTICE_LEAGUE_TEAM_SUMMARY],
+    )
+    gh_rest_mock.get_team(
+        org_login="github",
+        team_slug="justice-league",
+        json=JUSTICE_LEAGUE_TEAM | {"members_count": 0, "repos_count": 0},
+    )
+
+    records = [record async for record in teams_extractor.extract_records()]
+
+    assert len(records) == 1
+    assert records[0]["members"] == []
+    assert records[0]["repos"] == []
+
+
+@pytest.mark.asyncio
+async def test_extract_records_without_hydration(gh_rest_mock: GithubHttpxMock):
+    extractor = GithubTeamsExtractor(
+        orgs=["github"],
+        hydrate_teams=False,
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        user_agent="test-agent",
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+    )
+    gh_rest_mock.get_org(org_name="github", json=GITHUB_ORG)
+    gh_rest_mock.list_teams_for_org(
+        org_login="github",
+        json=[JUSTICE_LEAGUE_TEAM_SUMMARY],
+    )
+    gh_rest_mock.get_members_for_team(
+        org_login="github",
+        slug="justice-league",
+        role=TeamMemberRole.MEMBER,
+        json=[OCTOCAT_USER_SHORT],
+    )
+    gh_rest_mock.get_members_for_team(
+        org_login="github",
+        slug="justice-league",
+        role=TeamMemberRole.MAINTAINER,
+        json=[TURBO_USER_SHORT],
+    )
+    gh_rest_mock.get_repos_for_team(
+        org_login="github",
+        slug="justice-league",
+        json=[HELLO_WORLD_REPO],
+    )
+
+    records = [record async for record in extractor.extract_records()]
+
+    assert len(records) == 1
+    record = records[0]
+    assert record["slug"] == "justice-league"
+    assert record["organization"]["node_id"] == GITHUB_ORG["node_id"]
+    assert record["members_count"] == 2
+    assert record["repos_count"] == 1
+    assert [member["login"] for member in record["members"]] == ["octocat", "turbo"]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_options_are_passed_through(
+    gh_rest_mock: GithubHttpxMock, mocker: MockerFixture
+):
+    extractor = GithubTeamsExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+        max_concurrent_teams=2,
+        team_order="completion",
+    )
+    spy = mocker.patch("nodestream_github.teams.bounded_map", wraps=bounded_map)
+    gh_rest_mock.all_orgs(json=[GITHUB_ORG_SUMMARY])
+    gh_rest_mock.list_teams_for_org(
+        org_login="github", json=[JUSTICE_LEAGUE_TEAM_SUMMARY]
+    )
+    gh_rest_mock.get_team(
+        org_login="github",
+        team_slug="justice-league",
+        json=JUSTICE_LEAGUE_TEAM | {"members_count": 0, "repos_count": 0},
+    )
+
+    records = [record async for record in extractor.extract_records()]
+
+    assert [record["slug"] for record in records] == ["justice-league"]
+    assert spy.call_args.kwargs == {"limit": 2, "order": ResultOrder.COMPLETION}
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+
+from nodestream_github.usercounts import UserRepoCounts, repo_count
+from tests.data.users import user, user_short
+
+
+def test_repo_count_adds_public_and_owned_private_repos():
+    assert repo_count(user(public_repos=2, owned_private_repos=3)) == 5
+    assert repo_count(user(public_repos=0)) == 0
+
+
+def test_repo_count_of_partial_profile_is_unknown():
+    assert repo_count(user_short()) is None
+
+
+def test_repo_counts_are_saved(tmp_path: Path):
+    path = tmp_path / "repo_counts.json"
+    counts = UserRepoCounts(path)
+
+    counts.record(user(user_login="Octocat", public_repos=0))
+    counts.record(user_short(user_login="turbo"))
+    counts.save()
+
+    reloaded = UserRepoCounts(path)
+    assert reloaded.get("octocat") == 0
+    assert reloaded.get("turbo") is None
+
+
+def test_repo_counts_expire(tmp_path: Path):
+    path = tmp_path / "repo_counts.json"
+    now = 1000.0
+    counts = UserRepoCounts(path, max_age_seconds=60, clock=lambda: now)
+    counts.record(user(user_login="octocat", public_repos=0))
+    counts.save()
+
+    now += 61
+    reloaded = UserRepoCounts(path, max_age_seconds=60, clock=lambda: now)
+    assert reloaded.get("octocat") is None
+    reloaded.save()
+    assert UserRepoCounts(path).get("octocat") is None
+
+
+def test_repo_counts_of_an_older_format_are_unknown(tmp_path: Path):
+    path = tmp_path / "repo_counts.json"
+    path.write_text('{"octocat": 0}')
+
+    assert UserRepoCounts(path).get("octocat") is None
+
+
+def test_negative_repo_count_max_age():
+    with pytest.raises(ValueError, match="must not be negative"):
+        UserRepoCounts("repo_counts.json", max_age_seconds=-1)
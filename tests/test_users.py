@@ -1,12 +1,20 @@
+import json
 from collections.abc import AsyncGenerator
+from pathlib import Path
 
 import httpx
 import pytest
+from pytest_mock import MockerFixture
 
 from nodestream_github import GithubUserExtractor
-from nodestream_github.types.enums import UserRepoType
+from nodestream_github.concurrency import bounded_map
+from nodestream_github.types.enums import ResultOrder, UserRepoType
 from tests.data.repos import HELLO_WORLD_REPO
-from tests.data.users import OCTOCAT_USER, OCTOCAT_USER_SHORT
+from tests.data.users import (
+    OCTOCAT_USER,
+    OCTOCAT_USER_SHORT,
+    user,
+)
 from tests.mocks.githubrest import DEFAULT_HOSTNAME, GithubHttpxMock
 
 
@@ -91,3 +99,49 @@ async def test_github_user_extractor_repo_fail(
     actual = [user async for user in user_extractor.extract_records()]
 
     assert actual == [OCTOCAT_USER | {"repositories": []}]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_options_are_passed_through(
+    gh_rest_mock: GithubHttpxMock, mocker: MockerFixture
+):
+    user_extractor = GithubUserExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        include_repos=False,
+        max_concurrent_users=2,
+        user_order="completion",
+    )
+    spy = mocker.patch("nodestream_github.users.bounded_map", wraps=bounded_map)
+    gh_rest_mock.all_users(json=[OCTOCAT_USER_SHORT])
+    gh_rest_mock.get_user(username="octocat", json=OCTOCAT_USER)
+
+    actual = [record async for record in user_extractor.extract_records()]
+
+    assert [record["login"] for record in actual] == ["octocat"]
+    assert spy.call_args.kwargs == {"limit": 2, "order": ResultOrder.COMPLETION}
+    assert user_extractor.users_extracted == 1
+    assert user_extractor.users_per_second > 0
+
+
+@pytest.mark.asyncio
+async def test_repo_listing_skipped_for_users_owning_no_repos(
+    gh_rest_mock: GithubHttpxMock, tmp_path: Path
+):
+    counts_path = tmp_path / "repo_counts.json"
+    user_extractor = GithubUserExtractor(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        max_retries=0,
+        user_repo_counts_path=str(counts_path),
+    )
+    empty_user = user(public_repos=0, owned_private_repos=0)
+    gh_rest_mock.all_users(json=[OCTOCAT_USER_SHORT])
+    gh_rest_mock.get_user(username="octocat", json=empty_user)
+
+    actual = [record async for record in user_extractor.extract_records()]
+
+    assert actual == [empty_user | {"repositories": []}]
+    assert user_extractor.repo_listings_skipped == 1
+    assert json.loads(counts_path.read_text())["octocat"]["count"] == 0
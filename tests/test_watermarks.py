@@ -0,0 +1,40 @@
+from datetime import UTC, datetime
+from pathlib import Path
+
+from nodestream_github.watermarks import WatermarkStore
+
+
+def test_watermarks_take_effect_once_saved(tmp_path: Path):
+    path = tmp_path / "watermarks.json"
+    store = WatermarkStore(path)
+
+    store.advance("GitHub", "2011-01-26T19:06:43Z")
+    store.advance("github", "2011-01-01T00:00:00Z")
+    store.advance("github", None)
+
+    assert store.get("github") is None
+    store.save()
+    assert store.get("github") == datetime(2011, 1, 26, 19, 6, 43, tzinfo=UTC)
+    assert WatermarkStore(path).get("GITHUB") == store.get("github")
+
+
+def test_unreadable_watermarks_are_ignored(tmp_path: Path):
+    path = tmp_path / "watermarks.json"
+    path.write_text("[]")
+
+    assert WatermarkStore(path).get("github") is None
+
+
+def test_failed_orgs_keep_their_watermark(tmp_path: Path):
+    path = tmp_path / "watermarks.json"
+    store = WatermarkStore(path)
+    store.advance("github", "2011-01-01T00:00:00Z")
+    store.save()
+
+    store.advance("github", "2011-01-26T19:06:43Z")
+    store.advance("octocat", "2011-01-26T19:06:43Z")
+    store.fail("GitHub")
+    store.save()
+
+    assert store.get("github") == datetime(2011, 1, 1, tzinfo=UTC)
+    assert store.get("octocat") == datetime(2011, 1, 26, 19, 6, 43, tzinfo=UTC)
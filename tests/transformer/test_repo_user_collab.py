@@ -92,3 +92,37 @@ async def test_no_full_name_key():
 
     response = [r async for r in transformer.transform_record(modified_repo)]
     assert response == []
+
+
+@pytest.mark.asyncio
+async def test_transform_records_with_outside_collaborator_index(
+    gh_rest_mock: GithubHttpxMock,
+):
+    transformer = RepoToUserCollaboratorsTransformer(
+        auth_token="test-token",
+        github_hostname=DEFAULT_HOSTNAME,
+        user_agent="test-agent",
+        max_retries=0,
+        per_page=DEFAULT_PER_PAGE,
+        index_outside_collaborators=True,
+    )
+
+    gh_rest_mock.get_outside_collaborators_for_org(
+        org_login="octocat", json=[TURBO_USER_SHORT]
+    )
+    gh_rest_mock.get_collaborators_for_repo(
+        owner_login="octocat",
+        repo_name="Hello-World",
+        affiliation=CollaboratorAffiliation.DIRECT,
+        json=[OCTOCAT_USER_SHORT, TURBO_USER_SHORT],
+    )
+
+    repo_summary = simplify_repo(HELLO_WORLD_REPO)
+
+    response = [r async for r in transformer.transform_record(HELLO_WORLD_REPO)]
+
+    assert response == [
+        OCTOCAT_USER_SHORT | {"repository": repo_summary, "affiliation": "direct"},
+        TURBO_USER_SHORT | {"repository": repo_summary, "affiliation": "direct"},
+        TURBO_USER_SHORT | {"repository": repo_summary, "affiliation": "outside"},
+    ]